@@ -0,0 +1,312 @@
+import numpy as np
+
+from core.attribute import Attribute
+from core.dataset import Dataset
+
+
+class StreamGenerator(object):
+    """Base for the synthetic data stream generators used in the benchmarks.
+    Instances are generated in batches of attribute values, encoded as expected by HoeffdingTree.partial_fit:
+    Nominal values are given by their index in the attribute's definition. The class is always the last
+    attribute of the header.
+
+    Args:
+        drift_every (int): The number of instances after which the concept changes, or None for a stream
+            without concept drift. (default None)
+        seed (int): The seed of the random number generator. (default 1)
+    """
+    def __init__(self, drift_every=None, seed=1):
+        self._drift_every = drift_every
+        self._rng = np.random.default_rng(seed)
+        self._num_generated = 0
+
+    def header(self):
+        """Return the dataset describing the attributes of the generated instances.
+
+        Returns:
+            Dataset: A dataset with no instances, with the class as its last attribute.
+        """
+        raise NotImplementedError
+
+    def next_batch(self, num_instances):
+        """Generate the next instances of the stream, changing the concept where a drift is due.
+
+        Args:
+            num_instances (int): The number of instances to be generated.
+
+        Returns:
+            tuple: A pair (X, y) with the attribute values of the instances, one per row, and the index of the
+                class value of each instance.
+        """
+        Xs = []
+        ys = []
+        while num_instances > 0:
+            size = num_instances
+            if self._drift_every is not None:
+                size = min(size, self._drift_every - self._num_generated % self._drift_every)
+            X, y = self._generate(size)
+            Xs.append(X)
+            ys.append(y)
+            self._num_generated += size
+            num_instances -= size
+            if self._drift_every is not None and self._num_generated % self._drift_every == 0:
+                self._drift()
+        return np.concatenate(Xs), np.concatenate(ys)
+
+    def _generate(self, num_instances):
+        raise NotImplementedError
+
+    def _drift(self):
+        raise NotImplementedError
+
+    def _flip_labels(self, y, noise, num_classes):
+        # Replace the class of a fraction of the instances with a random one
+        noisy = self._rng.random(len(y)) < noise
+        y[noisy] = self._rng.integers(0, num_classes, int(noisy.sum()))
+        return y
+
+
+def _numeric_header(num_attributes, num_classes):
+    attributes = [Attribute('att{0}'.format(i), att_type='Numeric') for i in range(num_attributes)]
+    attributes.append(Attribute('class', ['class{0}'.format(i) for i in range(num_classes)], 'Nominal'))
+    return Dataset(attributes, num_attributes)
+
+
+class SEAGenerator(StreamGenerator):
+    """SEA concepts (Street and Kim, 2001): three numeric attributes in [0, 10], of which only the first two
+    are relevant. The class is 1 if their sum is at most the threshold of the current concept.
+    Each drift moves to the next of the four concepts.
+
+    Args:
+        concept (int): The concept the stream starts with, from 0 to 3. (default 0)
+        noise (float): The fraction of instances with a random class. (default 0.1)
+        drift_every (int): The number of instances between concept changes. (default None)
+        seed (int): The seed of the random number generator. (default 1)
+    """
+    THRESHOLDS = (8.0, 9.0, 7.0, 9.5)
+
+    def __init__(self, concept=0, noise=0.1, drift_every=None, seed=1):
+        super().__init__(drift_every, seed)
+        self._concept = concept
+        self._noise = noise
+
+    def header(self):
+        return _numeric_header(3, 2)
+
+    def _generate(self, num_instances):
+        X = self._rng.uniform(0.0, 10.0, (num_instances, 3))
+        y = (X[:, 0] + X[:, 1] <= self.THRESHOLDS[self._concept]).astype(np.float64)
+        return X, self._flip_labels(y, self._noise, 2)
+
+    def _drift(self):
+        self._concept = (self._concept + 1) % len(self.THRESHOLDS)
+
+
+class HyperplaneGenerator(StreamGenerator):
+    """Rotating hyperplane (Hulten et al., 2001): numeric attributes in [0, 1], labeled by the side of a
+    hyperplane they fall on. With more than two classes, the distance to the hyperplane is split in equal
+    ranges. The weights of the hyperplane change by mag_change at every instance, and each drift reverses
+    the direction of change of the weights.
+
+    Args:
+        num_attributes (int): The number of attributes. (default 10)
+        num_classes (int): The number of classes. (default 2)
+        mag_change (float): How much the weights change per instance. (default 0.001)
+        noise (float): The fraction of instances with a random class. (default 0.05)
+        drift_every (int): The number of instances between reversals of the change. (default None)
+        seed (int): The seed of the random number generator. (default 1)
+    """
+    def __init__(self, num_attributes=10, num_classes=2, mag_change=0.001, noise=0.05, drift_every=None, seed=1):
+        super().__init__(drift_every, seed)
+        self._num_attributes = num_attributes
+        self._num_classes = num_classes
+        self._mag_change = mag_change
+        self._noise = noise
+        # The weights of the hyperplane are given by positions that move in a direction and are folded
+        # back into [0, 1]
+        self._positions = self._rng.random(num_attributes)
+        self._directions = np.where(self._rng.random(num_attributes) < 0.5, -1.0, 1.0)
+
+    def header(self):
+        return _numeric_header(self._num_attributes, self._num_classes)
+
+    def _generate(self, num_instances):
+        X = self._rng.random((num_instances, self._num_attributes))
+        # The weights used for each instance move linearly along the batch, bouncing back into [0, 1]
+        steps = np.arange(num_instances).reshape(-1, 1)
+        positions = np.mod(self._positions + steps * self._mag_change * self._directions, 2.0)
+        weights = np.where(positions > 1.0, 2.0 - positions, positions)
+        self._positions = self._positions + num_instances * self._mag_change * self._directions
+        scores = (X * weights).sum(axis=1) / np.maximum(weights.sum(axis=1), 1e-12)
+        y = np.clip(np.floor(scores * self._num_classes), 0, self._num_classes - 1)
+        return X, self._flip_labels(y, self._noise, self._num_classes)
+
+    def _drift(self):
+        self._directions = -self._directions
+
+
+class RandomTreeGenerator(StreamGenerator):
+    """Random tree (Domingos and Hulten, 2000): instances with uniformly random attribute values, labeled by
+    a randomly built decision tree. Each drift builds a new tree.
+
+    Args:
+        num_nominal (int): The number of Nominal attributes. (default 5)
+        num_numeric (int): The number of Numeric attributes, with values in [0, 1]. (default 5)
+        num_values (int): The number of values of each Nominal attribute. (default 5)
+        num_classes (int): The number of classes. (default 2)
+        max_depth (int): The maximum depth of the tree. (default 5)
+        first_leaf_level (int): The depth from which branches may end in a leaf. (default 3)
+        leaf_fraction (float): The chance of a branch ending in a leaf from first_leaf_level on. (default 0.15)
+        drift_every (int): The number of instances between concept changes. (default None)
+        seed (int): The seed of the random number generator. (default 1)
+    """
+    def __init__(self, num_nominal=5, num_numeric=5, num_values=5, num_classes=2, max_depth=5,
+                 first_leaf_level=3, leaf_fraction=0.15, drift_every=None, seed=1):
+        super().__init__(drift_every, seed)
+        self._num_nominal = num_nominal
+        self._num_numeric = num_numeric
+        self._num_values = num_values
+        self._num_classes = num_classes
+        self._max_depth = max_depth
+        self._first_leaf_level = first_leaf_level
+        self._leaf_fraction = leaf_fraction
+        self._tree = self._build_tree(0, [])
+
+    def header(self):
+        attributes = [Attribute('nom{0}'.format(i), ['v{0}'.format(j) for j in range(self._num_values)], 'Nominal')
+                      for i in range(self._num_nominal)]
+        attributes.extend(Attribute('num{0}'.format(i), att_type='Numeric') for i in range(self._num_numeric))
+        attributes.append(Attribute('class', ['class{0}'.format(i) for i in range(self._num_classes)], 'Nominal'))
+        return Dataset(attributes, len(attributes) - 1)
+
+    def _build_tree(self, depth, used_nominal):
+        # Leaves are class indices and split nodes are tuples (attribute index, split point, children)
+        num_attributes = self._num_nominal + self._num_numeric
+        if depth >= self._max_depth or \
+                (depth >= self._first_leaf_level and self._rng.random() < self._leaf_fraction):
+            return int(self._rng.integers(0, self._num_classes))
+        candidates = [i for i in range(num_attributes) if i not in used_nominal]
+        if not candidates:
+            return int(self._rng.integers(0, self._num_classes))
+        att_index = candidates[int(self._rng.integers(0, len(candidates)))]
+        if att_index < self._num_nominal:
+            children = [self._build_tree(depth + 1, used_nominal + [att_index]) for _ in range(self._num_values)]
+            return att_index, None, children
+        split_point = float(self._rng.random())
+        children = [self._build_tree(depth + 1, used_nominal) for _ in range(2)]
+        return att_index, split_point, children
+
+    def _label(self, node, X, rows, y):
+        if not isinstance(node, tuple):
+            y[rows] = node
+            return
+        att_index, split_point, children = node
+        values = X[rows, att_index]
+        branches = values.astype(np.intp) if split_point is None else (values > split_point).astype(np.intp)
+        for branch, child in enumerate(children):
+            self._label(child, X, rows[branches == branch], y)
+
+    def _generate(self, num_instances):
+        nominal = self._rng.integers(0, self._num_values, (num_instances, self._num_nominal))
+        numeric = self._rng.random((num_instances, self._num_numeric))
+        X = np.hstack((nominal.astype(np.float64), numeric))
+        y = np.empty(num_instances)
+        self._label(self._tree, X, np.arange(num_instances), y)
+        return X, y
+
+    def _drift(self):
+        self._tree = self._build_tree(0, [])
+
+
+class LEDGenerator(StreamGenerator):
+    """LED display (Breiman et al., 1984): seven binary attributes for the segments of a digit displayed on
+    an LED, plus irrelevant binary attributes. The class is the digit. Each drift swaps the positions of
+    some of the relevant attributes with irrelevant ones.
+
+    Args:
+        noise (float): The chance of each relevant segment being inverted. (default 0.1)
+        num_irrelevant (int): The number of irrelevant attributes. (default 17)
+        num_drifting (int): The number of relevant attributes that change position at each drift. (default 3)
+        drift_every (int): The number of instances between concept changes. (default None)
+        seed (int): The seed of the random number generator. (default 1)
+    """
+    SEGMENTS = np.array([
+        [1, 1, 1, 0, 1, 1, 1],
+        [0, 0, 1, 0, 0, 1, 0],
+        [1, 0, 1, 1, 1, 0, 1],
+        [1, 0, 1, 1, 0, 1, 1],
+        [0, 1, 1, 1, 0, 1, 0],
+        [1, 1, 0, 1, 0, 1, 1],
+        [1, 1, 0, 1, 1, 1, 1],
+        [1, 0, 1, 0, 0, 1, 0],
+        [1, 1, 1, 1, 1, 1, 1],
+        [1, 1, 1, 1, 0, 1, 1]], dtype=np.float64)
+
+    def __init__(self, noise=0.1, num_irrelevant=17, num_drifting=3, drift_every=None, seed=1):
+        super().__init__(drift_every, seed)
+        self._noise = noise
+        self._num_irrelevant = num_irrelevant
+        self._num_drifting = num_drifting
+        # The column of each attribute
+        self._columns = np.arange(7 + num_irrelevant)
+
+    def header(self):
+        attributes = [Attribute('att{0}'.format(i), ['0', '1'], 'Nominal') for i in range(7 + self._num_irrelevant)]
+        attributes.append(Attribute('class', [str(i) for i in range(10)], 'Nominal'))
+        return Dataset(attributes, len(attributes) - 1)
+
+    def _generate(self, num_instances):
+        y = self._rng.integers(0, 10, num_instances)
+        relevant = self.SEGMENTS[y]
+        inverted = self._rng.random(relevant.shape) < self._noise
+        relevant = np.where(inverted, 1.0 - relevant, relevant)
+        irrelevant = self._rng.integers(0, 2, (num_instances, self._num_irrelevant)).astype(np.float64)
+        values = np.hstack((relevant, irrelevant))
+        X = np.empty_like(values)
+        X[:, self._columns] = values
+        return X, y.astype(np.float64)
+
+    def _drift(self):
+        num_drifting = min(self._num_drifting, 7, self._num_irrelevant)
+        relevant = self._rng.choice(7, num_drifting, replace=False)
+        irrelevant = 7 + self._rng.choice(self._num_irrelevant, num_drifting, replace=False)
+        self._columns[relevant], self._columns[irrelevant] = \
+            self._columns[irrelevant].copy(), self._columns[relevant].copy()
+
+
+class WideNominalGenerator(StreamGenerator):
+    """Many Nominal attributes of which only a few are informative: the class is the sum of the values of
+    the informative attributes modulo the number of classes. Each drift picks other informative attributes.
+
+    Args:
+        num_attributes (int): The number of attributes. (default 500)
+        num_values (int): The number of values of each attribute. (default 10)
+        num_classes (int): The number of classes. (default 2)
+        num_informative (int): The number of attributes the class depends on. (default 3)
+        noise (float): The fraction of instances with a random class. (default 0.05)
+        drift_every (int): The number of instances between concept changes. (default None)
+        seed (int): The seed of the random number generator. (default 1)
+    """
+    def __init__(self, num_attributes=500, num_values=10, num_classes=2, num_informative=3, noise=0.05,
+                 drift_every=None, seed=1):
+        super().__init__(drift_every, seed)
+        self._num_attributes = num_attributes
+        self._num_values = num_values
+        self._num_classes = num_classes
+        self._num_informative = min(num_informative, num_attributes)
+        self._noise = noise
+        self._drift()
+
+    def header(self):
+        values = ['v{0}'.format(j) for j in range(self._num_values)]
+        attributes = [Attribute('att{0}'.format(i), list(values), 'Nominal') for i in range(self._num_attributes)]
+        attributes.append(Attribute('class', ['class{0}'.format(i) for i in range(self._num_classes)], 'Nominal'))
+        return Dataset(attributes, self._num_attributes)
+
+    def _generate(self, num_instances):
+        X = self._rng.integers(0, self._num_values, (num_instances, self._num_attributes))
+        y = (X[:, self._informative].sum(axis=1) % self._num_classes).astype(np.float64)
+        return X.astype(np.float64), self._flip_labels(y, self._noise, self._num_classes)
+
+    def _drift(self):
+        self._informative = self._rng.choice(self._num_attributes, self._num_informative, replace=False)
@@ -0,0 +1,74 @@
+"""Import-time benchmark: checks that importing the learner stays within a startup budget.
+
+Usage:
+    python -m benchmarks.import_time [--budget 0.5] [--runs 5] [--output results.json]
+
+Each run imports the module in a fresh interpreter. The benchmark fails (exit status 1) if the median import
+time is over the budget or if any of the heavy modules that are only needed on demand was imported.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ('scipy', 'sklearn')
+
+_PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+heavy = sorted(name for name in {heavy!r} if name in sys.modules)
+print(json.dumps({{'seconds': seconds, 'heavy_modules': heavy}}))
+'''
+
+
+def measure_import(module='hoeffdingtree'):
+    """Import a module in a fresh interpreter and return how long it took and which heavy modules it loaded.
+
+    Args:
+        module (str): The name of the module to import. (default 'hoeffdingtree')
+
+    Returns:
+        dict: The import time in seconds ('seconds') and the heavy modules that were imported ('heavy_modules').
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.check_output(
+        [sys.executable, '-c', _PROBE.format(module=module, heavy=HEAVY_MODULES)], cwd=root)
+    return json.loads(output)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check the import time of the Hoeffding Tree.')
+    parser.add_argument('--module', default='hoeffdingtree')
+    parser.add_argument('--budget', type=float, default=0.5, help='Maximum median import time in seconds.')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--output', default=None, help='JSON file for the results. Printed if not given.')
+    args = parser.parse_args(argv)
+
+    runs = [measure_import(args.module) for _ in range(args.runs)]
+    seconds = [run['seconds'] for run in runs]
+    heavy_modules = sorted(set(name for run in runs for name in run['heavy_modules']))
+    median = statistics.median(seconds)
+    report = {
+        'module': args.module,
+        'python': sys.version.split()[0],
+        'runs': seconds,
+        'median_seconds': median,
+        'min_seconds': min(seconds),
+        'budget_seconds': args.budget,
+        'heavy_modules': heavy_modules,
+        'passed': median <= args.budget and not heavy_modules,
+    }
+    if args.output is None:
+        print(json.dumps(report, indent=2))
+    else:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0 if report['passed'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
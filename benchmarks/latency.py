@@ -0,0 +1,133 @@
+"""Single-instance prediction latency: distribution_for_instance against the generated predictor.
+
+Usage:
+    python -m benchmarks.latency [--generators sea led] [--rows 100000] [--output results.json]
+
+Each benchmark trains a tree on a generated stream with partial_fit and times, one instance at a time, the
+class probabilities given by distribution_for_instance, by the generated predictor (generate_predictor) and
+by predict_proba on a single row. It also reports how long generating the predictor took. Results are
+written as JSON.
+"""
+import argparse
+import json
+import platform
+import time
+
+import numpy as np
+
+from benchmarks.run import GENERATORS, make_generator
+from core.instance import Instance
+from hoeffdingtree import HoeffdingTree
+
+
+def _percentiles(latencies):
+    return {
+        'p50_us': float(np.percentile(latencies, 50)) / 1000.0,
+        'p99_us': float(np.percentile(latencies, 99)) / 1000.0,
+    }
+
+
+def run_benchmark(generator_name, rows=100000, num_attributes=None, num_classes=None, leaf_prediction=0,
+                  samples=10000, grace_period=200, seed=1):
+    """Train a tree on a generated stream and measure its single-instance prediction latency.
+
+    Args:
+        generator_name (str): The name of the generator, one of benchmarks.run.GENERATORS.
+        rows (int): The number of training instances. (default 100000)
+        num_attributes (int): The number of attributes, see make_generator. (default None)
+        num_classes (int): The number of classes, see make_generator. (default None)
+        leaf_prediction (int): The leaf prediction strategy of the tree. (default 0, majority class)
+        samples (int): The number of predictions timed for each method. (default 10000)
+        grace_period (int): The grace period of the tree. (default 200)
+        seed (int): The seed of the generator. (default 1)
+
+    Returns:
+        dict: The configuration and the measurements of the benchmark.
+    """
+    generator = make_generator(generator_name, num_attributes, num_classes, seed=seed)
+    header = generator.header()
+    X, y = generator.next_batch(rows)
+    X_test, y_test = generator.next_batch(samples)
+
+    tree = HoeffdingTree()
+    tree.set_grace_period(grace_period)
+    tree.set_leaf_prediction_strategy(leaf_prediction)
+    tree.build_classifier(header)
+    tree.partial_fit(X, y)
+
+    start = time.perf_counter()
+    predictor = tree.generate_predictor()
+    generate_seconds = time.perf_counter() - start
+
+    test_instances = [Instance(values, dataset=header)
+                      for values in np.insert(X_test, header.class_index(), y_test, axis=1).tolist()]
+    test_rows = X_test.tolist()
+    distribution_latencies = np.empty(samples)
+    generated_latencies = np.empty(samples)
+    predict_proba_latencies = np.empty(samples)
+    for i in range(samples):
+        start = time.perf_counter_ns()
+        tree.distribution_for_instance(test_instances[i])
+        distribution_latencies[i] = time.perf_counter_ns() - start
+
+        start = time.perf_counter_ns()
+        predictor(test_rows[i])
+        generated_latencies[i] = time.perf_counter_ns() - start
+
+        start = time.perf_counter_ns()
+        tree.predict_proba(X_test[i:i + 1])
+        predict_proba_latencies[i] = time.perf_counter_ns() - start
+
+    return {
+        'generator': generator_name,
+        'rows': rows,
+        'attributes': header.num_attributes() - 1,
+        'classes': header.num_classes(),
+        'leaf_prediction': leaf_prediction,
+        'samples': samples,
+        'grace_period': grace_period,
+        'seed': seed,
+        'tree_size': tree.measure_tree_size(),
+        'tree_depth': tree.measure_tree_depth(),
+        'generate_predictor_seconds': generate_seconds,
+        'distribution_for_instance': _percentiles(distribution_latencies),
+        'generated_predictor': _percentiles(generated_latencies),
+        'predict_proba_single_row': _percentiles(predict_proba_latencies),
+        'speedup_p50': float(np.percentile(distribution_latencies, 50) / np.percentile(generated_latencies, 50)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the single-instance prediction latency.')
+    parser.add_argument('--generators', nargs='+', choices=GENERATORS, default=GENERATORS)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--attributes', type=int, default=None)
+    parser.add_argument('--classes', type=int, default=None)
+    parser.add_argument('--leaf-prediction', type=int, choices=[0, 1, 2], default=0,
+                        help='0 for majority class, 1 for naive Bayes, 2 for adaptive naive Bayes leaves.')
+    parser.add_argument('--samples', type=int, default=10000)
+    parser.add_argument('--grace-period', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', default=None, help='JSON file for the results. Printed if not given.')
+    args = parser.parse_args(argv)
+
+    results = [run_benchmark(name, rows=args.rows, num_attributes=args.attributes, num_classes=args.classes,
+                             leaf_prediction=args.leaf_prediction, samples=args.samples,
+                             grace_period=args.grace_period, seed=args.seed)
+               for name in args.generators]
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'results': results,
+    }
+    if args.output is None:
+        print(json.dumps(report, indent=2))
+    else:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
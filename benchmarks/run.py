@@ -0,0 +1,248 @@
+"""End-to-end benchmarks of the Hoeffding Tree on synthetic data streams.
+
+Usage:
+    python -m benchmarks.run [--generators sea led] [--rows 100000] [--output results.json]
+
+Each benchmark trains a tree on a generated stream and measures the training throughput of update_classifier
+and partial_fit, the latency of distribution_for_instance, the throughput of predict_proba, the memory and
+the size of the tree. Results are written as JSON.
+
+The memory is reported as the peak resident set size of the whole process (peak_rss_bytes), which includes
+the generated stream, and as how far the peak reached from the start of training is above the resident set
+size at that point (peak_rss_growth_bytes), which is mostly the trees. The growth needs the peak to be reset
+before training, which is only possible on Linux; elsewhere it is None.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from benchmarks.generators import HyperplaneGenerator, LEDGenerator, RandomTreeGenerator, SEAGenerator, \
+    WideNominalGenerator
+from core.instancebatch import InstanceBatch
+from hoeffdingtree import HoeffdingTree
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+GENERATORS = ['sea', 'hyperplane', 'randomtree', 'led', 'widenominal']
+
+
+def make_generator(name, num_attributes=None, num_classes=None, drift_every=None, seed=1):
+    """Create a stream generator by name.
+    The number of attributes and classes are ignored by the generators where they are fixed (SEA has three
+    attributes and two classes, LED has ten classes and at least seven attributes).
+
+    Args:
+        name (str): The name of the generator, one of GENERATORS.
+        num_attributes (int): The number of attributes, not counting the class. (default None, the
+            generator's default)
+        num_classes (int): The number of classes. (default None, the generator's default)
+        drift_every (int): The number of instances between concept changes. (default None, no drift)
+        seed (int): The seed of the random number generator. (default 1)
+
+    Returns:
+        StreamGenerator: The generator.
+
+    Raises:
+        ValueError: If there is no generator with the given name.
+    """
+    options = {'drift_every': drift_every, 'seed': seed}
+    if name == 'sea':
+        return SEAGenerator(**options)
+    if name == 'led':
+        if num_attributes is not None:
+            options['num_irrelevant'] = max(0, num_attributes - 7)
+        return LEDGenerator(**options)
+    if num_classes is not None:
+        options['num_classes'] = num_classes
+    if name == 'hyperplane':
+        if num_attributes is not None:
+            options['num_attributes'] = num_attributes
+        return HyperplaneGenerator(**options)
+    if name == 'randomtree':
+        if num_attributes is not None:
+            options['num_nominal'] = num_attributes // 2
+            options['num_numeric'] = num_attributes - num_attributes // 2
+        return RandomTreeGenerator(**options)
+    if name == 'widenominal':
+        if num_attributes is not None:
+            options['num_attributes'] = num_attributes
+        return WideNominalGenerator(**options)
+    raise ValueError('Unknown generator \'{0}\'. Available generators: {1}.'.format(name, ', '.join(GENERATORS)))
+
+
+def peak_rss_bytes():
+    """Return the peak resident set size of the process in bytes, or None where it cannot be measured."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes and macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def reset_peak_rss():
+    """Reset the peak resident set size of the process to its current resident set size, so that
+    high_water_rss_bytes measures the peak from now on. Only available on Linux.
+
+    Returns:
+        bool: Whether the peak was reset.
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        return False
+    return True
+
+
+def high_water_rss_bytes():
+    """Return the peak resident set size of the process since it was last reset, in bytes, or None where it
+    cannot be measured. Only available on Linux."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, IndexError, ValueError):
+        return None
+    return None
+
+
+def run_benchmark(generator_name, rows=100000, num_attributes=None, num_classes=None, drift_every=None,
+                  batch_size=1000, latency_samples=1000, grace_period=200, seed=1):
+    """Train trees on a generated stream and measure their performance.
+
+    Args:
+        generator_name (str): The name of the generator, one of GENERATORS.
+        rows (int): The number of training instances. (default 100000)
+        num_attributes (int): The number of attributes, see make_generator. (default None)
+        num_classes (int): The number of classes, see make_generator. (default None)
+        drift_every (int): The number of instances between concept changes. (default None)
+        batch_size (int): The number of instances per partial_fit call. (default 1000)
+        latency_samples (int): The number of distribution_for_instance calls to time. (default 1000)
+        grace_period (int): The grace period of the trees. (default 200)
+        seed (int): The seed of the generator. (default 1)
+
+    Returns:
+        dict: The configuration and the measurements of the benchmark.
+    """
+    generator = make_generator(generator_name, num_attributes, num_classes, drift_every, seed)
+    header = generator.header()
+    X, y = generator.next_batch(rows)
+    X_test, y_test = generator.next_batch(max(latency_samples, 1))
+    class_index = header.class_index()
+    # Instances are views of the rows of the batch, created as they are used
+    instances = InstanceBatch(np.insert(X, class_index, y, axis=1), header)
+    test_instances = InstanceBatch(np.insert(X_test, class_index, y_test, axis=1), header)
+    # Resetting the peak also resets ru_maxrss, so the peak of the whole process is read first
+    peak_before = peak_rss_bytes()
+    rss_before = high_water_rss_bytes() if reset_peak_rss() else None
+
+    # One instance at a time
+    tree = HoeffdingTree()
+    tree.set_grace_period(grace_period)
+    tree.build_classifier(header)
+    start = time.perf_counter()
+    for inst in instances:
+        tree.update_classifier(inst)
+    update_seconds = time.perf_counter() - start
+
+    # Batches
+    batch_tree = HoeffdingTree()
+    batch_tree.set_grace_period(grace_period)
+    batch_tree.build_classifier(generator.header())
+    start = time.perf_counter()
+    for batch_start in range(0, rows, batch_size):
+        batch_tree.partial_fit(X[batch_start:batch_start + batch_size], y[batch_start:batch_start + batch_size])
+    partial_fit_seconds = time.perf_counter() - start
+
+    latencies = np.empty(latency_samples)
+    for i in range(latency_samples):
+        inst = test_instances.instance(i)
+        start = time.perf_counter_ns()
+        tree.distribution_for_instance(inst)
+        latencies[i] = time.perf_counter_ns() - start
+
+    start = time.perf_counter()
+    predictions = tree.predict(X_test)
+    predict_seconds = time.perf_counter() - start
+    peak_after = peak_rss_bytes()
+    rss_after = high_water_rss_bytes() if rss_before is not None else None
+
+    return {
+        'generator': generator_name,
+        'rows': rows,
+        'attributes': header.num_attributes() - 1,
+        'classes': header.num_classes(),
+        'drift_every': drift_every,
+        'batch_size': batch_size,
+        'grace_period': grace_period,
+        'seed': seed,
+        'update_classifier_instances_per_second': rows / update_seconds,
+        'partial_fit_instances_per_second': rows / partial_fit_seconds,
+        'distribution_for_instance_p50_us': float(np.percentile(latencies, 50)) / 1000.0,
+        'distribution_for_instance_p99_us': float(np.percentile(latencies, 99)) / 1000.0,
+        'predict_proba_instances_per_second': len(X_test) / predict_seconds,
+        'test_accuracy': float(np.mean(predictions == y_test)),
+        'peak_rss_bytes': None if peak_after is None else max(peak_before, peak_after),
+        'peak_rss_growth_bytes': None if rss_after is None else rss_after - rss_before,
+        'tree_size': tree.measure_tree_size(),
+        'tree_leaves': tree.measure_num_leaves(),
+        'tree_depth': tree.measure_tree_depth(),
+        'tree_estimated_bytes': tree.estimate_model_byte_size(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the Hoeffding Tree on synthetic data streams.')
+    parser.add_argument('--generators', nargs='+', choices=GENERATORS, default=GENERATORS)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--attributes', type=int, default=None)
+    parser.add_argument('--classes', type=int, default=None)
+    parser.add_argument('--drift', type=int, default=None, help='Instances between concept changes.')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--latency-samples', type=int, default=1000)
+    parser.add_argument('--grace-period', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', default=None, help='JSON file for the results. Printed if not given.')
+    parser.add_argument('--no-isolate', action='store_true',
+                        help='Run all benchmarks in this process. The peak RSS then includes the earlier '
+                             'benchmarks.')
+    args = parser.parse_args(argv)
+
+    results = []
+    for name in args.generators:
+        options = dict(rows=args.rows, num_attributes=args.attributes, num_classes=args.classes,
+                       drift_every=args.drift, batch_size=args.batch_size, latency_samples=args.latency_samples,
+                       grace_period=args.grace_period, seed=args.seed)
+        if args.no_isolate:
+            results.append(run_benchmark(name, **options))
+        else:
+            # A fresh process per benchmark, so the peak RSS is its own
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                results.append(executor.submit(run_benchmark, name, **options).result())
+
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'results': results,
+    }
+    if args.output is None:
+        print(json.dumps(report, indent=2))
+    else:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -24,6 +24,11 @@ class Attribute(object):
         self.name = name
         # The possible values of the attribute, if Nominal
         self.__values = values
+        # The index of each possible value, for constant-time lookups
+        self.__value_indices = {}
+        if values is not None:
+            for i, value in enumerate(values):
+                self.__value_indices.setdefault(value, i)
         # The type of the attribute
         if att_type not in ['Numeric', 'Nominal']:
             raise ValueError(
@@ -50,10 +55,12 @@ class Attribute(object):
             int: The index of a given attribute value if attribute is Nominal.
             int: -1 if attribute is Numeric.
         """
-        if self.att_type is 'Nominal':
-            if value not in self.__values:
+        if self.att_type == 'Nominal':
+            index = self.__value_indices.get(value, None)
+            if index is None:
                 self.add_value(value)
-            return self.__values.index(value)
+                index = len(self.__values) - 1
+            return index
         else:
             return -1
 
@@ -63,7 +70,7 @@ class Attribute(object):
         Returns:
             bool: True if the attribute is Numeric, False otherwise.
         """
-        return self.att_type is 'Numeric'
+        return self.att_type == 'Numeric'
 
     def num_values(self):
         """Return the number of possible values for the attribute.
@@ -87,10 +94,10 @@ class Attribute(object):
             str: The value of attribute at the given position, if the attribute is Nominal.
             str: An empty string if the attribute is Numeric.
         """
-        if self.att_type is not 'Nominal':
+        if self.att_type != 'Nominal':
             return ''
         else:
-            return self.__values[index]
+            return self.__values[int(index)]
 
     def add_value(self, value):
         """Add a new value to the attribute.
@@ -100,3 +107,4 @@ class Attribute(object):
             value (str): The new attribute value to be added.
         """
         self.__values.append(value)
+        self.__value_indices.setdefault(value, len(self.__values) - 1)
@@ -0,0 +1,265 @@
+"""Binary dataset files, for replaying the same stream many times without parsing it again.
+
+A binary dataset file has a fixed-size header, the values block, the weights block and the schema:
+
+    header   magic b'HTREEBIN', format version, bytes per value (4 for float32, 8 for float64), number of
+             attributes, number of instances, offset of the weights block, offset and length of the schema,
+             padded with zeros to VALUES_OFFSET bytes
+    values   one row per instance and one column for each attribute, the class included, as in
+             InstanceBatch. Nominal values are the index of the value in the attribute's definition and
+             missing values are NaN
+    weights  one weight per instance, with the same type as the values, starting at a multiple of
+             BLOCK_ALIGNMENT bytes
+    schema   UTF-8 JSON with the name of the dataset, the index of the class and, for each attribute, its
+             name, its type and the values of nominal attributes
+
+All numbers are little-endian. The reader memory-maps the blocks read-only, so opening a file does not read
+the instances, batches are views of the map and processes reading the same file share the page cache.
+"""
+import argparse
+import json
+import shutil
+import struct
+import tempfile
+
+import numpy as np
+
+from core.csvreader import CSVReader
+from core.dataset import Dataset
+from core.instancebatch import InstanceBatch
+
+BINARY_DATASET_MAGIC = b'HTREEBIN'
+BINARY_DATASET_VERSION = 1
+# The values block starts right after the header, and the weights block at a multiple of BLOCK_ALIGNMENT
+VALUES_OFFSET = 64
+BLOCK_ALIGNMENT = 64
+_HEADER = struct.Struct('<8sHHIQQQQ')
+_DTYPES = {4: np.dtype('<f4'), 8: np.dtype('<f8')}
+
+
+class BinaryDatasetWriter(object):
+    """A class for writing a binary dataset file, one batch of instances at a time.
+    The weights are kept in a temporary file until the writer is closed, and the schema is written last, so
+    nominal values added to the dataset's attributes while writing, as CSVReader does, are saved.
+
+    Args:
+        filename (str): The name of the binary dataset file (including filepath).
+        dataset (Dataset): The dataset describing the attributes of the instances.
+        dtype (numpy.dtype): The type of the values and weights, numpy.float32 or numpy.float64. float32
+            halves the size of the file but rounds numeric values. (default numpy.float64)
+
+    Raises:
+        ValueError: If dtype is not float32 or float64.
+    """
+    def __init__(self, filename, dataset, dtype=np.float64):
+        dtype = np.dtype(dtype)
+        if dtype.kind != 'f' or dtype.itemsize not in _DTYPES:
+            raise ValueError('Values can only be stored as float32 or float64, not {0}.'.format(dtype))
+        self._dataset = dataset
+        self._dtype = _DTYPES[dtype.itemsize]
+        self._num_instances = 0
+        self._file = open(filename, 'wb')
+        self._file.write(bytes(VALUES_OFFSET))
+        self._weights_file = tempfile.TemporaryFile()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, values, weights=None):
+        """Append a batch of instances to the file.
+
+        Args:
+            values (numpy.ndarray): 2-D array with the attribute values of the instances, one per row, as in
+                InstanceBatch.
+            weights (numpy.ndarray): The weight of each instance. (default None, every weight is 1)
+
+        Raises:
+            ValueError: If values does not have one column for each attribute of the dataset or weights does
+                not have one weight for each row of values.
+        """
+        num_attributes = self._dataset.num_attributes()
+        values = np.asarray(values)
+        if values.ndim != 2 or values.shape[1] != num_attributes:
+            raise ValueError(
+                'values should be a 2-D array with {0} columns, one for each attribute of the dataset.'
+                .format(num_attributes))
+        if weights is None:
+            weights = np.ones(values.shape[0])
+        else:
+            weights = np.asarray(weights)
+            if weights.shape != (values.shape[0],):
+                raise ValueError('weights should have one weight for each row of values.')
+        self._file.write(np.ascontiguousarray(values, dtype=self._dtype).tobytes())
+        self._weights_file.write(np.ascontiguousarray(weights, dtype=self._dtype).tobytes())
+        self._num_instances += values.shape[0]
+
+    def close(self):
+        """Write the weights and the schema, and close the file."""
+        if self._file is None:
+            return
+        f = self._file
+        f.write(bytes(-f.tell() % BLOCK_ALIGNMENT))
+        weights_offset = f.tell()
+        self._weights_file.seek(0)
+        shutil.copyfileobj(self._weights_file, f)
+        self._weights_file.close()
+
+        schema_offset = f.tell()
+        schema = json.dumps(self._dataset.schema()).encode('utf-8')
+        f.write(schema)
+        f.seek(0)
+        f.write(_HEADER.pack(BINARY_DATASET_MAGIC, BINARY_DATASET_VERSION, self._dtype.itemsize,
+                             self._dataset.num_attributes(), self._num_instances, weights_offset,
+                             schema_offset, len(schema)))
+        f.close()
+        self._file = None
+
+
+class BinaryDatasetReader(object):
+    """A class for replaying a binary dataset file from a read-only memory map.
+    Opening the file only reads its header and schema. Batches are views of the map, so the instances are
+    read from disk, or from the page cache shared with other processes, as they are used. For float64 files,
+    the batches given to the tree are not copied; float32 files are converted one batch at a time.
+
+    Args:
+        filename (str): The name of the binary dataset file (including filepath).
+        chunk_size (int): The number of instances in each batch. (default 10000)
+
+    Raises:
+        ValueError: If the file is not a binary dataset file or its format version is not supported.
+    """
+    def __init__(self, filename, chunk_size=10000):
+        with open(filename, 'rb') as f:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                raise ValueError('\'{0}\' is not a binary dataset file.'.format(filename))
+            magic, version, itemsize, num_attributes, num_instances, weights_offset, schema_offset, \
+                schema_length = _HEADER.unpack(header)
+            if magic != BINARY_DATASET_MAGIC:
+                raise ValueError('\'{0}\' is not a binary dataset file.'.format(filename))
+            if version != BINARY_DATASET_VERSION:
+                raise ValueError(
+                    'Binary dataset format version {0} is not supported. Expected version {1}.'
+                    .format(version, BINARY_DATASET_VERSION))
+            f.seek(schema_offset)
+            schema = json.loads(f.read(schema_length).decode('utf-8'))
+        self._dataset = Dataset.from_schema(schema)
+        self._chunk_size = chunk_size
+        dtype = _DTYPES[itemsize]
+        if num_instances == 0:
+            # Empty files cannot be mapped
+            self._values = np.empty((0, num_attributes), dtype=dtype)
+            self._weights = np.empty(0, dtype=dtype)
+        else:
+            self._values = np.memmap(filename, dtype=dtype, mode='r', offset=VALUES_OFFSET,
+                                     shape=(num_instances, num_attributes))
+            self._weights = np.memmap(filename, dtype=dtype, mode='r', offset=weights_offset,
+                                      shape=(num_instances,))
+
+    def dataset(self):
+        """Return the dataset describing the attributes of the file. It has no instances.
+
+        Returns:
+            Dataset: The dataset saved in the schema of the file.
+        """
+        return self._dataset
+
+    def num_instances(self):
+        return self._values.shape[0]
+
+    def values(self):
+        """Return the attribute values of all the instances, as a read-only memory-mapped 2-D array with one
+        row per instance, as in InstanceBatch."""
+        return self._values
+
+    def weights(self):
+        """Return the weight of each instance, as a read-only memory-mapped array."""
+        return self._weights
+
+    def batch(self, start, stop):
+        """Return the instances from start up to, but not including, stop.
+
+        Args:
+            start (int): The index of the first instance.
+            stop (int): The index after the last instance.
+
+        Returns:
+            InstanceBatch: The instances, sharing the memory map for float64 files.
+        """
+        return InstanceBatch(self._values[start:stop], self._dataset, self._weights[start:stop])
+
+    def batches(self):
+        """Replay the file one batch of instances at a time, for HoeffdingTree.update_classifier.
+
+        Yields:
+            InstanceBatch: The next chunk_size instances, with their weights.
+        """
+        for start in range(0, self.num_instances(), self._chunk_size):
+            yield self.batch(start, start + self._chunk_size)
+
+    def chunks(self):
+        """Replay the file one chunk of rows at a time, as CSVReader.chunks does.
+        The weights are not included; use batches() to train with them.
+
+        Yields:
+            tuple: A pair (X, y) for each chunk, as expected by HoeffdingTree.partial_fit and predict_proba.
+                y is a view of the map, and so is X when the class is the first or the last attribute.
+        """
+        class_index = self._dataset.class_index()
+        num_attributes = self._dataset.num_attributes()
+        for start in range(0, self.num_instances(), self._chunk_size):
+            values = self._values[start:start + self._chunk_size]
+            if class_index == 0:
+                X = values[:, 1:]
+            elif class_index == num_attributes - 1:
+                X = values[:, :-1]
+            else:
+                X = np.delete(values, class_index, axis=1)
+            yield X, values[:, class_index]
+
+
+def convert_csv(csv_filename, filename, class_index, dtype=np.float64, chunk_size=10000, **csv_options):
+    """Convert a dataset in CSV format into a binary dataset file, one chunk of rows at a time.
+
+    Args:
+        csv_filename (str): The name of the CSV file (including filepath).
+        filename (str): The name of the binary dataset file to write (including filepath).
+        class_index (int): The index of the attribute to be set as class.
+        dtype (numpy.dtype): The type of the values and weights, numpy.float32 or numpy.float64.
+            (default numpy.float64)
+        chunk_size (int): The number of rows read at a time. (default 10000)
+        **csv_options: Other arguments of CSVReader, such as sample_size, missing_values or dataset.
+
+    Returns:
+        Dataset: The dataset describing the attributes of the file.
+    """
+    reader = CSVReader(csv_filename, class_index, chunk_size=chunk_size, **csv_options)
+    dataset = reader.dataset()
+    with BinaryDatasetWriter(filename, dataset, dtype) as writer:
+        for X, y in reader.chunks():
+            writer.write(np.insert(X, class_index, y, axis=1))
+    return dataset
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Convert a CSV dataset into a binary dataset file.')
+    parser.add_argument('csv', help='CSV file with a header row.')
+    parser.add_argument('output', help='Binary dataset file to write.')
+    parser.add_argument('--class-index', type=int, required=True)
+    parser.add_argument('--float32', action='store_true', help='Store the values as float32 instead of float64.')
+    parser.add_argument('--sample-size', type=int, default=100,
+                        help='Number of rows used to infer the attributes.')
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    args = parser.parse_args(argv)
+
+    dataset = convert_csv(args.csv, args.output, args.class_index,
+                          dtype=np.float32 if args.float32 else np.float64, chunk_size=args.chunk_size,
+                          sample_size=args.sample_size)
+    print('Wrote {0} attributes to \'{1}\'.'.format(dataset.num_attributes(), args.output))
+
+
+if __name__ == '__main__':
+    main()
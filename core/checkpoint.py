@@ -0,0 +1,151 @@
+"""Checkpoint files, with the complete state of a learner in an explicit schema instead of pickled objects.
+
+A checkpoint file has a fixed-size header, the schema and the arrays block:
+
+    header   magic b'HTREECKP', format version and length of the schema
+    schema   UTF-8 JSON with the state of the learner: its parameters and counters, its dataset and its nodes
+             with their statistics. Numeric arrays are stored in the arrays block and referenced from the
+             state by their index. The schema also gives the type, shape and offset of each array
+    arrays   the arrays, each starting at a multiple of BLOCK_ALIGNMENT bytes from the start of the block,
+             which itself starts at the first multiple of BLOCK_ALIGNMENT bytes after the schema
+
+All numbers are little-endian. Reading a checkpoint only parses JSON and copies arrays of numbers, so, unlike
+unpickling, it never runs code from the file, and the names of the classes and attributes that hold the state
+in memory are not part of the format.
+"""
+import json
+import struct
+
+import numpy as np
+
+CHECKPOINT_MAGIC = b'HTREECKP'
+# Versions 1 to 5 were pickled learners, which are not supported anymore
+CHECKPOINT_VERSION = 6
+BLOCK_ALIGNMENT = 8
+_HEADER = struct.Struct('<8sHQ')
+# The types arrays can be stored as
+_DTYPES = {'<f8': np.dtype('<f8'), '<i8': np.dtype('<i8')}
+
+
+class CheckpointArrays(object):
+    """The arrays of a checkpoint, referenced from its state by their index.
+
+    Args:
+        arrays (list[numpy.ndarray]): The arrays read from a checkpoint. (default None, no arrays)
+    """
+    def __init__(self, arrays=None):
+        self._arrays = [] if arrays is None else arrays
+
+    def __len__(self):
+        return len(self._arrays)
+
+    def __iter__(self):
+        return iter(self._arrays)
+
+    def add(self, array, dtype=np.float64):
+        """Add an array to be written to the checkpoint.
+
+        Args:
+            array (numpy.ndarray): The array, or a list of numbers.
+            dtype (numpy.dtype): The type the array is stored as, numpy.float64 or numpy.int64.
+                (default numpy.float64)
+
+        Returns:
+            int: The index of the array, to be used in the state of the learner.
+        """
+        self._arrays.append(np.ascontiguousarray(array, dtype=np.dtype(dtype).newbyteorder('<')))
+        return len(self._arrays) - 1
+
+    def get(self, index):
+        """Return an array read from the checkpoint. Arrays are writable, and not shared between calls.
+
+        Args:
+            index (int): The index of the array.
+
+        Returns:
+            numpy.ndarray: A copy of the array, in the native byte order.
+
+        Raises:
+            ValueError: If there is no array with the given index.
+        """
+        if not isinstance(index, int) or not 0 <= index < len(self._arrays):
+            raise ValueError('The checkpoint has no array {0}.'.format(index))
+        array = self._arrays[index]
+        return array.astype(array.dtype.newbyteorder('='))
+
+
+def write_checkpoint(filename, state, arrays):
+    """Write a checkpoint file.
+
+    Args:
+        filename (str): The name of the checkpoint file (including filepath).
+        state (dict): The state of the learner. Should only contain what JSON can represent.
+        arrays (CheckpointArrays): The arrays referenced from the state.
+    """
+    descriptors = []
+    offset = 0
+    for array in arrays:
+        descriptors.append({'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset})
+        offset += array.nbytes + -array.nbytes % BLOCK_ALIGNMENT
+    schema = json.dumps({'arrays': descriptors, 'state': state}, default=_json_default).encode('utf-8')
+    with open(filename, 'wb') as f:
+        f.write(_HEADER.pack(CHECKPOINT_MAGIC, CHECKPOINT_VERSION, len(schema)))
+        f.write(schema)
+        f.write(bytes(-f.tell() % BLOCK_ALIGNMENT))
+        for array in arrays:
+            f.write(array.tobytes())
+            f.write(bytes(-array.nbytes % BLOCK_ALIGNMENT))
+
+
+def read_checkpoint(filename):
+    """Read a checkpoint file.
+
+    Args:
+        filename (str): The name of the checkpoint file (including filepath).
+
+    Returns:
+        tuple: The state of the learner (dict) and the arrays referenced from it (CheckpointArrays).
+
+    Raises:
+        ValueError: If the file is not a checkpoint, its format version is not supported or it is corrupt.
+    """
+    with open(filename, 'rb') as f:
+        header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise ValueError('\'{0}\' is not a Hoeffding Tree checkpoint.'.format(filename))
+        magic, version, schema_length = _HEADER.unpack(header)
+        if magic != CHECKPOINT_MAGIC:
+            raise ValueError('\'{0}\' is not a Hoeffding Tree checkpoint.'.format(filename))
+        if version != CHECKPOINT_VERSION:
+            raise ValueError(
+                'Checkpoint format version {0} is not supported. Expected version {1}.'
+                .format(version, CHECKPOINT_VERSION))
+        try:
+            schema = json.loads(f.read(schema_length).decode('utf-8'))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise ValueError('\'{0}\' is a corrupt checkpoint: {1}'.format(filename, e)) from e
+        f.read(-f.tell() % BLOCK_ALIGNMENT)
+        data = f.read()
+
+    arrays = []
+    try:
+        for descriptor in schema['arrays']:
+            dtype = _DTYPES[descriptor['dtype']]
+            shape = tuple(descriptor['shape'])
+            count = int(np.prod(shape, dtype=np.int64))
+            arrays.append(np.frombuffer(data, dtype, count, descriptor['offset']).reshape(shape))
+        state = schema['state']
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError('\'{0}\' is a corrupt checkpoint: {1}'.format(filename, e)) from e
+    return state, CheckpointArrays(arrays)
+
+
+def _json_default(value):
+    # Numbers taken from numpy arrays
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    if isinstance(value, np.bool_):
+        return bool(value)
+    raise TypeError('{0} cannot be saved in a checkpoint.'.format(type(value).__name__))
@@ -0,0 +1,141 @@
+import csv
+import itertools
+import numpy as np
+
+from core.attribute import Attribute
+from core.dataset import Dataset
+
+
+class CSVReader(object):
+    """A class for streaming a dataset in CSV format in chunks of encoded values.
+    The attributes are inferred from a sample of the first rows of the file: an attribute is Numeric if all its
+    sampled values are numbers and Nominal otherwise. The file is then read lazily, one chunk of rows at a time,
+    so only one chunk is held in memory no matter the size of the file.
+
+    Note:
+        Nominal values that were not in the sample are added to their attribute as they are found, so the
+        dataset returned by dataset() should be the one used to train on the chunks.
+
+    Args:
+        filename (str): The name of the dataset file (including filepath).
+        class_index (int): The index of the attribute to be set as class.
+        sample_size (int): The number of rows used to infer the attributes. (default 100)
+        chunk_size (int): The number of rows in each chunk. (default 10000)
+        missing_values (tuple[str]): The strings that represent a missing value. (default ('', '?'))
+        dataset (Dataset): A dataset describing the attributes of the file. If given, the attributes are not
+            inferred from a sample. (default None)
+
+    Raises:
+        TypeError: If the file is not in CSV format.
+        ValueError: If an attribute has both Numeric and Nominal values in the sample.
+    """
+
+    def __init__(self, filename, class_index, sample_size=100, chunk_size=10000, missing_values=('', '?'),
+                 dataset=None):
+        if not filename.endswith('.csv'):
+            raise TypeError(
+                'Unable to open \'{0}\'. Only datasets in CSV format are supported.'
+                .format(filename))
+        self._filename = filename
+        self._class_index = class_index
+        self._chunk_size = chunk_size
+        self._missing_values = set(missing_values)
+
+        if dataset is not None:
+            self._dataset = dataset
+            return
+        with open(filename, newline='') as f:
+            rows = csv.reader(f)
+            headers = next(rows)
+            sample = list(itertools.islice(rows, sample_size))
+        self._dataset = Dataset(self._infer_attributes(headers, sample), class_index)
+
+    def _infer_attributes(self, headers, sample):
+        attributes = []
+        for j, name in enumerate(headers):
+            nominal_values = []
+            numeric = False
+            for row in sample:
+                value = row[j]
+                if value in self._missing_values:
+                    continue
+                try:
+                    float(value)
+                    numeric = True
+                except ValueError:
+                    if value not in nominal_values:
+                        nominal_values.append(value)
+                if numeric and nominal_values:
+                    raise ValueError(
+                        'Attribute {0} has both Numeric and Nominal values.'
+                        .format(name))
+            if nominal_values:
+                attributes.append(Attribute(str(name), nominal_values, 'Nominal'))
+            else:
+                attributes.append(Attribute(str(name), att_type='Numeric'))
+        return attributes
+
+    def dataset(self):
+        """Return the dataset describing the attributes of the file. It has no instances.
+
+        Returns:
+            Dataset: The dataset with the inferred attributes.
+        """
+        return self._dataset
+
+    def chunks(self):
+        """Read the file lazily, one chunk of rows at a time.
+
+        Yields:
+            tuple: A pair (X, y) for each chunk, where X is a 2-D array with one row per instance and one
+                column for each attribute except the class, and y has the index of the class value of each
+                instance, as expected by HoeffdingTree.partial_fit. Nominal values are given by their index
+                in the attribute's definition and missing values by NaN.
+
+        Raises:
+            ValueError: If a row does not have a value for every attribute or a Numeric attribute has a
+                value that is not a number.
+        """
+        with open(self._filename, newline='') as f:
+            rows = csv.reader(f)
+            next(rows)
+            while True:
+                chunk = list(itertools.islice(rows, self._chunk_size))
+                if not chunk:
+                    return
+                yield self._encode(chunk)
+
+    def _encode(self, rows):
+        attributes = self._dataset.get_attributes()
+        num_attributes = len(attributes)
+        for row in rows:
+            if len(row) != num_attributes:
+                raise ValueError(
+                    'Expected {0} values per row but found a row with {1}.'
+                    .format(num_attributes, len(row)))
+
+        X = np.empty((len(rows), num_attributes - 1))
+        y = np.empty(len(rows))
+        for j, column in enumerate(zip(*rows)):
+            att = attributes[j]
+            if j == self._class_index:
+                target = y
+            else:
+                target = X[:, j - (j > self._class_index)]
+
+            if att.is_numeric():
+                column = np.array(column)
+                missing = np.isin(column, list(self._missing_values))
+                if missing.any():
+                    column = np.where(missing, 'nan', column)
+                try:
+                    target[:] = column.astype(np.float64)
+                except ValueError:
+                    raise ValueError(
+                        'Attribute {0} has both Numeric and Nominal values.'
+                        .format(att.name))
+            else:
+                index_of_value = att.index_of_value
+                missing_values = self._missing_values
+                target[:] = [np.nan if value in missing_values else index_of_value(value) for value in column]
+        return X, y
@@ -1,3 +1,4 @@
+from core.attribute import Attribute
 from core.instance import Instance
 
 
@@ -22,6 +23,8 @@ class Dataset(object):
         # Set the indexes of the attributes in the dataset.
         for i in range(len(self.__attributes)):
             self.__attributes[i].index = i
+        # The index of each attribute by name, for constant-time lookups.
+        self.__attribute_indices = {att.name: att.index for att in self.__attributes}
         # The index of the class attribute.
         self.__class_index = class_index
         # The set of instances of the dataset.
@@ -64,10 +67,22 @@ class Dataset(object):
         if index is not None:
             return self.__attributes[index]
         else:
-            for att in self.__attributes:
-                if name == att.name:
-                    return att
-            return None
+            index = self.__attribute_indices.get(name, None)
+            if index is None:
+                return None
+            return self.__attributes[index]
+
+    def attribute_index(self, name):
+        """Return the index of the attribute with the given name.
+
+        Args:
+            name (str): The name of the attribute.
+
+        Returns:
+            int: The index of the attribute.
+            -1: If the specified attribute name does not exist.
+        """
+        return self.__attribute_indices.get(name, -1)
 
     def class_attribute(self):
         """Return the class attribute.
@@ -112,7 +127,7 @@ class Dataset(object):
             int: The number of class values, if class attribute is Nominal.
             1: If the class attribute is Numeric.
         """
-        if self.class_attribute().att_type is 'Numeric':
+        if self.class_attribute().att_type == 'Numeric':
             return 1
         else:
             return self.class_attribute().num_values()
@@ -164,3 +179,32 @@ class Dataset(object):
             list[Attribute]: A list containing all the attributes of the dataset's instances.
         """
         return self.__attributes
+
+    def schema(self):
+        """Return a description of the dataset that can be saved as JSON. The instances are not included.
+
+        Returns:
+            dict: The name of the dataset, the index of the class and, for each attribute, its name, its type
+                and the values of nominal attributes.
+        """
+        attributes = []
+        for att in self.__attributes:
+            if att.is_numeric():
+                attributes.append({'name': att.name, 'type': 'Numeric'})
+            else:
+                attributes.append({'name': att.name, 'type': 'Nominal',
+                                   'values': [att.value(i) for i in range(att.num_values())]})
+        return {'name': self.__name, 'class_index': self.__class_index, 'attributes': attributes}
+
+    @classmethod
+    def from_schema(cls, schema):
+        """Create a dataset with no instances from a description returned by schema().
+
+        Args:
+            schema (dict): The description of the dataset.
+
+        Returns:
+            Dataset: The dataset.
+        """
+        attributes = [Attribute(att['name'], att.get('values', None), att['type']) for att in schema['attributes']]
+        return cls(attributes, schema['class_index'], name=schema['name'])
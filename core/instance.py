@@ -15,21 +15,27 @@ class Instance(object):
         stored in an instance. Although confusing at first, it makes instance handling less messy
         since it only needs to take care of numbers (instead of numbers and strings).
 
+        Instances have no __dict__, so no attributes other than the ones below can be set on them.
+
     Args:
-        att_values (list[float]): The instances's attribute values. (default None)
+        att_values (list[float]): The instances's attribute values. A row of an InstanceBatch can also be used,
+            in which case the values are shared with the batch instead of copied. (default None)
+        weight (float): The weight of the instance. (default 1)
+        dataset (Dataset): The dataset with which the instance is associated. (default None)
 
     Raises:
         TypeError: If att_values is None.
     """
+    __slots__ = ('__att_values', 'dataset', 'weight')
 
-    def __init__(self, att_values):
+    def __init__(self, att_values, weight=1, dataset=None):
         if att_values is None:
             raise TypeError('Instance should be created with a list of attribute values.')
         # The list of attribute values for the instance.
         self.__att_values = att_values
         # The dataset with which this instance is associated (has access to its properties and/or attributes).
-        self.dataset = None
-        self.weight = 1
+        self.dataset = dataset
+        self.weight = weight
 
     def __str__(self):
         return 'Instance\n   From dataset: {0}\n   Attribute values: {1}\n   Class: {2}'.format(
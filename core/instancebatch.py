@@ -0,0 +1,125 @@
+import numpy as np
+
+from core.instance import Instance
+
+
+class InstanceBatch(object):
+    """A class for handling many instances at once.
+    The values of all instances are stored row by row in one contiguous 2-D array of floating-point numbers,
+    with one column for each attribute of the dataset (the class included), and their weights in another
+    array. As in Instance, Nominal values are stored as the index of the value in the attribute's definition
+    and missing values as NaN.
+
+    Note:
+        The instances of a batch share the reference to the dataset that describes them. Slices of a batch and
+        the instances returned by instance() are views, so they share the values of the batch instead of
+        copying them.
+
+    Args:
+        values (numpy.ndarray): 2-D array with the attribute values of the instances, one instance per row.
+        dataset (Dataset): The dataset describing the attributes of the instances.
+        weights (numpy.ndarray): The weight of each instance. (default None, every weight is 1)
+
+    Raises:
+        ValueError: If values does not have one column for each attribute of the dataset or weights does not
+            have one weight for each row of values.
+    """
+    __slots__ = ('values', 'weights', 'dataset')
+
+    def __init__(self, values, dataset, weights=None):
+        values = np.ascontiguousarray(values, dtype=np.float64)
+        if values.ndim != 2 or values.shape[1] != dataset.num_attributes():
+            raise ValueError(
+                'values should be a 2-D array with {0} columns, one for each attribute of the dataset.'
+                .format(dataset.num_attributes()))
+        if weights is None:
+            weights = np.ones(values.shape[0])
+        else:
+            weights = np.ascontiguousarray(weights, dtype=np.float64)
+            if weights.shape != (values.shape[0],):
+                raise ValueError('weights should have one weight for each row of values.')
+        # The attribute values of the instances, one instance per row.
+        self.values = values
+        # The weight of each instance.
+        self.weights = weights
+        # The dataset with which the instances are associated.
+        self.dataset = dataset
+
+    @classmethod
+    def from_instances(cls, instances, dataset):
+        """Create a batch with a copy of the values and weights of the given instances.
+
+        Args:
+            instances (list[Instance]): The instances to be copied.
+            dataset (Dataset): The dataset describing the attributes of the instances.
+
+        Returns:
+            InstanceBatch: The new batch.
+        """
+        values = np.empty((len(instances), dataset.num_attributes()))
+        weights = np.empty(len(instances))
+        for i, inst in enumerate(instances):
+            values[i] = [inst.value(index=j) for j in range(inst.num_values())]
+            weights[i] = inst.weight
+        return cls(values, dataset, weights)
+
+    def __len__(self):
+        return self.values.shape[0]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.instance(i)
+
+    def __getitem__(self, key):
+        """Return a view of a range of the instances of the batch.
+
+        Args:
+            key (slice): The range of instances.
+
+        Returns:
+            InstanceBatch: A batch sharing the values and weights of this one.
+
+        Raises:
+            TypeError: If key is not a slice.
+        """
+        if not isinstance(key, slice):
+            raise TypeError('InstanceBatch can only be indexed with a slice. Use instance() for single instances.')
+        batch = InstanceBatch.__new__(InstanceBatch)
+        batch.values = self.values[key]
+        batch.weights = self.weights[key]
+        batch.dataset = self.dataset
+        return batch
+
+    def instance(self, index):
+        """Return the instance at the given index. Its values are a view of the row of the batch, so
+        changing them changes the batch.
+
+        Args:
+            index (int): The index of the instance to be returned.
+
+        Returns:
+            Instance: The instance at the given index.
+        """
+        return Instance(self.values[index], float(self.weights[index]), self.dataset)
+
+    def num_instances(self):
+        """Return the number of instances in the batch.
+
+        Returns:
+            int: The number of instances in the batch.
+        """
+        return self.values.shape[0]
+
+    def class_values(self):
+        """Return the class value of each instance. The array is a view of the class column of the batch.
+
+        Returns:
+            numpy.ndarray: The class value of each instance.
+
+        Raises:
+            ValueError: If the class attribute is not set in the dataset.
+        """
+        class_index = self.dataset.class_index()
+        if class_index < 0:
+            raise ValueError('Class attribute is not set.')
+        return self.values[:, class_index]
@@ -0,0 +1,88 @@
+import bisect
+import math
+
+
+class Instrumentation(object):
+    """Cumulative timings of the phases of a learner: the number of calls, the total time and a histogram
+    of the time of each call.
+
+    Args:
+        hook (callable): A function called with the phase name and the time in seconds of every recorded
+            call. (default None)
+        buckets (tuple[float]): The upper bounds, in seconds, of the buckets of the histograms, in increasing
+            order. A last bucket for larger times is always added. (default Instrumentation.BUCKETS)
+    """
+    PHASES = ('routing', 'update', 'split_evaluation', 'prediction')
+    BUCKETS = (0.000001, 0.00001, 0.0001, 0.001, 0.01, 0.1, 1.0)
+
+    def __init__(self, hook=None, buckets=BUCKETS):
+        self.hook = hook
+        self._bounds = tuple(buckets) + (math.inf,)
+        self.reset()
+
+    def reset(self):
+        """Set all counts and times to zero."""
+        self._counts = {phase: 0 for phase in self.PHASES}
+        self._totals = {phase: 0.0 for phase in self.PHASES}
+        self._histograms = {phase: [0] * len(self._bounds) for phase in self.PHASES}
+
+    def record(self, phase, seconds):
+        """Record a call to a phase.
+
+        Args:
+            phase (str): The name of the phase.
+            seconds (float): How long the call took.
+        """
+        if phase not in self._counts:
+            self._counts[phase] = 0
+            self._totals[phase] = 0.0
+            self._histograms[phase] = [0] * len(self._bounds)
+        self._counts[phase] += 1
+        self._totals[phase] += seconds
+        self._histograms[phase][bisect.bisect_left(self._bounds, seconds)] += 1
+        if self.hook is not None:
+            self.hook(phase, seconds)
+
+    def snapshot(self):
+        """Return the current counts and times of every phase.
+
+        Returns:
+            dict: For each phase, a dict with the number of calls ('count'), the total time in seconds
+                ('total_seconds') and the histogram ('histogram'), a dict from the upper bound of each bucket
+                to the number of calls that took at most that long.
+        """
+        snapshot = {}
+        for phase in self._counts:
+            cumulative = 0
+            histogram = {}
+            for bound, count in zip(self._bounds, self._histograms[phase]):
+                cumulative += count
+                histogram[bound] = cumulative
+            snapshot[phase] = {
+                'count': self._counts[phase],
+                'total_seconds': self._totals[phase],
+                'histogram': histogram
+            }
+        return snapshot
+
+    def to_prometheus(self, name='hoeffding_tree_phase_seconds'):
+        """Return the current counts and times in the Prometheus text exposition format, as one histogram
+        labeled by phase.
+
+        Args:
+            name (str): The name of the metric. (default 'hoeffding_tree_phase_seconds')
+
+        Returns:
+            str: The metric in Prometheus text format.
+        """
+        lines = [
+            '# HELP {0} Time spent in each phase of the learner.'.format(name),
+            '# TYPE {0} histogram'.format(name)
+        ]
+        for phase, stats in self.snapshot().items():
+            for bound, count in stats['histogram'].items():
+                le = '+Inf' if math.isinf(bound) else repr(bound)
+                lines.append('{0}_bucket{{phase="{1}",le="{2}"}} {3}'.format(name, phase, le, count))
+            lines.append('{0}_sum{{phase="{1}"}} {2!r}'.format(name, phase, stats['total_seconds']))
+            lines.append('{0}_count{{phase="{1}"}} {2}'.format(name, phase, stats['count']))
+        return '\n'.join(lines) + '\n'
@@ -1,50 +1,134 @@
 from sys import float_info
 import math
-from scipy.stats import norm
+
+from core.utils import object_byte_size, running_sum
 
 
 class UnivariateNormalEstimator(object):
-    """docstring for UnivariateNormalEstimator"""
+    """An estimator of a normal distribution from weighted values.
+
+    The estimator keeps the sum of the weights and the weighted sums of the values and of their squares, all
+    taken relative to a shift: the first value seen. Shifting keeps the sums small for values with a large
+    magnitude but a small spread (timestamps, byte counts), so the variance does not lose its precision to
+    cancellation. Since they are plain sums, adding a batch of values gives the same result as adding them
+    one at a time. The mean and variance are only computed again after the estimator changes.
+    """
+    # Shared by all estimators
+    CONST = math.log(2 * math.pi)
+    NORMAL_CONSTANT = math.sqrt(2 * math.pi)
+
     def __init__(self):
+        self._shift = None
         self._weighted_sum = 0
         self._weighted_sum_squared = 0
         self._sum_of_weights = 0
         self._mean = 0
         self._variance = float_info.max
+        self._std_dev = math.sqrt(float_info.max)
         self._min_var = 1e-12
-        self.CONST = math.log(2 * math.pi)
+        # Whether the mean and variance are out of date
+        self._dirty = False
+
+    def checkpoint_state(self):
+        """Return the sums of the estimator, to be saved in a checkpoint.
+
+        Returns:
+            list[float]: The shift, the weighted sums of the shifted values and of their squares, and the sum
+                of the weights. The shift is NaN if no value was added yet.
+        """
+        shift = math.nan if self._shift is None else self._shift
+        return [shift, self._weighted_sum, self._weighted_sum_squared, self._sum_of_weights]
+
+    @classmethod
+    def from_checkpoint_state(cls, state):
+        """Create an estimator from the sums saved in a checkpoint by checkpoint_state.
+
+        Args:
+            state (list[float]): The sums of the estimator.
+
+        Returns:
+            UnivariateNormalEstimator: The estimator.
+        """
+        estimator = cls()
+        shift, estimator._weighted_sum, estimator._weighted_sum_squared, estimator._sum_of_weights = state
+        estimator._shift = None if math.isnan(shift) else shift
+        estimator._dirty = True
+        return estimator
 
     def __str__(self):
         self.update_mean_and_variance()
         return 'Mean: {0}, Variance: {1}'.format(self._mean, self._variance)
 
     def add_value(self, value, weight):
+        if self._shift is None:
+            self._shift = value
+        value = value - self._shift
         self._weighted_sum += value * weight
         self._weighted_sum_squared += value * value * weight
         self._sum_of_weights += weight
+        self._dirty = True
+
+    def add_values(self, values, weights):
+        if len(values) == 0:
+            return
+        if self._shift is None:
+            self._shift = float(values[0])
+        values = values - self._shift
+        self._weighted_sum = running_sum(self._weighted_sum, values * weights)
+        self._weighted_sum_squared = running_sum(self._weighted_sum_squared, values * values * weights)
+        self._sum_of_weights = running_sum(self._sum_of_weights, weights)
+        self._dirty = True
+
+    def merge(self, other):
+        """Add the values seen by another estimator to this one.
+
+        Args:
+            other (UnivariateNormalEstimator): The estimator to be merged into this one.
+        """
+        if other._shift is None:
+            return
+        if self._shift is None:
+            self._shift = other._shift
+        # The sums of the other estimator, moved to the shift of this one
+        offset = other._shift - self._shift
+        self._weighted_sum_squared += other._weighted_sum_squared + 2.0 * offset * other._weighted_sum + \
+            offset * offset * other._sum_of_weights
+        self._weighted_sum += other._weighted_sum + offset * other._sum_of_weights
+        self._sum_of_weights += other._sum_of_weights
+        self._dirty = True
+
+    def byte_size(self):
+        """Return an estimate of the memory used by the estimator, in bytes."""
+        return object_byte_size(self)
 
     def update_mean_and_variance(self):
+        if not self._dirty:
+            return
+        self._dirty = False
         self._mean = 0
-        if self._sum_of_weights > 0:
-            self._mean = self._weighted_sum / self._sum_of_weights
-
         self._variance = float_info.max
         if self._sum_of_weights > 0:
-            self._variance = self._weighted_sum_squared / self._sum_of_weights - self._mean * self._mean
+            shifted_mean = self._weighted_sum / self._sum_of_weights
+            self._mean = self._shift + shifted_mean
+            self._variance = self._weighted_sum_squared / self._sum_of_weights - shifted_mean * shifted_mean
 
         if self._variance <= self._min_var:
             self._variance = self._min_var
+        self._std_dev = math.sqrt(self._variance)
 
     def predict_intervals(self, conf):
+        # scipy is only imported when needed, since it is slow to import
+        from scipy.stats import norm
         self.update_mean_and_variance()
         val = norm.ppf(1.0 - (1.0 - conf) / 2.0)
-        arr = [[self._mean + val * math.sqrt(self._variance)],
-            [self._mean - val * math.sqrt(self._variance)]]
+        arr = [[self._mean + val * self._std_dev],
+            [self._mean - val * self._std_dev]]
         return arr
 
     def predict_quantile(self, percentage):
+        from scipy.stats import norm
         self.update_mean_and_variance()
-        return self._mean + norm.ppf(percentage) * math.sqrt(self._variance)
+        return self._mean + norm.ppf(percentage) * self._std_dev
 
     def log_density(self, value):
         self.update_mean_and_variance()
@@ -0,0 +1,83 @@
+import math
+import sys
+
+import numpy as np
+
+
+def running_sum(start, values):
+    """Return the result of adding the values to start one at a time, in order.
+    Unlike numpy.sum, which adds pairwise, this gives the same floating-point result as accumulating
+    the values in a loop, so updating in batches or one instance at a time leads to the same model.
+
+    Args:
+        start (float): The initial value.
+        values (numpy.ndarray): The values to be added.
+
+    Returns:
+        float: The accumulated value.
+    """
+    if len(values) == 0:
+        return start
+    return float(np.add.accumulate(np.concatenate(([start], values)))[-1])
+
+
+def groups_by_first_appearance(keys):
+    """Group the positions of an array by their value, in the order each value first appears.
+
+    Args:
+        keys (numpy.ndarray): The values to group by.
+
+    Returns:
+        list[tuple]: Tuples (value, positions) where positions is a numpy.ndarray of the positions of the value.
+    """
+    unique_keys, first_positions, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    sorted_positions = np.argsort(inverse, kind='stable')
+    bounds = np.cumsum(np.bincount(inverse, minlength=len(unique_keys)))
+    groups = []
+    for i in np.argsort(first_positions):
+        start = bounds[i - 1] if i > 0 else 0
+        groups.append((unique_keys[i], sorted_positions[start:bounds[i]]))
+    return groups
+
+
+def object_byte_size(obj):
+    """Return an estimate of the memory used by an object and its attribute dictionary, in bytes.
+    The objects it refers to are not included.
+
+    Args:
+        obj (object): The object to be measured.
+
+    Returns:
+        int: The estimated size of the object in bytes.
+    """
+    size = sys.getsizeof(obj)
+    if hasattr(obj, '__dict__'):
+        # The size of the instance dictionary itself depends on how the interpreter stores it, so a copy
+        # is measured to get the same estimate for objects with the same attributes
+        size += sys.getsizeof(dict(obj.__dict__))
+    return size
+
+
+# scipy.special.ndtr, imported the first time normal_cdf is given an array
+_ndtr = None
+
+
+def normal_cdf(x):
+    """Return the cumulative distribution function of the standard normal distribution.
+    Single values are computed with math.erfc and arrays with scipy.special.ndtr, which is only imported
+    the first time an array is given, since scipy is slow to import.
+
+    Args:
+        x (float): The value, or a numpy.ndarray of values, at which to evaluate the function.
+
+    Returns:
+        float: The probability of a standard normal variable being at most x, or a numpy.ndarray with the
+            probability for each value.
+    """
+    global _ndtr
+    if np.ndim(x) == 0:
+        return 0.5 * math.erfc(-x / math.sqrt(2.0))
+    if _ndtr is None:
+        from scipy.special import ndtr
+        _ndtr = ndtr
+    return _ndtr(np.asarray(x, dtype=np.float64))
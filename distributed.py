@@ -0,0 +1,80 @@
+def _collect_shard_statistics(worker, X, y, sample_weight):
+    # Module-level so that process pools can pickle it
+    worker.partial_fit(X, y, sample_weight)
+    return worker.leaf_statistics()
+
+
+class Coordinator(object):
+    """Trains a Hoeffding Tree on a stream split in shards that are processed by several workers.
+
+    Training goes in rounds. In each round every worker gets a copy of the current tree structure with
+    empty leaves, routes its shard through it and sends back the statistics collected in the leaves. The
+    coordinator merges them into the tree, which then tries to split the leaves that went past the grace
+    period, so the new structure is used by the workers in the next round.
+
+    Note:
+        Splits are only attempted between rounds, so the tree is not the same as the one built by training
+        on the whole stream in order. Smaller shards make it closer, at the cost of more rounds.
+
+    Args:
+        tree (HoeffdingTree): The tree to be trained. It should already be built with a dataset.
+        executor (concurrent.futures.Executor): The executor that runs the workers, usually a process pool
+            so that the shards are processed on several cores. If None, the shards are processed one after
+            another in the calling thread. (default None)
+
+    Raises:
+        ValueError: If the tree was not built yet.
+    """
+    def __init__(self, tree, executor=None):
+        if tree.get_header() is None:
+            raise ValueError('The tree needs to be built before it can be trained in parallel.')
+        self._tree = tree
+        self._executor = executor
+        self._num_rounds = 0
+
+    def tree(self):
+        return self._tree
+
+    def num_rounds(self):
+        return self._num_rounds
+
+    def fit_round(self, shards):
+        """Run one round of training.
+
+        Args:
+            shards (list[tuple]): One tuple (X, y) or (X, y, sample_weight) for each worker, with the
+                arguments expected by HoeffdingTree.partial_fit.
+        """
+        shards = [tuple(shard) + (None,) * (3 - len(shard)) for shard in shards]
+        workers = [self._tree.copy_structure() for _ in shards]
+        Xs, ys, sample_weights = zip(*shards) if shards else ((), (), ())
+        if self._executor is None:
+            results = map(_collect_shard_statistics, workers, Xs, ys, sample_weights)
+        else:
+            results = self._executor.map(_collect_shard_statistics, workers, Xs, ys, sample_weights)
+
+        leaf_statistics = []
+        for worker_statistics in results:
+            leaf_statistics.extend(worker_statistics)
+        self._tree.merge_leaf_statistics(leaf_statistics)
+        self._num_rounds += 1
+
+    def fit(self, X, y, sample_weight=None, num_workers=1, shard_size=10000):
+        """Train the tree on a batch of instances, split in consecutive shards of shard_size instances
+        that are given to num_workers workers per round.
+
+        Args:
+            X (numpy.ndarray): The attribute values of the instances, as in HoeffdingTree.partial_fit.
+            y (numpy.ndarray): The class value index of each instance.
+            sample_weight (numpy.ndarray): The weight of each instance. (default None, every weight is 1)
+            num_workers (int): The number of shards processed in each round. (default 1)
+            shard_size (int): The number of instances in each shard. (default 10000)
+        """
+        round_size = num_workers * shard_size
+        for start in range(0, len(X), round_size):
+            shards = []
+            for shard_start in range(start, min(start + round_size, len(X)), shard_size):
+                stop = shard_start + shard_size
+                weights = None if sample_weight is None else sample_weight[shard_start:stop]
+                shards.append((X[shard_start:stop], y[shard_start:stop], weights))
+            self.fit_round(shards)
@@ -1,14 +1,35 @@
 import math
 from operator import attrgetter
+from time import perf_counter
 
-from sklearn.preprocessing import normalize
+import numpy as np
 
+from core.checkpoint import CheckpointArrays, read_checkpoint, write_checkpoint
+from core.dataset import Dataset
+from core.instancebatch import InstanceBatch
+from core.instrumentation import Instrumentation
 from ht.activehnode import ActiveHNode
+from ht.nbnode import NBNode
+from ht.observerfactory import ObserverFactory
+from ht.nbnodeadaptive import NBNodeAdaptive
+from ht.classdistribution import ClassDistribution
+from ht.compiledtree import CompiledTree
+from ht.treesnapshot import TreeSnapshot
 from ht.ginisplitmetric import GiniSplitMetric
+from ht.hnode import HNode
 from ht.inactivehnode import InactiveHNode
 from ht.infogainsplitmetric import InfoGainSplitMetric
 from ht.splitnode import SplitNode
 
+# The nodes that can be saved in checkpoints, by their type
+_NODE_TYPES = {node_type.CHECKPOINT_TYPE: node_type
+               for node_type in (SplitNode, ActiveHNode, NBNode, NBNodeAdaptive, InactiveHNode)}
+# The counters of the learner saved in checkpoints, without the leading underscore of their attribute
+_CHECKPOINT_COUNTERS = ('active_leaf_count', 'inactive_leaf_count', 'decision_node_count', 'split_evaluation_count',
+                        'split_cache_hit_count', 'split_attempt_count', 'skipped_split_check_count',
+                        'instances_since_memory_estimate', 'memory_deactivation_count', 'memory_activation_count',
+                        'structure_version', 'update_version')
+
 
 class HoeffdingTree(object):
     """Main class for a Hoeffding Tree, also known as Very Fast Decision Tree (VFDT)."""
@@ -19,6 +40,26 @@ class HoeffdingTree(object):
         self._split_confidence = 0.0000001
         self._hoeffding_tie_threshold = 0.05
         self._min_frac_weight_for_two_branches_gain = 0.01
+        self._num_bins = 10
+        # Statistics kept for numeric attributes, by default and for each attribute that overrides it
+        self._numeric_observer = 0
+        self._max_bins = 64
+        self._attribute_observers = {}
+        self._observer_factory = ObserverFactory(self._num_bins)
+        self._split_reevaluation_fraction = 0.0
+        # Whether a leaf whose split attempt failed waits for the weight the Hoeffding bound needs to accept
+        # its best split, instead of only the grace period, before its next attempt
+        self._adaptive_split_checks = False
+        # Memory budget for the tree, in bytes (None for no limit), and how many instances are seen
+        # between two checks of the memory used
+        self._max_byte_size = None
+        self._memory_estimate_period = 1000000
+        # Executor for evaluating the attributes of a node in parallel, and the number of attributes from
+        # which it is used
+        self._split_executor = None
+        self._parallel_split_min_attributes = 100
+        # Timings of the phases of the learner, or None if instrumentation is disabled
+        self._instrumentation = None
 
         # Split metric stuff goes here
         self.GINI_SPLIT = 0
@@ -29,17 +70,206 @@ class HoeffdingTree(object):
         #self._selected_split_metric = self.GINI_SPLIT
         #self._split_metric = GiniSplitMetric()
 
+        # Numeric observers
+        self.GAUSSIAN_OBSERVER = 0
+        self.HISTOGRAM_OBSERVER = 1
+        self.QUANTILE_SKETCH_OBSERVER = 2
+
+        # Leaf prediction strategies
+        self.LEAF_MC = 0
+        self.LEAF_NB = 1
+        self.LEAF_NB_ADAPTIVE = 2
+
+        self._leaf_prediction = self.LEAF_MC
+        # The weight a naive Bayes leaf has to see before it predicts with naive Bayes
+        self._nb_threshold = 0
+
         self._active_leaf_count = 0
         self._inactive_leaf_count = 0
         self._decision_node_count = 0
 
+        # How many attribute split evaluations were computed or taken from the nodes' caches
+        self._split_evaluation_count = 0
+        self._split_cache_hit_count = 0
+        # How many split attempts were made, and how many the grace period alone would have added
+        self._split_attempt_count = 0
+        self._skipped_split_check_count = 0
+
+        self._instances_since_memory_estimate = 0
+        self._memory_deactivation_count = 0
+        self._memory_activation_count = 0
+
         # Print out leaf models in the case of naive Bayes or naive Bayes adaptive leaves 
         self._print_leaf_models = False
 
+        # Versions of the tree structure and of the node statistics, used to know when the compiled
+        # tree and its class distributions are out of date.
+        self._structure_version = 0
+        self._update_version = 0
+        self._compiled_tree = None
+        self._compiled_tree_version = -1
+        self._compiled_distributions = None
+        self._compiled_distributions_version = -1
+
+        # The last published prediction snapshot and how many instances are seen between two publications
+        # when the structure does not change, or None if snapshots are disabled
+        self._snapshot = None
+        self._snapshot_period = None
+        self._snapshot_structure_version = -1
+        self._instances_since_snapshot = 0
+        # Snapshot the generated predictor was made from, and the tree versions it was taken at
+        self._predictor_snapshot = None
+        self._predictor_versions = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # The compiled tree is rebuilt on demand, and the instances used to build the classifier are
+        # not part of the learner
+        state['_compiled_tree'] = None
+        state['_compiled_tree_version'] = -1
+        state['_compiled_distributions'] = None
+        state['_compiled_distributions_version'] = -1
+        # Snapshots are published again once the learner is loaded
+        state['_snapshot'] = None
+        state['_predictor_snapshot'] = None
+        state['_predictor_versions'] = None
+        # Executors and instrumentation hooks cannot be pickled and belong to the process that set them
+        state['_split_executor'] = None
+        state['_instrumentation'] = None
+        if self._header is not None:
+            state['_header'] = Dataset(self._header.get_attributes(), self._header.class_index(),
+                                       name=self._header.name())
+        return state
+
+    def save_checkpoint(self, filename):
+        """Save the complete state of the learner to a file, so that training can be resumed from it.
+        The checkpoint has the header, the tree with the statistics of all its nodes, the parameters and
+        the counters of the learner. The split executor, the instrumentation and the published snapshots
+        are not saved. See core.checkpoint for the format of the file.
+
+        Args:
+            filename (str): The name of the checkpoint file (including filepath).
+        """
+        arrays = CheckpointArrays()
+        nodes = []
+        if self._root is not None:
+            self._node_checkpoint_states(self._root, arrays, nodes)
+        state = {
+            'dataset': None if self._header is None else self._header.schema(),
+            'parameters': {
+                'grace_period': self._grace_period,
+                'split_confidence': self._split_confidence,
+                'hoeffding_tie_threshold': self._hoeffding_tie_threshold,
+                'min_frac_weight_for_two_branches_gain': self._min_frac_weight_for_two_branches_gain,
+                'num_bins': self._num_bins,
+                'numeric_observer': self._numeric_observer,
+                'max_bins': self._max_bins,
+                'attribute_observers': [[name, observer, max_bins]
+                                        for name, (observer, max_bins) in self._attribute_observers.items()],
+                'split_reevaluation_fraction': self._split_reevaluation_fraction,
+                'adaptive_split_checks': self._adaptive_split_checks,
+                'max_byte_size': self._max_byte_size,
+                'memory_estimate_period': self._memory_estimate_period,
+                'parallel_split_min_attributes': self._parallel_split_min_attributes,
+                'selected_split_metric': self._selected_split_metric,
+                'split_metric': self._split_metric.checkpoint_state(),
+                'leaf_prediction': self._leaf_prediction,
+                'nb_threshold': self._nb_threshold,
+                'print_leaf_models': self._print_leaf_models,
+                'snapshot_period': self._snapshot_period
+            },
+            'counters': {name: getattr(self, '_' + name) for name in _CHECKPOINT_COUNTERS},
+            # The root is the first node, and each split node gives the index of its children
+            'nodes': nodes
+        }
+        write_checkpoint(filename, state, arrays)
+
+    def _node_checkpoint_states(self, node, arrays, nodes):
+        # Adds the states of the subtree in depth-first order and returns the index of the node
+        index = len(nodes)
+        state = node.checkpoint_state(arrays)
+        nodes.append(state)
+        if isinstance(node, SplitNode):
+            state['children'] = [[branch, None if child is None else self._node_checkpoint_states(child, arrays, nodes)]
+                                 for branch, child in node.children.items()]
+        return index
+
+    @classmethod
+    def load_checkpoint(cls, filename):
+        """Load a learner saved by save_checkpoint. Training the loaded learner gives the same results as
+        continuing to train the learner that was saved. Loading only reads data from the file: unlike a
+        pickle, a checkpoint cannot make the loader run code.
+
+        Args:
+            filename (str): The name of the checkpoint file (including filepath).
+
+        Returns:
+            HoeffdingTree: The restored learner.
+
+        Raises:
+            ValueError: If the file is not a checkpoint, its format version is not supported or it is corrupt.
+        """
+        state, arrays = read_checkpoint(filename)
+        learner = cls()
+        try:
+            learner._restore_checkpoint_state(state, arrays)
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            raise ValueError('\'{0}\' is a corrupt checkpoint: {1!r}'.format(filename, e)) from e
+        if learner._snapshot_period is not None:
+            learner.publish_snapshot()
+        return learner
+
+    def _restore_checkpoint_state(self, state, arrays):
+        if state['dataset'] is not None:
+            self._header = Dataset.from_schema(state['dataset'])
+        parameters = state['parameters']
+        self._grace_period = parameters['grace_period']
+        self._split_confidence = parameters['split_confidence']
+        self._hoeffding_tie_threshold = parameters['hoeffding_tie_threshold']
+        self._min_frac_weight_for_two_branches_gain = parameters['min_frac_weight_for_two_branches_gain']
+        self._num_bins = parameters['num_bins']
+        self._numeric_observer = parameters['numeric_observer']
+        self._max_bins = parameters['max_bins']
+        self._attribute_observers = {name: (observer, max_bins)
+                                     for name, observer, max_bins in parameters['attribute_observers']}
+        self._update_observer_factory()
+        self._split_reevaluation_fraction = parameters['split_reevaluation_fraction']
+        self._adaptive_split_checks = parameters['adaptive_split_checks']
+        self._max_byte_size = parameters['max_byte_size']
+        self._memory_estimate_period = parameters['memory_estimate_period']
+        self._parallel_split_min_attributes = parameters['parallel_split_min_attributes']
+        self._selected_split_metric = parameters['selected_split_metric']
+        # The metric is only created by build_classifier, so it can differ from the selected one
+        split_metric = parameters['split_metric']
+        if split_metric['type'] == GiniSplitMetric.CHECKPOINT_TYPE:
+            self._split_metric = GiniSplitMetric()
+        elif split_metric['type'] == InfoGainSplitMetric.CHECKPOINT_TYPE:
+            self._split_metric = InfoGainSplitMetric(split_metric['min_frac_weight_for_two_branches'])
+        else:
+            raise ValueError('{0} is not a split metric.'.format(split_metric['type']))
+        self._leaf_prediction = parameters['leaf_prediction']
+        self._nb_threshold = parameters['nb_threshold']
+        self._print_leaf_models = parameters['print_leaf_models']
+        self._snapshot_period = parameters['snapshot_period']
+        for name in _CHECKPOINT_COUNTERS:
+            setattr(self, '_' + name, state['counters'][name])
+
+        nodes = []
+        for node_state in state['nodes']:
+            node_type = _NODE_TYPES.get(node_state['type'], None)
+            if node_type is None:
+                raise ValueError('{0} is not a type of node.'.format(node_state['type']))
+            nodes.append(node_type.from_checkpoint_state(node_state, arrays))
+        for node, node_state in zip(nodes, state['nodes']):
+            if isinstance(node, SplitNode):
+                for branch, child in node_state['children']:
+                    node.set_child(branch, None if child is None else nodes[child])
+        self._root = nodes[0] if nodes else None
+
     def __str__(self):
         if self._root is None:
             return 'No model built yet!'
-        return self._root.__str__(self._print_leaf_models)
+        return self._root.__str__(self._print_leaf_models, self._header.class_attribute())
 
     def reset(self):
         """Reset the classifier and set all node/leaf counters to zero."""
@@ -47,6 +277,22 @@ class HoeffdingTree(object):
         self._active_leaf_count = 0
         self._inactive_leaf_count = 0
         self._decision_node_count = 0
+        self._split_evaluation_count = 0
+        self._split_cache_hit_count = 0
+        self._split_attempt_count = 0
+        self._skipped_split_check_count = 0
+        self._instances_since_memory_estimate = 0
+        self._memory_deactivation_count = 0
+        self._memory_activation_count = 0
+        self._structure_version += 1
+
+    def get_header(self):
+        """Return the dataset describing the attributes of the instances the classifier is trained on.
+
+        Returns:
+            Dataset: The dataset, or None if the classifier was not built yet.
+        """
+        return self._header
 
     def set_minimum_fraction_of_weight_info_gain(self, m):
         self._min_frac_weight_for_two_branches_gain = m
@@ -54,6 +300,263 @@ class HoeffdingTree(object):
     def get_minimum_fraction_of_weight_info_gain(self):
         return self._min_frac_weight_for_two_branches_gain
 
+    def set_num_bins(self, b):
+        """Set the number of candidate split points evaluated for numeric attributes.
+        Only affects nodes created after the change."""
+        self._num_bins = b
+        self._update_observer_factory()
+
+    def get_num_bins(self):
+        return self._num_bins
+
+    def set_numeric_observer(self, observer, max_bins=64):
+        """Set the statistics kept for numeric attributes: a normal distribution per class value
+        (GAUSSIAN_OBSERVER, the default), an online histogram (HISTOGRAM_OBSERVER) or a quantile sketch
+        (QUANTILE_SKETCH_OBSERVER). Histograms and quantile sketches use at most max_bins bins, and propose
+        split points between them, which suits skewed and multimodal attributes. Only affects nodes created
+        after the change.
+
+        Args:
+            observer (int): The numeric observer.
+            max_bins (int): The largest number of bins of histograms and quantile sketches. (default 64)
+
+        Raises:
+            ValueError: If observer is not one of the numeric observers.
+        """
+        self._check_numeric_observer(observer)
+        self._numeric_observer = observer
+        self._max_bins = max_bins
+        self._update_observer_factory()
+
+    def get_numeric_observer(self):
+        return self._numeric_observer
+
+    def set_attribute_numeric_observer(self, att_name, observer, max_bins=64):
+        """Set the statistics kept for one numeric attribute, as in set_numeric_observer. Only affects nodes
+        created after the change.
+
+        Args:
+            att_name (str): The name of the attribute.
+            observer (int): The numeric observer, or None to use the one set by set_numeric_observer.
+            max_bins (int): The largest number of bins of histograms and quantile sketches. (default 64)
+
+        Raises:
+            ValueError: If observer is not one of the numeric observers.
+        """
+        if observer is None:
+            self._attribute_observers.pop(att_name, None)
+        else:
+            self._check_numeric_observer(observer)
+            self._attribute_observers[att_name] = (observer, max_bins)
+        self._update_observer_factory()
+
+    def get_attribute_numeric_observer(self, att_name):
+        return self._attribute_observers.get(att_name, (self._numeric_observer, self._max_bins))[0]
+
+    def _check_numeric_observer(self, observer):
+        if observer not in (self.GAUSSIAN_OBSERVER, self.HISTOGRAM_OBSERVER, self.QUANTILE_SKETCH_OBSERVER):
+            raise ValueError(
+                '{0} is not a numeric observer. Use GAUSSIAN_OBSERVER, HISTOGRAM_OBSERVER or '
+                'QUANTILE_SKETCH_OBSERVER.'.format(observer))
+
+    def _update_observer_factory(self):
+        # Nodes keep the factory they were created with
+        self._observer_factory = ObserverFactory(
+            self._num_bins, self._numeric_observer, self._max_bins, self._attribute_observers)
+
+    def set_split_reevaluation_fraction(self, f):
+        """Set the fraction of its total weight a node has to grow by before the best split of an attribute
+        is computed again. With 0 (the default) every attribute is evaluated at every split attempt; larger
+        values reuse the last evaluation of attributes that are not among the two best candidates."""
+        self._split_reevaluation_fraction = f
+
+    def get_split_reevaluation_fraction(self):
+        return self._split_reevaluation_fraction
+
+    def set_adaptive_split_checks(self, a):
+        """Set whether split checks are scheduled adaptively. When enabled, a leaf whose split attempt fails
+        waits until it has seen the weight at which the Hoeffding bound would fall below the merit gap
+        between its two best splits, or below the tie threshold, before its next attempt, assuming the gap
+        stays the same. It never waits less than the grace period. Disabled by default."""
+        self._adaptive_split_checks = a
+
+    def get_adaptive_split_checks(self):
+        return self._adaptive_split_checks
+
+    def set_leaf_prediction_strategy(self, strategy):
+        """Set how leaves predict: with the majority class (LEAF_MC, the default), with naive Bayes (LEAF_NB)
+        or with whichever of the two has been more accurate at the leaf (LEAF_NB_ADAPTIVE).
+        Only affects leaves created after the change.
+
+        Args:
+            strategy (int): The leaf prediction strategy.
+
+        Raises:
+            ValueError: If strategy is not one of the leaf prediction strategies.
+        """
+        if strategy not in (self.LEAF_MC, self.LEAF_NB, self.LEAF_NB_ADAPTIVE):
+            raise ValueError(
+                '{0} is not a leaf prediction strategy. Use LEAF_MC, LEAF_NB or LEAF_NB_ADAPTIVE.'
+                .format(strategy))
+        self._leaf_prediction = strategy
+
+    def get_leaf_prediction_strategy(self):
+        return self._leaf_prediction
+
+    def set_naive_bayes_prediction_threshold(self, t):
+        """Set the weight a naive Bayes leaf has to see before it predicts with naive Bayes instead of the
+        majority class. Only affects LEAF_NB leaves created after the change."""
+        self._nb_threshold = t
+
+    def get_naive_bayes_prediction_threshold(self):
+        return self._nb_threshold
+
+    def set_print_leaf_models(self, p):
+        """Set whether the string representation of the tree includes the models of naive Bayes leaves."""
+        self._print_leaf_models = p
+
+    def get_print_leaf_models(self):
+        return self._print_leaf_models
+
+    def get_split_evaluation_stats(self):
+        """Return how many attribute split evaluations were computed and how many were taken from the cache
+        since the classifier was built, and how many split attempts were made and skipped.
+
+        Returns:
+            dict: The number of 'evaluations' and 'cache_hits', the 'hit_rate' of the cache, the number of
+                'split_attempts', and the number of 'skipped_split_checks', the attempts that the grace period
+                alone would have made but adaptive split checks postponed.
+        """
+        lookups = self._split_evaluation_count + self._split_cache_hit_count
+        return {
+            'evaluations': self._split_evaluation_count,
+            'cache_hits': self._split_cache_hit_count,
+            'hit_rate': self._split_cache_hit_count / lookups if lookups > 0 else 0.0,
+            'split_attempts': self._split_attempt_count,
+            'skipped_split_checks': self._skipped_split_check_count
+        }
+
+    def set_split_executor(self, executor, min_attributes=100):
+        """Set an executor to evaluate the split candidates of the attributes of a node in parallel.
+        It is only used for datasets with at least min_attributes attributes (not counting the class), since
+        for fewer attributes the overhead outweighs the gain. The splits chosen are the same as when the
+        attributes are evaluated one after another.
+
+        Args:
+            executor (concurrent.futures.Executor): A thread or process pool, or None to evaluate the
+                attributes serially. The tree does not shut it down.
+            min_attributes (int): The number of attributes from which the executor is used. (default 100)
+        """
+        self._split_executor = executor
+        self._parallel_split_min_attributes = min_attributes
+
+    def get_split_executor(self):
+        return self._split_executor
+
+    def enable_instrumentation(self, hook=None):
+        """Start timing the phases of the learner: routing instances to leaves ('routing'), updating the
+        statistics of the leaves ('update'), evaluating split candidates ('split_evaluation') and computing
+        the class probabilities of predictions ('prediction').
+
+        Args:
+            hook (callable): A function called with the phase name and the time in seconds of every timed
+                call. (default None)
+
+        Returns:
+            Instrumentation: The object where the timings are recorded.
+        """
+        self._instrumentation = Instrumentation(hook)
+        return self._instrumentation
+
+    def disable_instrumentation(self):
+        """Stop timing the phases of the learner. Without instrumentation the only cost is one check per phase."""
+        self._instrumentation = None
+
+    def get_instrumentation(self):
+        """Return the object where the timings are recorded, or None if instrumentation is disabled."""
+        return self._instrumentation
+
+    def enable_snapshots(self, period=1000):
+        """Start publishing immutable prediction snapshots, which other threads can use to predict without
+        locking while this one trains the tree. A new snapshot is published at the end of every update that
+        changes the structure of the tree, and after every period instances otherwise, so the class
+        probabilities of the leaves stay recent.
+
+        Args:
+            period (int): The number of instances seen between two publications when the structure does not
+                change. (default 1000)
+
+        Returns:
+            TreeSnapshot: The first snapshot, or None if the classifier was not built yet.
+        """
+        self._snapshot_period = period
+        if self._header is not None:
+            self.publish_snapshot()
+        return self._snapshot
+
+    def disable_snapshots(self):
+        """Stop publishing prediction snapshots."""
+        self._snapshot_period = None
+        self._snapshot = None
+
+    def snapshot(self):
+        """Return the last published prediction snapshot, or None if snapshots are disabled or the classifier
+        was not built yet. Can be called from any thread."""
+        return self._snapshot
+
+    def publish_snapshot(self):
+        """Publish a snapshot of the tree as it is now. Should only be called from the thread that trains
+        the tree.
+
+        Returns:
+            TreeSnapshot: The new snapshot.
+        """
+        version = self._snapshot.version + 1 if self._snapshot is not None else 0
+        self._snapshot = TreeSnapshot(self._root, self._header, version)
+        self._snapshot_structure_version = self._structure_version
+        self._instances_since_snapshot = 0
+        return self._snapshot
+
+    def _count_instances_for_snapshot(self, num_instances):
+        if self._snapshot_period is None:
+            return
+        self._instances_since_snapshot += num_instances
+        if self._snapshot_structure_version != self._structure_version or \
+                self._instances_since_snapshot >= self._snapshot_period:
+            self.publish_snapshot()
+
+    def set_max_byte_size(self, b):
+        """Set the memory budget of the tree, in bytes, or None for no limit.
+        When the estimated size of the tree goes over the budget, the least promising active leaves are
+        deactivated, and they are activated again once they become promising enough to fit in it."""
+        self._max_byte_size = b
+
+    def get_max_byte_size(self):
+        return self._max_byte_size
+
+    def set_memory_estimate_period(self, p):
+        """Set how many instances are seen between two checks of the memory used by the tree."""
+        self._memory_estimate_period = p
+
+    def get_memory_estimate_period(self):
+        return self._memory_estimate_period
+
+    def get_memory_stats(self):
+        """Return the estimated memory used by the tree and the effect of the memory budget on its leaves.
+
+        Returns:
+            dict: The estimated 'byte_size' of the tree, its 'max_byte_size', the number of 'active_leaves' and
+                'inactive_leaves', and how many 'deactivations' and 'activations' the memory budget caused.
+        """
+        return {
+            'byte_size': self.estimate_model_byte_size(),
+            'max_byte_size': self._max_byte_size,
+            'active_leaves': self._active_leaf_count,
+            'inactive_leaves': self._inactive_leaf_count,
+            'deactivations': self._memory_deactivation_count,
+            'activations': self._memory_activation_count
+        }
+
     def set_grace_period(self, grace):
         self._grace_period = grace
 
@@ -100,59 +603,573 @@ class HoeffdingTree(object):
 
         for i in range(dataset.num_instances()):
             self.update_classifier(dataset.instance(i))
+        if self._snapshot_period is not None:
+            self.publish_snapshot()
 
     def update_classifier(self, instance):
-        """Update the classifier with the given instance.
+        """Update the classifier with the given instance, or with all the instances of a batch.
 
         Args:
             instance (Instance): The new instance to be used to train the classifier.
+            instance (InstanceBatch): The new instances to be used to train the classifier.
         """
+        if isinstance(instance, InstanceBatch):
+            if self._header is None:
+                self._header = instance.dataset
+            self._update_batch(instance.values, instance.weights)
+            return
         if instance.class_is_missing():
             return
+        self._update_version += 1
         if self._root is None:
-            self._root = ActiveHNode()
+            self._root = self._new_active_node()
+            self._active_leaf_count = 1
+            self._structure_version += 1
 
+        timer = self._instrumentation
+        if timer is not None:
+            start = perf_counter()
         l = self._root.leaf_for_instance(instance, None, None)
+        if timer is not None:
+            timer.record('routing', perf_counter() - start)
         actual_node = l.the_node
         if actual_node is None:
-            actual_node = ActiveHNode()
+            actual_node = self._new_active_node()
             l.parent_node.set_child(l.parent_branch, actual_node)
+            self._active_leaf_count += 1
+            self._structure_version += 1
 
-        # ActiveHNode should be changed to a LearningNode interface if Naive Bayes nodes are used
+        # Naive Bayes leaves are ActiveHNodes too
+        if timer is not None:
+            start = perf_counter()
         if isinstance(actual_node, InactiveHNode):
             actual_node.update_node(instance)
         if isinstance(actual_node, ActiveHNode):
             actual_node.update_node(instance)
+        if timer is not None:
+            timer.record('update', perf_counter() - start)
+        if isinstance(actual_node, ActiveHNode):
             total_weight = actual_node.total_weight()
-            if total_weight - actual_node.weight_seen_at_last_split_eval > self._grace_period:
+            if total_weight - actual_node.weight_seen_at_last_split_eval > self._split_eval_interval(actual_node):
                 self.try_split(actual_node, l.parent_node, l.parent_branch)
                 actual_node.weight_seen_at_last_split_eval = total_weight
+        self._count_instances_for_memory_estimate(1)
+        self._count_instances_for_snapshot(1)
+
+    def partial_fit(self, X, y, sample_weight=None, dataset=None):
+        """Update the classifier with a batch of instances.
+        The resulting tree is the same as the one built by calling update_classifier on each row, in order.
+
+        Args:
+            X (numpy.ndarray): 2-D array with one row per instance and one column for each attribute of the
+                dataset except the class, in the dataset's order. Nominal values are given by their index
+                in the attribute's definition and missing values by NaN.
+            y (numpy.ndarray): The index of the class value of each instance. Missing classes are given by NaN.
+            sample_weight (numpy.ndarray): The weight of each instance. (default None, every weight is 1)
+            dataset (Dataset): The dataset describing the attributes of the instances. Only required if
+                the classifier was not built with a dataset yet. (default None)
+
+        Raises:
+            ValueError: If there is no dataset describing the instances, if the arrays do not match it or if y
+                has a value that is not the index of a class value.
+        """
+        if dataset is not None:
+            self._header = dataset
+        if self._header is None:
+            raise ValueError('A dataset describing the attributes is required to update the classifier.')
+        class_index = self._header.class_index()
+        if class_index < 0:
+            raise ValueError('Class attribute is not set.')
+
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        num_features = self._header.num_attributes() - 1
+        if X.ndim != 2 or X.shape[1] != num_features:
+            raise ValueError(
+                'X should be a 2-D array with {0} columns, one for each attribute except the class.'
+                .format(num_features))
+        if y.shape != (X.shape[0],):
+            raise ValueError('y should have one class value for each row of X.')
+        num_classes = self._header.class_attribute().num_values()
+        classes = y[~np.isnan(y)]
+        if not np.all((classes >= 0) & (classes < num_classes) & (classes == np.floor(classes))):
+            raise ValueError(
+                'y should only have the index of a class value, an integer from 0 to {0}, or NaN.'
+                .format(num_classes - 1))
+        if sample_weight is None:
+            weights = np.ones(X.shape[0])
+        else:
+            weights = np.asarray(sample_weight, dtype=np.float64)
+            if weights.shape != (X.shape[0],):
+                raise ValueError('sample_weight should have one weight for each row of X.')
+
+        self._update_batch(np.insert(X, class_index, y, axis=1), weights)
+
+    def _update_batch(self, values, weights):
+        """Update the classifier with a batch of instances given by their attribute values.
+
+        Args:
+            values (numpy.ndarray): 2-D array with the values of all attributes of the instances, one per row.
+            weights (numpy.ndarray): The weight of each instance.
+        """
+        present = ~np.isnan(values[:, self._header.class_index()])
+        if not present.all():
+            values = values[present]
+            weights = weights[present]
+        if len(values) == 0:
+            return
+        self._update_version += 1
+        if self._root is None:
+            self._root = self._new_active_node()
+            self._active_leaf_count = 1
+            self._structure_version += 1
+
+        if self._max_byte_size is None:
+            self._update_subtree_batch(self._root, values, weights, None, None)
+        else:
+            # The memory is checked after the same instances as when updating one instance at a time
+            start = 0
+            while start < len(values):
+                stop = min(len(values),
+                           start + self._memory_estimate_period - self._instances_since_memory_estimate)
+                self._update_subtree_batch(self._root, values[start:stop], weights[start:stop], None, None)
+                self._count_instances_for_memory_estimate(stop - start)
+                start = stop
+        self._count_instances_for_snapshot(len(values))
+
+    def _update_subtree_batch(self, node, values, weights, parent, parent_branch):
+        if isinstance(node, SplitNode):
+            timer = self._instrumentation
+            if timer is not None:
+                start = perf_counter()
+            branches = node.split.branches_for_batch(values, self._header)
+            if timer is not None:
+                timer.record('routing', perf_counter() - start)
+            for branch, rows in branches.items():
+                if len(rows) == 0:
+                    continue
+                child = node.children.get(branch, None)
+                if child is None:
+                    child = self._new_active_node()
+                    node.set_child(branch, child)
+                    self._active_leaf_count += 1
+                    self._structure_version += 1
+                self._update_subtree_batch(child, values[rows], weights[rows], node, branch)
+        elif isinstance(node, InactiveHNode):
+            self._update_leaf_batch(node, values, weights)
+        elif isinstance(node, ActiveHNode):
+            self._update_active_leaf_batch(node, values, weights, parent, parent_branch)
+
+    def _update_active_leaf_batch(self, node, values, weights, parent, parent_branch):
+        total_weights = self._total_weights_after_each(node, values[:, self._header.class_index()], weights)
+
+        start = 0
+        while start < len(values):
+            # The instances up to the one that makes the node exceed the grace period go in one update
+            last = node.weight_seen_at_last_split_eval
+            grace_period = self._split_eval_interval(node)
+            stop = self._first_exceeding_grace_period(total_weights, last, start, grace_period)
+            if stop >= len(values):
+                self._update_leaf_batch(node, values[start:], weights[start:])
+                return
+
+            self._update_leaf_batch(node, values[start:stop + 1], weights[start:stop + 1])
+            total_weight = node.total_weight()
+            self.try_split(node, parent, parent_branch)
+            node.weight_seen_at_last_split_eval = total_weight
+            start = stop + 1
+
+            # The remaining instances go to whatever replaced the node, if it was split or deactivated
+            replacement = self._root if parent is None else parent.children.get(parent_branch, None)
+            if replacement is not node:
+                self._update_subtree_batch(replacement, values[start:], weights[start:], parent, parent_branch)
+                return
+
+    def _count_instances_for_memory_estimate(self, num_instances):
+        if self._max_byte_size is None:
+            return
+        self._instances_since_memory_estimate += num_instances
+        if self._instances_since_memory_estimate >= self._memory_estimate_period:
+            self.enforce_tracker_limit()
+            self._instances_since_memory_estimate = 0
+
+    def _find_learning_nodes(self):
+        """Return the leaves of the tree as tuples (node, parent, parent branch)."""
+        learning_nodes = []
+        pending = [(self._root, None, None)]
+        while pending:
+            node, parent, parent_branch = pending.pop()
+            if isinstance(node, SplitNode):
+                for branch, child in node.children.items():
+                    if child is not None:
+                        pending.append((child, node, branch))
+            elif node is not None:
+                learning_nodes.append((node, parent, parent_branch))
+        return learning_nodes
+
+    def measure_tree_size(self):
+        """Return the number of nodes in the tree, leaves included."""
+        return self._decision_node_count + self._active_leaf_count + self._inactive_leaf_count
+
+    def measure_num_leaves(self):
+        return self._active_leaf_count + self._inactive_leaf_count
+
+    def measure_tree_depth(self):
+        """Return the number of split nodes on the longest path from the root to a leaf."""
+        depth = 0
+        pending = [(self._root, 0)]
+        while pending:
+            node, node_depth = pending.pop()
+            if isinstance(node, SplitNode):
+                pending.extend((child, node_depth + 1) for child in node.children.values())
+            elif node is not None:
+                depth = max(depth, node_depth)
+        return depth
+
+    def estimate_model_byte_size(self):
+        """Return an estimate of the memory used by all the nodes of the tree, in bytes."""
+        size = 0
+        pending = [self._root]
+        while pending:
+            node = pending.pop()
+            if node is None:
+                continue
+            size += node.byte_size()
+            if isinstance(node, SplitNode):
+                pending.extend(node.children.values())
+        return size
+
+    def copy_structure(self):
+        """Return a copy of the learner with the same splits and parameters but with empty leaves.
+        The copy never splits its leaves: it is meant to collect statistics for a shard of the data, which
+        are then given back to this learner with merge_leaf_statistics.
+
+        Returns:
+            HoeffdingTree: The copy of the learner.
+
+        Raises:
+            ValueError: If the classifier was not built yet.
+        """
+        if self._header is None:
+            raise ValueError('The classifier needs to be built before its structure can be copied.')
+        worker = self.__class__.__new__(self.__class__)
+        worker.__dict__.update(self.__getstate__())
+        worker._split_executor = None
+        worker._max_byte_size = None
+        worker._grace_period = math.inf
+        worker._root = self._copy_node_structure(self._root)
+        return worker
+
+    def _copy_node_structure(self, node):
+        if node is None:
+            return None
+        if isinstance(node, SplitNode):
+            split_node = SplitNode(ClassDistribution(), node.split)
+            for branch, child in node.children.items():
+                split_node.set_child(branch, self._copy_node_structure(child))
+            return split_node
+        if isinstance(node, InactiveHNode):
+            return InactiveHNode(ClassDistribution())
+        return self._new_active_node()
+
+    def leaf_statistics(self):
+        """Return the leaves that have seen some instances, with the path of branches that leads to them
+        from the root.
+
+        Returns:
+            list[tuple]: Tuples (path, leaf), where path is a tuple of branches.
+        """
+        leaves = []
+        pending = [((), self._root)]
+        while pending:
+            path, node = pending.pop()
+            if isinstance(node, SplitNode):
+                for branch, child in reversed(list(node.children.items())):
+                    pending.append((path + (branch,), child))
+            elif node is not None and node.total_weight() > 0:
+                leaves.append((path, node))
+        return leaves
+
+    def merge_leaf_statistics(self, leaf_statistics):
+        """Merge the leaves collected by copies of the learner made with copy_structure into the leaves of
+        this learner, and try to split the active leaves that went past the grace period.
+
+        Args:
+            leaf_statistics (list[tuple]): Tuples (path, leaf) as returned by leaf_statistics.
+
+        Raises:
+            ValueError: If a path does not lead to a leaf of this learner.
+        """
+        if self._root is None:
+            self._root = self._new_active_node()
+            self._active_leaf_count = 1
+            self._structure_version += 1
+        # Dict of tuples (path, (leaf, parent, parent branch)), in the order the leaves are first merged
+        merged = {}
+        for path, other in leaf_statistics:
+            parent = None
+            parent_branch = None
+            node = self._root
+            for branch in path:
+                if not isinstance(node, SplitNode):
+                    raise ValueError('Path {0} does not lead to a leaf of the tree.'.format(path))
+                parent = node
+                parent_branch = branch
+                node = node.children.get(branch, None)
+                if node is None:
+                    node = self._new_active_node()
+                    parent.set_child(branch, node)
+                    self._active_leaf_count += 1
+                    self._structure_version += 1
+            if isinstance(node, SplitNode):
+                raise ValueError('Path {0} does not lead to a leaf of the tree.'.format(path))
+            node.merge(other)
+            merged[path] = (node, parent, parent_branch)
+        self._update_version += 1
+
+        for node, parent, parent_branch in merged.values():
+            if isinstance(node, ActiveHNode):
+                total_weight = node.total_weight()
+                if total_weight - node.weight_seen_at_last_split_eval > self._split_eval_interval(node):
+                    self.try_split(node, parent, parent_branch)
+                    node.weight_seen_at_last_split_eval = total_weight
+        if self._max_byte_size is not None:
+            self.enforce_tracker_limit()
+        if self._snapshot_period is not None:
+            self.publish_snapshot()
+
+    def enforce_tracker_limit(self):
+        """Deactivate the least promising active leaves, and activate the most promising inactive ones, so
+        that the estimated size of the tree fits in the memory budget.
+        The promise of a leaf is its weight times its error estimate, that is, the weight of the instances
+        that do not belong to its majority class.
+        """
+        if self._max_byte_size is None or self._root is None:
+            return
+        learning_nodes = self._find_learning_nodes()
+        leaves_size = sum(node.byte_size() for node, _, _ in learning_nodes)
+        # Leaves are assumed to cost the average size of their kind, so the cost of activating an inactive
+        # leaf can be estimated. Without its attribute statistics, a leaf costs as much as an inactive one.
+        inactive_size = sum(HNode.byte_size(node) for node, _, _ in learning_nodes) / len(learning_nodes)
+        active_sizes = [node.byte_size() for node, _, _ in learning_nodes if isinstance(node, ActiveHNode)]
+        active_size = sum(active_sizes) / len(active_sizes) if active_sizes else inactive_size
+        available = self._max_byte_size - (self.estimate_model_byte_size() - leaves_size)
+
+        max_active = 0
+        while max_active < len(learning_nodes) and \
+                (max_active + 1) * active_size + (len(learning_nodes) - max_active - 1) * inactive_size <= available:
+            max_active += 1
+
+        learning_nodes.sort(key=lambda n: n[0].total_weight() - float(n[0].class_distribution.weights.max(initial=0.0)),
+                            reverse=True)
+        for i, (node, parent, parent_branch) in enumerate(learning_nodes):
+            if i < max_active:
+                if isinstance(node, InactiveHNode):
+                    self.activate_node(node, parent, parent_branch)
+                    self._memory_activation_count += 1
+            elif isinstance(node, ActiveHNode):
+                self.deactivate_node(node, parent, parent_branch)
+                self._memory_deactivation_count += 1
+
+    def _update_leaf_batch(self, node, values, weights):
+        timer = self._instrumentation
+        if timer is None:
+            node.update_node_batch(values, weights, self._header)
+            return
+        start = perf_counter()
+        node.update_node_batch(values, weights, self._header)
+        timer.record('update', perf_counter() - start)
+
+    def _total_weights_after_each(self, node, class_values, weights):
+        """Return the total weight a node would have after each instance of a batch updates it,
+        computed with the same floating-point operations as updating it one instance at a time.
+        """
+        increments = node.class_distribution.increments(class_values, weights)
+        return np.add.accumulate(np.concatenate(([node.total_weight()], increments)))[1:]
+
+    def _first_exceeding_grace_period(self, total_weights, last, start, grace_period):
+        """Return the position of the first instance from start on after which the node has seen more than
+        the grace period since the last split evaluation, or the number of instances if there is none.
+        """
+        # Total weights never decrease, so a binary search only needs the exact test to settle the boundary
+        stop = start + int(np.searchsorted(total_weights[start:], last + grace_period, side='left'))
+        while stop > start and total_weights[stop - 1] - last > grace_period:
+            stop -= 1
+        while stop < len(total_weights) and not total_weights[stop] - last > grace_period:
+            stop += 1
+        return stop
+
+    def _split_eval_interval(self, node):
+        """Return the weight an active node has to see since its last split evaluation before the next one."""
+        if self._adaptive_split_checks:
+            return max(self._grace_period, node.split_eval_interval)
+        return self._grace_period
+
+    def _schedule_split_eval(self, node, merit_gap, metric_max):
+        """Set the weight a node has to see before its next split evaluation after an unsuccessful one.
+        The Hoeffding bound falls below the merit gap between the two best splits, or below the tie threshold,
+        once the node has seen range^2 * ln(1 / confidence) / (2 * max(gap, tie threshold)^2) weight.
+        """
+        # A gap of NaN, between two splits of merit -inf, falls back to the tie threshold
+        gap = merit_gap if merit_gap > self._hoeffding_tie_threshold else self._hoeffding_tie_threshold
+        if gap <= 0:
+            node.split_eval_interval = 0
+            return
+        needed_weight = (metric_max * metric_max) * math.log(1.0 / self._split_confidence) / (2.0 * gap * gap)
+        node.split_eval_interval = max(0.0, needed_weight - node.total_weight())
 
     def distribution_for_instance(self, instance):
-        """Return the class probabilities for an instance.
+        """Return the class probabilities for an instance, or for all the instances of a batch.
 
         Args:
             instance (Instance): The instance to calculate the class probabilites for.
+            instance (InstanceBatch): The instances to calculate the class probabilites for.
 
         Returns:
-            list[float]: The class probabilities.
+            list[float]: The class probabilities, if given an Instance.
+            numpy.ndarray: 2-D array with the class probabilities of each instance, if given an InstanceBatch.
         """
+        if isinstance(instance, InstanceBatch):
+            if self._header is None:
+                raise ValueError('The classifier needs to be built before it can make predictions.')
+            return self._predict_values(instance.values)
         class_attribute = instance.class_attribute()
 
         if self._root is not None:
+            timer = self._instrumentation
+            if timer is not None:
+                start = perf_counter()
             l = self._root.leaf_for_instance(instance, None, None)
+            if timer is not None:
+                now = perf_counter()
+                timer.record('routing', now - start)
+                start = now
             actual_node = l.the_node
             if actual_node is None:
                 actual_node = l.parent_node
             pred = actual_node.get_distribution(instance, class_attribute)
+            if timer is not None:
+                timer.record('prediction', perf_counter() - start)
         else:
             # All class values equally likely
-            pred = [1] * class_attribute.num_values()
-            pred = normalize([pred], axis=1, norm='l1')
-            pred = pred.ravel().tolist()
+            num_classes = class_attribute.num_values()
+            pred = [1.0 / num_classes] * num_classes
+
+        return pred
+
+    def _new_active_node(self):
+        if self._leaf_prediction == self.LEAF_NB:
+            return NBNode(self._num_bins, self._nb_threshold, self._observer_factory)
+        if self._leaf_prediction == self.LEAF_NB_ADAPTIVE:
+            return NBNodeAdaptive(self._num_bins, self._observer_factory)
+        return ActiveHNode(self._num_bins, self._observer_factory)
+
+    def predict_proba(self, X):
+        """Return the class probabilities for a batch of instances.
+        The tree is compiled into flat arrays the first time it is used for prediction after its structure
+        changes, and all the instances are routed through it at once.
+
+        Args:
+            X (numpy.ndarray): 2-D array with one row per instance and one column for each attribute of the
+                dataset except the class, in the dataset's order. Nominal values are given by their index
+                in the attribute's definition and missing values by NaN.
 
+        Returns:
+            numpy.ndarray: 2-D array with the class probabilities of each instance, one row per instance.
+
+        Raises:
+            ValueError: If the classifier has no dataset yet or if X does not match it.
+        """
+        if self._header is None:
+            raise ValueError('The classifier needs to be built before it can make predictions.')
+        X = np.asarray(X, dtype=np.float64)
+        num_features = self._header.num_attributes() - 1
+        if X.ndim != 2 or X.shape[1] != num_features:
+            raise ValueError(
+                'X should be a 2-D array with {0} columns, one for each attribute except the class.'
+                .format(num_features))
+        return self._predict_values(X, self._header.class_index())
+
+    def predict(self, X):
+        """Return the most likely class for a batch of instances.
+
+        Args:
+            X (numpy.ndarray): 2-D array with one row per instance, as in predict_proba.
+
+        Returns:
+            numpy.ndarray: The index of the predicted class value of each instance.
+        """
+        return np.argmax(self.predict_proba(X), axis=1)
+
+    def _predict_values(self, values, class_index=None):
+        num_classes = self._header.class_attribute().num_values()
+        if self._root is None:
+            # All class values equally likely
+            return np.full((values.shape[0], num_classes), 1.0 / num_classes)
+        timer = self._instrumentation
+        if timer is not None:
+            start = perf_counter()
+        compiled = self.compile()
+        nodes = compiled.route(values, class_index)
+        if timer is not None:
+            now = perf_counter()
+            timer.record('routing', now - start)
+            start = now
+        if self._compiled_distributions_version != self._update_version or \
+                self._compiled_distributions.shape[1] != num_classes:
+            self._compiled_distributions = compiled.distributions(self._header.class_attribute())
+            self._compiled_distributions_version = self._update_version
+        pred = self._compiled_distributions[nodes]
+        if compiled.has_naive_bayes_leaves():
+            # Naive Bayes leaves predict for each instance instead of with one distribution per node
+            for node_id in np.unique(nodes):
+                node = compiled.nodes[node_id]
+                if isinstance(node, NBNode):
+                    rows = np.flatnonzero(nodes == node_id)
+                    features = values[rows]
+                    if class_index is None:
+                        features = np.delete(features, self._header.class_index(), axis=1)
+                    pred[rows] = node.get_distributions(features, self._header)
+        if timer is not None:
+            timer.record('prediction', perf_counter() - start)
         return pred
 
+    def generate_predictor(self):
+        """Return a generated Python function that predicts the class probabilities of one instance with the
+        tree as it is now. The function is only generated again after the tree changes.
+
+        The function takes a sequence with the attribute values of the instance except the class, as in a
+        row of predict_proba, and returns a tuple with the class probabilities. Unlike
+        distribution_for_instance, it keeps predicting with the tree as it was when it was generated.
+
+        Returns:
+            function: The predictor.
+
+        Raises:
+            ValueError: If the classifier has no dataset yet.
+        """
+        if self._header is None:
+            raise ValueError('The classifier needs to be built before it can make predictions.')
+        versions = (self._structure_version, self._update_version)
+        if self._predictor_snapshot is None or self._predictor_versions != versions:
+            self._predictor_snapshot = TreeSnapshot(self._root, self._header, self._update_version)
+            self._predictor_versions = versions
+        return self._predictor_snapshot.predictor()
+
+    def compile(self):
+        """Return the tree compiled into flat arrays, compiling it again only if its structure changed.
+
+        Returns:
+            CompiledTree: The compiled tree, or None if no model was built yet.
+        """
+        if self._root is None:
+            return None
+        if self._compiled_tree is None or self._compiled_tree_version != self._structure_version:
+            self._compiled_tree = CompiledTree(self._root, self._header)
+            self._compiled_tree_version = self._structure_version
+            self._compiled_distributions_version = -1
+        return self._compiled_tree
+
     def deactivate_node(self, to_deactivate, parent, parent_branch):
         """Prevent supplied node of growing.
 
@@ -167,6 +1184,7 @@ class HoeffdingTree(object):
             self._root = leaf
         else:
             parent.set_child(parent_branch, leaf)
+        self._structure_version += 1
 
         self._active_leaf_count -= 1
         self._inactive_leaf_count += 1
@@ -179,13 +1197,15 @@ class HoeffdingTree(object):
             parent (SplitNode): The parent of the node.
             parent_branch (str): The branch leading from the parent to the node.
         """
-        leaf = ActiveHNode()
+        leaf = self._new_active_node()
         leaf.class_distribution = to_activate.class_distribution
+        leaf.weight_seen_at_last_split_eval = leaf.total_weight()
 
         if parent is None:
             self._root = leaf
         else:
             parent.set_child(parent_branch, leaf)
+        self._structure_version += 1
 
         self._active_leaf_count += 1
         self._inactive_leaf_count -= 1
@@ -198,9 +1218,29 @@ class HoeffdingTree(object):
             parent (SplitNode): The parent of the node.
             parent_branch (str): The branch leading from the parent to the node.
         """
+        self._split_attempt_count += 1
+        if self._adaptive_split_checks and self._grace_period > 0:
+            # The attempts the grace period alone would have made since the last one
+            elapsed = node.total_weight() - node.weight_seen_at_last_split_eval
+            self._skipped_split_check_count += max(0, int(elapsed // self._grace_period) - 1)
+        node.split_eval_interval = 0
         # Non-pure?
         if node.num_entries_in_class_distribution() > 1:
-            best_splits = node.get_possible_splits(self._split_metric)
+            evaluations = node.num_split_evaluations
+            cache_hits = node.num_split_cache_hits
+            executor = None
+            if self._split_executor is not None and \
+                    self._header.num_attributes() - 1 >= self._parallel_split_min_attributes:
+                executor = self._split_executor
+            timer = self._instrumentation
+            if timer is not None:
+                start = perf_counter()
+            best_splits = node.get_possible_splits(
+                self._split_metric, self._split_reevaluation_fraction, executor)
+            if timer is not None:
+                timer.record('split_evaluation', perf_counter() - start)
+            self._split_evaluation_count += node.num_split_evaluations - evaluations
+            self._split_cache_hit_count += node.num_split_cache_hits - cache_hits
             best_splits.sort(key=attrgetter('split_merit'))
 
             do_split = False
@@ -208,13 +1248,15 @@ class HoeffdingTree(object):
                 do_split = len(best_splits) > 0
             else:
                 # Compute Hoeffding bound
-                metric_max = self._split_metric.get_metric_range(node.class_distribution)
+                metric_max = self._split_metric.get_metric_range(node.class_distribution.weights)
                 hoeffding_bound = self.compute_hoeffding_bound(
                     metric_max, self._split_confidence, node.total_weight())
                 best = best_splits[len(best_splits) - 1]
                 second_best = best_splits[len(best_splits) - 2]
                 if best.split_merit - second_best.split_merit > hoeffding_bound or hoeffding_bound < self._hoeffding_tie_threshold:
                     do_split = True
+                elif self._adaptive_split_checks:
+                    self._schedule_split_eval(node, best.split_merit - second_best.split_merit, metric_max)
 
             if do_split:
                 best = best_splits[len(best_splits) - 1]
@@ -222,22 +1264,14 @@ class HoeffdingTree(object):
                     # preprune
                     self.deactivate_node(node, parent, parent_branch)
                 else:
+                    best.split_test.bind(self._header)
                     new_split = SplitNode(node.class_distribution, best.split_test)
 
                     for i in range(best.num_splits()):
-                        new_child = ActiveHNode()
-                        new_child.class_distribution = best.post_split_class_distributions[i]
+                        new_child = self._new_active_node()
+                        new_child.class_distribution = ClassDistribution(best.post_split_class_distributions[i])
                         new_child.weight_seen_at_last_split_eval = new_child.total_weight()
-
-                        if self._header.attribute(name=best.split_test.split_attributes()[0]).is_numeric():
-                            if i is 0:
-                                branch_name = 'left'
-                            else:
-                                branch_name = 'right'
-                        else:
-                            split_attribute = self._header.attribute(name=best.split_test.split_attributes()[0])
-                            branch_name = split_attribute.value(i)
-                        new_split.set_child(branch_name, new_child)
+                        new_split.set_child(i, new_child)
 
                     self._active_leaf_count -= 1
                     self._decision_node_count += 1
@@ -247,3 +1281,4 @@ class HoeffdingTree(object):
                         self._root = new_split
                     else:
                         parent.set_child(parent_branch, new_split)
+                    self._structure_version += 1
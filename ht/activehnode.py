@@ -1,18 +1,83 @@
+import copy
+import sys
+from itertools import repeat
+from operator import itemgetter
+
+from core.utils import groups_by_first_appearance
+from ht.classdistribution import ClassDistribution
 from ht.leafnode import LeafNode
-from ht.gaussianconditionalsufficientstats import GaussianConditionalSufficientStats
-from ht.nominalconditionalsufficientstats import NominalConditionalSufficientStats
+from ht.observerfactory import ObserverFactory, stats_from_checkpoint_state
 from ht.splitcandidate import SplitCandidate
 
 
+def _best_split(stats, split_metric, pre_split_dist, att_name):
+    # Module-level so that process pools can pickle it
+    return stats.best_split(split_metric, pre_split_dist, att_name)
+
+
 class ActiveHNode(LeafNode):
-    """A Hoeffding Tree node that supports growth."""
-    def __init__(self):
+    """A Hoeffding Tree node that supports growth.
+
+    Args:
+        num_bins (int): The number of candidate split points evaluated for numeric attributes with Gaussian
+            observers. Ignored if observer_factory is given. (default 10)
+        observer_factory (ObserverFactory): Creates the statistics kept for each attribute. (default None,
+            Gaussian observers for numeric attributes)
+    """
+    # The type of the node in checkpoints
+    CHECKPOINT_TYPE = 'active'
+
+    def __init__(self, num_bins=10, observer_factory=None):
         super().__init__()
+        if observer_factory is None:
+            observer_factory = ObserverFactory(num_bins)
+        self._observer_factory = observer_factory
         # The total weight of the instances seen at the last split evaluation. 
         self.weight_seen_at_last_split_eval = 0
+        # The weight the node has to see since the last split evaluation before the next one, when split
+        # checks are scheduled adaptively. 0 until a split evaluation fails.
+        self.split_eval_interval = 0
         # Statistics for the attributes.
         # Dict of tuples (attribute name, ConditionalSufficientStats).
         self._node_stats = {}
+        # The last split candidate of each attribute and the total weight of the node when it was computed.
+        # Dict of tuples (attribute name, (SplitCandidate, float)).
+        self._split_cache = {}
+        # The number of times the best split of an attribute was computed or taken from the cache.
+        self.num_split_evaluations = 0
+        self.num_split_cache_hits = 0
+
+    def checkpoint_state(self, arrays):
+        state = super().checkpoint_state(arrays)
+        state.update({
+            'observer_factory': self._observer_factory.checkpoint_state(),
+            'weight_seen_at_last_split_eval': self.weight_seen_at_last_split_eval,
+            'split_eval_interval': self.split_eval_interval,
+            'num_split_evaluations': self.num_split_evaluations,
+            'num_split_cache_hits': self.num_split_cache_hits,
+            # Lists of [attribute name, state], in the order of the dicts
+            'attribute_stats': [[name, stats.checkpoint_state(arrays)] for name, stats in self._node_stats.items()],
+            'split_cache': [[name, None if split_candidate is None else split_candidate.checkpoint_state(arrays),
+                             total_weight] for name, (split_candidate, total_weight) in self._split_cache.items()]
+        })
+        return state
+
+    @classmethod
+    def from_checkpoint_state(cls, state, arrays):
+        node = cls(observer_factory=ObserverFactory.from_checkpoint_state(state['observer_factory']))
+        node.class_distribution = ClassDistribution.from_checkpoint_state(state['class_distribution'], arrays)
+        node.weight_seen_at_last_split_eval = state['weight_seen_at_last_split_eval']
+        node.split_eval_interval = state['split_eval_interval']
+        node.num_split_evaluations = state['num_split_evaluations']
+        node.num_split_cache_hits = state['num_split_cache_hits']
+        for name, stats_state in state['attribute_stats']:
+            node._node_stats[name] = stats_from_checkpoint_state(stats_state, arrays)
+        for name, candidate_state, total_weight in state['split_cache']:
+            split_candidate = None
+            if candidate_state is not None:
+                split_candidate = SplitCandidate.from_checkpoint_state(candidate_state, arrays)
+            node._split_cache[name] = (split_candidate, total_weight)
+        return node
 
     def update_node(self, instance):
         """Update the node with the supplied instance.
@@ -21,40 +86,151 @@ class ActiveHNode(LeafNode):
             instance (Instance): The instance to be used for updating the node.
         """
         self.update_distribution(instance)
-        for i in range(instance.num_attributes()):
-            a = instance.attribute(i)
-            if i is not instance.class_index():
+        class_index = instance.class_index()
+        class_val = int(instance.class_value())
+        weight = instance.weight
+        for i, a in enumerate(instance.dataset.get_attributes()):
+            if i != class_index:
+                stats = self._node_stats.get(a.name, None)
+                if stats is None:
+                    stats = self._observer_factory.new_stats(a)
+                    self._node_stats[a.name] = stats
+
+                stats.update(instance.value(index=i), class_val, weight)
+
+    def update_node_batch(self, values, weights, dataset):
+        """Update the node with a batch of instances.
+
+        Args:
+            values (numpy.ndarray): 2-D array with the attribute values of the instances, one per row.
+                Instances with a missing class value should not be included.
+            weights (numpy.ndarray): The weight of each instance.
+            dataset (Dataset): The dataset describing the attributes of the instances.
+        """
+        class_index = dataset.class_index()
+        class_values = values[:, class_index]
+        self.update_distribution_batch(class_values, weights)
+
+        # Observations are grouped by class, since the statistics are kept per class value
+        class_groups = []
+        for code, rows in groups_by_first_appearance(class_values):
+            class_groups.append((int(code), rows))
+
+        for i in range(dataset.num_attributes()):
+            a = dataset.attribute(i)
+            if i != class_index:
                 stats = self._node_stats.get(a.name, None)
                 if stats is None:
-                    if a.is_numeric():
-                        stats = GaussianConditionalSufficientStats()
-                    else:
-                        stats = NominalConditionalSufficientStats()
+                    stats = self._observer_factory.new_stats(a)
                     self._node_stats[a.name] = stats
 
-                stats.update(instance.value(attribute=a), 
-                             instance.class_attribute().value(index=instance.class_value()),
-                             instance.weight)
+                stats.update_batch(values[:, i], class_groups, weights)
+
+    def merge(self, other):
+        """Add the class distribution and, if the other node is also active, the attribute statistics of
+        another node to this one.
+
+        Args:
+            other (HNode): The node to be merged into this one.
+        """
+        super().merge(other)
+        if not isinstance(other, ActiveHNode):
+            return
+        for attribute_name, other_stats in other._node_stats.items():
+            stats = self._node_stats.get(attribute_name, None)
+            if stats is None:
+                self._node_stats[attribute_name] = copy.deepcopy(other_stats)
+            else:
+                stats.merge(other_stats)
+
+    def byte_size(self):
+        """Return an estimate of the memory used by the node and the statistics of its attributes, in bytes."""
+        size = super().byte_size() + sys.getsizeof(self._node_stats) + sys.getsizeof(self._split_cache)
+        for stats in self._node_stats.values():
+            size += stats.byte_size()
+        for split_candidate, _ in self._split_cache.values():
+            if split_candidate is not None:
+                size += split_candidate.post_split_class_distributions.nbytes
+        return size
 
-    def get_possible_splits(self, split_metric):
+    def get_possible_splits(self, split_metric, reevaluation_fraction=0.0, executor=None):
         """Return a list of the possible split candidates.
+        The best split of an attribute is only computed again if the total weight of the node grew by more
+        than reevaluation_fraction since it was last computed; otherwise the cached candidate is used. Cached
+        candidates that end up among the two best splits are always computed again, so the decision to split
+        is made with up-to-date merits.
 
         Args:
             split_metric (SplitMetric): The splitting metric to be used.
+            reevaluation_fraction (float): The fraction of its total weight the node has to grow by before the
+                best split of an attribute is computed again. With 0 every attribute is always evaluated
+                again and no candidate is cached. (default 0.0)
+            executor (concurrent.futures.Executor): An executor used to evaluate the attributes in parallel,
+                or None to evaluate them one after another. The candidates are the same either way.
+                (default None)
 
         Returns:
             list[SplitCandidate]: A list of the possible split candidates.
         """
         splits = []
-        null_dist = []
-        null_dist.append(self.class_distribution)
+        pre_split_dist = self.class_distribution.weights
+        null_dist = pre_split_dist.reshape(1, -1)
         null_split = SplitCandidate(None, null_dist,
-            split_metric.evaluate_split(self.class_distribution, null_dist))
+            split_metric.evaluate_split(pre_split_dist, null_dist))
         splits.append(null_split)
 
-        for attribute_name, stat in self._node_stats.items():
-            split_candidate = stat.best_split(split_metric, self.class_distribution, attribute_name)
+        total_weight = self.total_weight()
+        cache = reevaluation_fraction > 0
+        if not cache:
+            self._split_cache = {}
+        # Dict of tuples (attribute name, (SplitCandidate, whether it was computed with the current weight))
+        candidates = {}
+        to_evaluate = []
+        for attribute_name in self._node_stats:
+            cached = self._split_cache.get(attribute_name, None)
+            if cached is not None and total_weight - cached[1] <= reevaluation_fraction * cached[1]:
+                self.num_split_cache_hits += 1
+                candidates[attribute_name] = (cached[0], cached[1] == total_weight)
+            else:
+                # Keeps the attribute's place in the order of the candidates
+                candidates[attribute_name] = None
+                to_evaluate.append(attribute_name)
+        for attribute_name, split_candidate in self._evaluate_attributes(
+                split_metric, to_evaluate, executor, cache):
+            candidates[attribute_name] = (split_candidate, True)
+
+        while True:
+            ranked = [(null_split.split_merit, None)]
+            ranked.extend((c[0].split_merit, name) for name, c in candidates.items() if c[0] is not None)
+            ranked.sort(key=itemgetter(0))
+            stale = [name for merit, name in ranked[-2:] if name is not None and not candidates[name][1]]
+            if not stale:
+                break
+            for attribute_name, split_candidate in self._evaluate_attributes(split_metric, stale, executor, cache):
+                candidates[attribute_name] = (split_candidate, True)
+
+        for split_candidate, fresh in candidates.values():
             if split_candidate is not None:
                 splits.append(split_candidate)
 
         return splits
+
+    def _evaluate_attributes(self, split_metric, attribute_names, executor=None, cache=True):
+        """Return tuples (attribute name, SplitCandidate) with the best split of each of the given attributes,
+        in the same order, and cache them if cache is True.
+        """
+        pre_split_dist = self.class_distribution.weights
+        stats = [self._node_stats[name] for name in attribute_names]
+        if executor is not None and len(attribute_names) > 1:
+            split_candidates = list(executor.map(
+                _best_split, stats, repeat(split_metric), repeat(pre_split_dist), attribute_names))
+        else:
+            split_candidates = [_best_split(s, split_metric, pre_split_dist, name)
+                                for s, name in zip(stats, attribute_names)]
+
+        if cache:
+            total_weight = self.total_weight()
+            for attribute_name, split_candidate in zip(attribute_names, split_candidates):
+                self._split_cache[attribute_name] = (split_candidate, total_weight)
+        self.num_split_evaluations += len(attribute_names)
+        return list(zip(attribute_names, split_candidates))
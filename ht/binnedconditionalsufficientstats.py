@@ -0,0 +1,287 @@
+import heapq
+import math
+import struct
+import sys
+from abc import abstractmethod
+
+import numpy as np
+
+from ht.conditionalsufficientstats import ConditionalSufficientStats
+from ht.splitcandidate import SplitCandidate
+from ht.univariatenumericbinarysplit import UnivariateNumericBinarySplit
+from core.utils import object_byte_size
+
+_POINTER_SIZE = struct.calcsize('P')
+
+
+class BinnedConditionalSufficientStats(ConditionalSufficientStats):
+    """Base for the statistics of a numeric attribute kept as at most max_bins bins, each with a centroid and
+    the weight of each class value.
+
+    Observations are buffered and folded into the bins once max_bins of them are waiting: the buffered values
+    become bins of their own and the two adjacent bins that cost the least to merge, as decided by the
+    subclass, are merged until max_bins bins are left. Since folds happen after the same observations whether
+    they are added one at a time or in batches, both give the same bins. Reading the statistics never folds
+    the buffer, so the memory used is at most max_bins bins and max_bins buffered observations.
+
+    The split candidates are the midpoints between adjacent centroids. For naive Bayes, the attribute is
+    modeled for each class value by a normal distribution with the mean and variance of the centroids.
+
+    Args:
+        max_bins (int): The largest number of bins kept. (default 64)
+
+    Raises:
+        ValueError: If max_bins is less than 2.
+    """
+    def __init__(self, max_bins=64):
+        super().__init__()
+        if max_bins < 2:
+            raise ValueError('max_bins should be at least 2, but it is {0}.'.format(max_bins))
+        self._max_bins = max_bins
+        # Centroids in increasing order, and the weight of each class value (columns) in each bin (rows)
+        self._centroids = np.empty(0)
+        self._counts = np.zeros((0, 0))
+        # Observations not folded into the bins yet
+        self._buffer_values = []
+        self._buffer_classes = []
+        self._buffer_weights = []
+        # The bins and the buffer combined, and the normal parameters of each class value, computed when
+        # first needed after a change
+        self._summary = None
+        self._normal_parameters = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_summary'] = None
+        state['_normal_parameters'] = None
+        return state
+
+    def get_max_bins(self):
+        return self._max_bins
+
+    def checkpoint_state(self, arrays):
+        return {'type': self.CHECKPOINT_TYPE, 'max_bins': self._max_bins,
+                'centroids': arrays.add(self._centroids), 'counts': arrays.add(self._counts),
+                'buffer_values': arrays.add(self._buffer_values),
+                'buffer_classes': arrays.add(self._buffer_classes, np.int64),
+                'buffer_weights': arrays.add(self._buffer_weights)}
+
+    @classmethod
+    def from_checkpoint_state(cls, state, arrays):
+        stats = cls(state['max_bins'])
+        stats._centroids = arrays.get(state['centroids'])
+        stats._counts = arrays.get(state['counts'])
+        stats._buffer_values = arrays.get(state['buffer_values']).tolist()
+        stats._buffer_classes = arrays.get(state['buffer_classes']).tolist()
+        stats._buffer_weights = arrays.get(state['buffer_weights']).tolist()
+        return stats
+
+    @abstractmethod
+    def _merge_cost(self, left_centroid, left_weight, right_centroid, right_weight):
+        """Return the cost of merging two adjacent bins. The cheapest pair is merged first.
+
+        Args:
+            left_centroid (float): The centroid of the left bin.
+            left_weight (float): The total weight of the left bin.
+            right_centroid (float): The centroid of the right bin.
+            right_weight (float): The total weight of the right bin.
+
+        Returns:
+            float: The cost of merging the bins.
+        """
+        pass
+
+    def update(self, att_val, class_val, weight):
+        if math.isnan(att_val):
+            return
+        self._buffer_values.append(att_val)
+        self._buffer_classes.append(class_val)
+        self._buffer_weights.append(weight)
+        self._summary = None
+        if len(self._buffer_values) >= self._max_bins:
+            self._fold()
+
+    def update_batch(self, att_vals, class_groups, weights):
+        class_vals = np.empty(len(att_vals), dtype=np.intp)
+        for class_val, rows in class_groups:
+            class_vals[rows] = class_val
+        present = ~np.isnan(att_vals)
+        att_vals = att_vals[present].tolist()
+        class_vals = class_vals[present].tolist()
+        weights = weights[present].tolist()
+        start = 0
+        while start < len(att_vals):
+            stop = min(len(att_vals), start + self._max_bins - len(self._buffer_values))
+            self._buffer_values.extend(att_vals[start:stop])
+            self._buffer_classes.extend(class_vals[start:stop])
+            self._buffer_weights.extend(weights[start:stop])
+            self._summary = None
+            if len(self._buffer_values) >= self._max_bins:
+                self._fold()
+            start = stop
+
+    def merge(self, other):
+        """Add the statistics of another instance of the same class, kept for the same attribute, to these.
+
+        Args:
+            other (BinnedConditionalSufficientStats): The statistics to be merged into these.
+        """
+        centroids, counts = self._combine(*self._combine(*self._bins_and_buffer()),
+                                          *other._combine(*other._bins_and_buffer()))
+        self._centroids, self._counts = self._reduce(centroids, counts)
+        self._buffer_values = []
+        self._buffer_classes = []
+        self._buffer_weights = []
+        self._summary = None
+
+    def byte_size(self):
+        # The buffer lists are counted without the room the interpreter keeps for more items, which depends on
+        # whether they grew one observation or one batch at a time
+        buffer_size = sys.getsizeof([]) + len(self._buffer_values) * _POINTER_SIZE
+        return object_byte_size(self) + self._centroids.nbytes + self._counts.nbytes + 3 * buffer_size
+
+    def _buffer_bins(self):
+        # The buffered observations as bins, one per distinct value
+        values = np.array(self._buffer_values, dtype=np.float64)
+        classes = np.array(self._buffer_classes, dtype=np.intp)
+        weights = np.array(self._buffer_weights, dtype=np.float64)
+        centroids, positions = np.unique(values, return_inverse=True)
+        num_classes = int(classes.max()) + 1 if len(classes) else 0
+        counts = np.zeros((len(centroids), num_classes))
+        np.add.at(counts, (positions, classes), weights)
+        return centroids, counts
+
+    def _bins_and_buffer(self):
+        return (self._centroids, self._counts) + self._buffer_bins()
+
+    def _combine(self, centroids, counts, other_centroids, other_counts):
+        # Bins of both sets, with one bin per distinct centroid
+        num_classes = max(counts.shape[1], other_counts.shape[1])
+        all_centroids = np.concatenate((centroids, other_centroids))
+        all_counts = np.zeros((len(all_centroids), num_classes))
+        all_counts[:len(centroids), :counts.shape[1]] = counts
+        all_counts[len(centroids):, :other_counts.shape[1]] = other_counts
+        merged_centroids, positions = np.unique(all_centroids, return_inverse=True)
+        merged_counts = np.zeros((len(merged_centroids), num_classes))
+        np.add.at(merged_counts, positions, all_counts)
+        return merged_centroids, merged_counts
+
+    def _reduce(self, centroids, counts):
+        if len(centroids) <= self._max_bins:
+            return centroids, counts
+        # Merged bins are always runs of adjacent bins, so only the first bin of each run is tracked and the
+        # class weights are added up at the end. The cheapest pair is taken from a heap of (cost, left bin,
+        # right bin) where ties go to the leftmost pair; pairs whose bins changed since they were pushed are
+        # recognized by the bins' merge counts and skipped.
+        centroids = centroids.tolist()
+        weights = counts.sum(axis=1).tolist()
+        num_bins = len(centroids)
+        next_bins = list(range(1, num_bins + 1))
+        previous_bins = list(range(-1, num_bins - 1))
+        merges = [0] * num_bins
+        merge_cost = self._merge_cost
+        heap = [(merge_cost(centroids[i], weights[i], centroids[i + 1], weights[i + 1]), i, 0, i + 1, 0)
+                for i in range(num_bins - 1)]
+        heapq.heapify(heap)
+        while num_bins > self._max_bins:
+            _, i, i_merges, j, j_merges = heapq.heappop(heap)
+            if merges[i] != i_merges or merges[j] != j_merges or next_bins[i] != j:
+                continue
+            total = weights[i] + weights[j]
+            if total > 0:
+                centroids[i] = (centroids[i] * weights[i] + centroids[j] * weights[j]) / total
+            else:
+                centroids[i] = (centroids[i] + centroids[j]) / 2.0
+            weights[i] = total
+            # Bin j is gone: its merge count no longer matters, but no pair may start from it again
+            merges[j] = -1
+            merges[i] += 1
+            next_bins[i] = next_bins[j]
+            if next_bins[i] < len(centroids):
+                previous_bins[next_bins[i]] = i
+            num_bins -= 1
+            h = previous_bins[i]
+            if h >= 0:
+                heapq.heappush(heap, (merge_cost(centroids[h], weights[h], centroids[i], weights[i]),
+                                      h, merges[h], i, merges[i]))
+            k = next_bins[i]
+            if k < len(centroids):
+                heapq.heappush(heap, (merge_cost(centroids[i], weights[i], centroids[k], weights[k]),
+                                      i, merges[i], k, merges[k]))
+        starts = [i for i in range(len(centroids)) if merges[i] >= 0]
+        return np.array([centroids[i] for i in starts]), np.add.reduceat(counts, starts, axis=0)
+
+    def _fold(self):
+        centroids, counts = self._combine(*self._bins_and_buffer())
+        self._centroids, self._counts = self._reduce(centroids, counts)
+        self._buffer_values = []
+        self._buffer_classes = []
+        self._buffer_weights = []
+        self._summary = None
+
+    def _get_summary(self):
+        if self._summary is None:
+            self._summary = self._combine(*self._bins_and_buffer())
+            self._normal_parameters = None
+        return self._summary
+
+    def normal_parameters(self, num_classes):
+        """Return the mean and variance of the centroids for each class value, as used by
+        probability_of_att_val_conditioned_on_class.
+
+        Args:
+            num_classes (int): The number of class values.
+
+        Returns:
+            tuple: The mean and the variance of each class value, and whether each class value has been seen.
+                Class values that have not have a probability of 0 for every attribute value.
+        """
+        centroids, counts = self._get_summary()
+        if self._normal_parameters is None or len(self._normal_parameters[0]) != num_classes:
+            weights = np.zeros((len(centroids), num_classes))
+            width = min(num_classes, counts.shape[1])
+            weights[:, :width] = counts[:, :width]
+            sums = weights.sum(axis=0)
+            known = sums > 0
+            safe_sums = np.where(known, sums, 1.0)
+            means = centroids @ weights / safe_sums
+            variances = ((centroids[:, np.newaxis] - means) ** 2 * weights).sum(axis=0) / safe_sums
+            variances = np.maximum(variances, 1e-12)
+            self._normal_parameters = (np.where(known, means, 0.0), np.where(known, variances, 1.0), known)
+        return self._normal_parameters
+
+    def probability_of_att_val_conditioned_on_class(self, att_val, class_val):
+        log_probability = self.log_probability_of_att_val_conditioned_on_class(att_val, class_val)
+        return math.exp(log_probability)
+
+    def log_probability_of_att_val_conditioned_on_class(self, att_val, class_val):
+        centroids, counts = self._get_summary()
+        if class_val >= counts.shape[1]:
+            return -math.inf
+        means, variances, known = self.normal_parameters(counts.shape[1])
+        if not known[class_val]:
+            return -math.inf
+        diff = att_val - means[class_val]
+        return -0.5 * (math.log(2 * math.pi) + math.log(variances[class_val]) + diff * diff / variances[class_val])
+
+    def _class_dists_after_split(self, num_classes):
+        # Weight mass of each class value on each side of the midpoint between each pair of adjacent bins
+        centroids, counts = self._get_summary()
+        width = min(num_classes, counts.shape[1])
+        left = np.cumsum(counts[:-1, :width], axis=0)
+        total = counts[:, :width].sum(axis=0)
+        dists = np.zeros((len(left), 2, num_classes))
+        dists[:, 0, :width] = left
+        dists[:, 1, :width] = total - left
+        return dists
+
+    def best_split(self, split_metric, pre_split_dist, att_name):
+        centroids, counts = self._get_summary()
+        if len(centroids) < 2:
+            return None
+        post_split_dists = self._class_dists_after_split(len(pre_split_dist))
+        merits = split_metric.evaluate_splits(pre_split_dist, post_split_dists)
+        best = int(np.argmax(merits))
+        split_point = float((centroids[best] + centroids[best + 1]) / 2.0)
+        split = UnivariateNumericBinarySplit(att_name, split_point)
+        return SplitCandidate(split, post_split_dists[best], float(merits[best]))
@@ -0,0 +1,144 @@
+import sys
+
+import numpy as np
+
+from core.utils import groups_by_first_appearance, object_byte_size, running_sum
+
+
+class ClassDistribution(object):
+    """The weight mass of each class value seen by a node, indexed by class value index.
+    A class value gets an initial mass of 1.0 the first time it is seen, and the total weight is kept up to
+    date as the distribution is updated, so it never needs to be summed up.
+
+    Args:
+        weights (numpy.ndarray): The initial weight mass of each class value. (default None, no mass)
+    """
+    def __init__(self, weights=None):
+        if weights is None:
+            weights = np.zeros(0)
+        # The weight mass of each class value. Should only be changed through add() and add_batch().
+        self.weights = np.array(weights, dtype=np.float64)
+        self._total_weight = float(self.weights.sum())
+
+    def __len__(self):
+        return len(self.weights)
+
+    def checkpoint_state(self, arrays):
+        """Return the state of the distribution to be saved in a checkpoint.
+
+        Args:
+            arrays (CheckpointArrays): Where the weight masses are stored.
+
+        Returns:
+            dict: The index of the weight masses in arrays and the total weight.
+        """
+        return {'weights': arrays.add(self.weights), 'total_weight': self._total_weight}
+
+    @classmethod
+    def from_checkpoint_state(cls, state, arrays):
+        """Create a distribution from the state saved in a checkpoint by checkpoint_state.
+
+        Args:
+            state (dict): The state of the distribution.
+            arrays (CheckpointArrays): The arrays of the checkpoint.
+
+        Returns:
+            ClassDistribution: The distribution.
+        """
+        dist = cls(arrays.get(state['weights']))
+        # The total is accumulated as the distribution is updated, so it can differ from the sum of the masses
+        dist._total_weight = state['total_weight']
+        return dist
+
+    def _grow(self, num_classes):
+        if num_classes > len(self.weights):
+            self.weights = np.concatenate((self.weights, np.zeros(num_classes - len(self.weights))))
+
+    def add(self, class_index, weight):
+        """Add the weight of an instance to the mass of its class value.
+
+        Args:
+            class_index (int): The index of the class value.
+            weight (float): The weight of the instance.
+        """
+        if class_index >= len(self.weights):
+            self._grow(class_index + 1)
+        if self.weights[class_index] == 0:
+            weight = 1.0 + weight
+        self.weights[class_index] += weight
+        self._total_weight += weight
+
+    def add_batch(self, class_indices, weights):
+        """Add the weights of a batch of instances to the masses of their class values.
+        The result is the same as calling add() for each instance, in order.
+
+        Args:
+            class_indices (numpy.ndarray): The index of the class value of each instance.
+            weights (numpy.ndarray): The weight of each instance.
+        """
+        increments = self.increments(class_indices, weights)
+        for class_index, rows in groups_by_first_appearance(class_indices):
+            class_index = int(class_index)
+            self.weights[class_index] = running_sum(self.weights[class_index], increments[rows])
+        self._total_weight = running_sum(self._total_weight, increments)
+
+    def increments(self, class_indices, weights):
+        """Return how much each instance of a batch adds to the total weight, which includes the initial mass of
+        the class values seen for the first time. Makes room for class value indices not seen yet.
+
+        Args:
+            class_indices (numpy.ndarray): The index of the class value of each instance.
+            weights (numpy.ndarray): The weight of each instance.
+
+        Returns:
+            numpy.ndarray: The increment of the total weight for each instance.
+        """
+        increments = np.array(weights, dtype=np.float64)
+        if len(class_indices) == 0:
+            return increments
+        self._grow(int(np.max(class_indices)) + 1)
+        for class_index, rows in groups_by_first_appearance(class_indices):
+            if self.weights[int(class_index)] == 0:
+                increments[rows[0]] = 1.0 + increments[rows[0]]
+        return increments
+
+    def merge(self, other):
+        """Add the weight masses of another distribution to this one.
+        Class values seen by both distributions only keep one initial mass of 1.0.
+
+        Args:
+            other (ClassDistribution): The distribution to be merged into this one.
+        """
+        self._grow(len(other.weights))
+        other_weights = np.zeros(len(self.weights))
+        other_weights[:len(other.weights)] = other.weights
+        seen_by_both = (self.weights != 0) & (other_weights != 0)
+        self.weights += other_weights - seen_by_both
+        self._total_weight += other.total_weight() - float(np.count_nonzero(seen_by_both))
+
+    def weight(self, class_index):
+        """Return the weight mass of a class value.
+
+        Args:
+            class_index (int): The index of the class value.
+
+        Returns:
+            float: The weight mass of the class value.
+        """
+        if class_index < len(self.weights):
+            return self.weights[class_index]
+        return 0.0
+
+    def total_weight(self):
+        return self._total_weight
+
+    def num_entries(self):
+        """Return the number of class values with some weight mass."""
+        return int(np.count_nonzero(self.weights))
+
+    def is_pure(self):
+        return self.num_entries() < 2
+
+    def byte_size(self):
+        """Return an estimate of the memory used by the distribution, in bytes."""
+        return object_byte_size(self) + sys.getsizeof(self.weights)
@@ -0,0 +1,84 @@
+import numpy as np
+
+# Subtrees deeper than this are generated as functions of their own, since Python limits how deeply blocks
+# can be indented
+MAX_NESTING = 40
+
+
+def generate_predictor(compiled, distributions, naive_bayes, class_index):
+    """Generate the source of a Python function that predicts with a compiled tree, and compile it.
+
+    The function takes the attribute values of one instance, without the class, in the dataset's order, and
+    walks the tree with nested comparisons on those positions, returning the class probabilities of the leaf
+    as a constant tuple. Missing values (NaN) fail both numeric comparisons and every nominal one, so they
+    stop at the split node, as in HNode.leaf_for_instance. Leaves that predict with naive Bayes call their
+    tables instead of returning a constant.
+
+    Args:
+        compiled (CompiledTree): The compiled tree.
+        distributions (numpy.ndarray): The class probabilities of each node, one row per node.
+        naive_bayes (dict): The NaiveBayesTables of the nodes that predict with naive Bayes, by node id.
+        class_index (int): The index of the class attribute in the dataset.
+
+    Returns:
+        function: The predictor. Its source is in its 'source' attribute.
+    """
+    namespace = {}
+    for node_id, tables in naive_bayes.items():
+        namespace['_nb{0}'.format(node_id)] = _naive_bayes_leaf(tables, distributions[node_id])
+
+    # Functions to generate, by the node id of their root
+    functions = [0]
+    lines = []
+    while functions:
+        root = functions.pop()
+        name = 'predict' if root == 0 else '_subtree{0}'.format(root)
+        lines.append('def {0}(x):'.format(name))
+        _generate_node(compiled, distributions, naive_bayes, class_index, root, 1, lines, functions)
+        lines.append('')
+    source = '\n'.join(lines)
+    exec(compile(source, '<generated predictor>', 'exec'), namespace)
+    predict = namespace['predict']
+    predict.source = source
+    return predict
+
+
+def _naive_bayes_leaf(tables, fallback):
+    def predict(x):
+        return tuple(tables.distributions(np.array([x], dtype=np.float64), fallback)[0].tolist())
+    return predict
+
+
+def _generate_node(compiled, distributions, naive_bayes, class_index, node_id, depth, lines, functions):
+    indent = '    ' * depth
+    if depth > MAX_NESTING:
+        functions.append(node_id)
+        lines.append('{0}return _subtree{1}(x)'.format(indent, node_id))
+        return
+    if node_id in naive_bayes:
+        lines.append('{0}return _nb{1}(x)'.format(indent, node_id))
+        return
+    result = repr(tuple(float(p) for p in distributions[node_id]))
+    att_index = int(compiled.attributes[node_id])
+    if att_index < 0:
+        lines.append('{0}return {1}'.format(indent, result))
+        return
+
+    column = att_index - (att_index > class_index)
+    lines.append('{0}v = x[{1}]'.format(indent, column))
+    offset = compiled.child_offsets[node_id]
+    children = compiled.child_table[offset:offset + compiled.num_children[node_id]]
+    if compiled.numeric[node_id]:
+        threshold = repr(float(compiled.thresholds[node_id]))
+        tests = ['v <= {0}'.format(threshold), 'v > {0}'.format(threshold)]
+    else:
+        tests = ['v == {0}'.format(repr(float(value))) for value in range(len(children))]
+    keyword = 'if'
+    for test, child in zip(tests, children):
+        if child < 0:
+            continue
+        lines.append('{0}{1} {2}:'.format(indent, keyword, test))
+        _generate_node(compiled, distributions, naive_bayes, class_index, int(child), depth + 1, lines, functions)
+        keyword = 'elif'
+    # Missing values and branches without a child
+    lines.append('{0}return {1}'.format(indent, result))
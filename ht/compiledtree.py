@@ -0,0 +1,132 @@
+import numpy as np
+
+from ht.nbnode import NBNode
+from ht.splitnode import SplitNode
+from ht.univariatenumericbinarysplit import UnivariateNumericBinarySplit
+
+
+class CompiledTree(object):
+    """A flat, array-based copy of the structure of a Hoeffding Tree, used to route whole batches of instances
+    with vectorized comparisons instead of walking the nodes one instance at a time.
+
+    Nodes are numbered in depth-first order, with the root being node 0. Each node keeps the dataset index of
+    its split attribute (-1 for leaves), the split point of numeric splits and the position of its children in
+    a shared child table. Numeric splits have two children (left and right) and nominal splits have one child
+    per attribute value index. Missing children are -1.
+
+    Args:
+        root (HNode): The root of the tree to be compiled.
+        dataset (Dataset): The dataset describing the attributes of the instances.
+    """
+    def __init__(self, root, dataset):
+        self.nodes = []
+        attributes = []
+        numeric = []
+        thresholds = []
+        child_offsets = []
+        num_children = []
+        child_table = []
+
+        # Pairs (node, position in the child table that points to the node)
+        pending = [(root, -1)]
+        while pending:
+            node, position = pending.pop()
+            node_id = len(self.nodes)
+            if position >= 0:
+                child_table[position] = node_id
+            self.nodes.append(node)
+            attributes.append(-1)
+            numeric.append(False)
+            thresholds.append(np.nan)
+            child_offsets.append(len(child_table))
+            num_children.append(0)
+            if not isinstance(node, SplitNode):
+                continue
+            att_index = node.split.split_attribute_indices(dataset)[0]
+            if att_index < 0:
+                continue
+            attributes[node_id] = att_index
+            if isinstance(node.split, UnivariateNumericBinarySplit):
+                numeric[node_id] = True
+                thresholds[node_id] = node.split._split_point
+                num_branches = 2
+            else:
+                num_branches = dataset.attribute(att_index).num_values()
+            num_children[node_id] = num_branches
+            child_table.extend([-1] * num_branches)
+            for i in reversed(range(num_branches)):
+                child = node.children.get(i, None)
+                if child is not None:
+                    pending.append((child, child_offsets[node_id] + i))
+
+        self.attributes = np.array(attributes, dtype=np.intp)
+        self.numeric = np.array(numeric, dtype=bool)
+        self.thresholds = np.array(thresholds, dtype=np.float64)
+        self.child_offsets = np.array(child_offsets, dtype=np.intp)
+        self.num_children = np.array(num_children, dtype=np.intp)
+        self.child_table = np.array(child_table, dtype=np.intp)
+        self._naive_bayes_leaves = any(isinstance(node, NBNode) for node in self.nodes)
+
+    def num_nodes(self):
+        return len(self.nodes)
+
+    def has_naive_bayes_leaves(self):
+        """Return whether any leaf predicts with naive Bayes, so its predictions depend on each instance."""
+        return self._naive_bayes_leaves
+
+    def route(self, values, class_index=None):
+        """Return the node where each instance of a batch stops.
+        An instance stops at a leaf, or at a split node if its value for the split attribute is missing or the
+        split node has no child for it, the same way HNode.leaf_for_instance does.
+
+        Args:
+            values (numpy.ndarray): 2-D array of attribute values, one instance per row.
+            class_index (int): The index of the class attribute if the class is not one of the columns of values,
+                or None if values has a column for every attribute. (default None)
+
+        Returns:
+            numpy.ndarray: The id of the node where each instance stops.
+        """
+        columns = self.attributes
+        if class_index is not None:
+            columns = columns - (columns > class_index)
+
+        current = np.zeros(values.shape[0], dtype=np.intp)
+        active = np.arange(values.shape[0]) if self.attributes[0] >= 0 else np.empty(0, dtype=np.intp)
+        while active.size:
+            nodes = current[active]
+            x = values[active, columns[nodes]]
+            next_nodes = np.full(active.size, -1, dtype=np.intp)
+            present = ~np.isnan(x)
+
+            numeric = self.numeric[nodes] & present
+            branch = np.where(x[numeric] <= self.thresholds[nodes[numeric]], 0, 1)
+            next_nodes[numeric] = self.child_table[self.child_offsets[nodes[numeric]] + branch]
+
+            nominal = ~self.numeric[nodes] & present
+            codes = x[nominal].astype(np.intp)
+            known = (codes >= 0) & (codes < self.num_children[nodes[nominal]])
+            nominal_rows = np.flatnonzero(nominal)[known]
+            next_nodes[nominal_rows] = self.child_table[self.child_offsets[nodes[nominal_rows]] + codes[known]]
+
+            moved = next_nodes >= 0
+            active = active[moved]
+            current[active] = next_nodes[moved]
+            active = active[self.attributes[current[active]] >= 0]
+        return current
+
+    def distributions(self, class_attribute):
+        """Return the class probabilities predicted by each node, as in HNode.get_distribution.
+
+        Args:
+            class_attribute (Attribute): The class attribute.
+
+        Returns:
+            numpy.ndarray: 2-D array with one row of class probabilities per node.
+        """
+        # Class values not seen by a node have a mass of 1.0
+        masses = np.ones((len(self.nodes), class_attribute.num_values()))
+        for node_id, node in enumerate(self.nodes):
+            weights = node.class_distribution.weights[:masses.shape[1]]
+            masses[node_id, :len(weights)] = np.where(weights != 0, weights, 1.0)
+        return masses / np.abs(masses).sum(axis=1, keepdims=True)
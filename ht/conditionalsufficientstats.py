@@ -1,11 +1,15 @@
+import math
+import sys
 from abc import ABCMeta, abstractmethod
 
+from core.utils import object_byte_size
+
 
 class ConditionalSufficientStats(metaclass=ABCMeta):
     """A class for keeping record of the sufficient statistics for an attribute."""
     def __init__(self):
-        # Lookup by class value
-        # Dict of tuples (class value, attribute estimator)
+        # Lookup by class value index
+        # Dict of tuples (class value index, attribute estimator)
         self._class_lookup = {}
 
     @abstractmethod
@@ -14,34 +18,90 @@ class ConditionalSufficientStats(metaclass=ABCMeta):
 
         Args:
             att_val (float): The value of the attribute.
-            class_val (str): The value of the class.
+            class_val (int): The index of the class value.
             weight (float): The weight of this observation.
         """
         pass
     
+    @abstractmethod
+    def update_batch(self, att_vals, class_groups, weights):
+        """Update the statistics with a batch of observations.
+
+        Args:
+            att_vals (numpy.ndarray): The values of the attribute.
+            class_groups (list[tuple]): Tuples (class value index, positions) with the positions of the
+                observations of each class value, in the order the class values first appear.
+            weights (numpy.ndarray): The weights of the observations.
+        """
+        pass
+
+    @abstractmethod
+    def merge(self, other):
+        """Add the statistics of another instance of the same class, kept for the same attribute, to these.
+
+        Args:
+            other (ConditionalSufficientStats): The statistics to be merged into these.
+        """
+        pass
+
     @abstractmethod
     def probability_of_att_val_conditioned_on_class(self, att_val, class_val):
         """Return the probability of an attribute value conditioned on a class value.
 
         Args:
             att_val (float): The attribute value to compute the conditional probability for.
-            class_val (str): The class value.
+            class_val (int): The index of the class value.
 
         Returns:
             float: The probability of the attribute value being conditioned on the given class value.
         """
         pass
 
+    def log_probability_of_att_val_conditioned_on_class(self, att_val, class_val):
+        """Return the logarithm of probability_of_att_val_conditioned_on_class, or -inf if it is 0.
+
+        Args:
+            att_val (float): The attribute value to compute the conditional probability for.
+            class_val (int): The index of the class value.
+
+        Returns:
+            float: The logarithm of the probability.
+        """
+        probability = self.probability_of_att_val_conditioned_on_class(att_val, class_val)
+        return math.log(probability) if probability > 0 else -math.inf
+
     @abstractmethod
     def best_split(self, split_metric, pre_split_dist, att_name):
         """Return the best split.
 
         Args:
             split_metric (SplitMetric): The split metric to use.
-            pre_split_dist (dict): The distribution of class values before the split.
+            pre_split_dist (numpy.ndarray): The weight mass of each class value before the split.
             att_name (str): The name of the attribute being considered for splitting.
 
         Returns:
             SplitCandidate: The best split for the attribute.
         """
         pass
+
+    @abstractmethod
+    def checkpoint_state(self, arrays):
+        """Return the state of the statistics to be saved in a checkpoint. Subclasses also provide a
+        from_checkpoint_state class method that creates statistics from it.
+
+        Args:
+            arrays (CheckpointArrays): Where the arrays of the statistics are stored.
+
+        Returns:
+            dict: The type of the statistics, their parameters and the indices of their arrays in arrays.
+        """
+        pass
+
+    def byte_size(self):
+        """Return an estimate of the memory used by the statistics, in bytes.
+
+        Returns:
+            int: The estimated size of the statistics in bytes.
+        """
+        return object_byte_size(self) + sys.getsizeof(self._class_lookup) + sum(
+            estimator.byte_size() for estimator in self._class_lookup.values())
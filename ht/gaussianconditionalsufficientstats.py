@@ -1,12 +1,14 @@
-from sortedcontainers import SortedList
+import copy
 import math
-from scipy.stats import norm
+import sys
+import numpy as np
 
 from ht.conditionalsufficientstats import ConditionalSufficientStats
 from ht.univariatenumericbinarysplit import UnivariateNumericBinarySplit
 from ht.splitcandidate import SplitCandidate
 
 from core.univariatenormalestimator import UnivariateNormalEstimator
+from core.utils import normal_cdf
 
 
 class GaussianEstimator(UnivariateNormalEstimator):
@@ -17,13 +19,21 @@ class GaussianEstimator(UnivariateNormalEstimator):
     def get_sum_of_weights(self):
         return self._sum_of_weights
 
+    def get_mean(self):
+        self.update_mean_and_variance()
+        return self._mean
+
+    def get_std_dev(self):
+        self.update_mean_and_variance()
+        return self._std_dev
+
     def probability_density(self, value):
         self.update_mean_and_variance()
         if self._sum_of_weights > 0:
-            std_dev = math.sqrt(self._variance)
+            std_dev = self._std_dev
             if std_dev > 0:
                 diff = value - self._mean
-                return (1.0 / (self.CONST * std_dev)) * math.exp(-(diff * diff / (2.0 * self._variance)))
+                return (1.0 / (self.NORMAL_CONSTANT * std_dev)) * math.exp(-(diff * diff / (2.0 * self._variance)))
             if value == self._mean:
                 return 1.0
             else:
@@ -31,11 +41,12 @@ class GaussianEstimator(UnivariateNormalEstimator):
         return 0.0
 
     def weight_less_than_equal_and_greater_than(self, value):
-        std_dev = math.sqrt(self._variance)
+        self.update_mean_and_variance()
+        std_dev = self._std_dev
         equal_w = self.probability_density(value) * self._sum_of_weights
         less_w = None
         if std_dev > 0:
-            less_w = norm.cdf(
+            less_w = normal_cdf(
                 (value - self._mean) / std_dev) * self._sum_of_weights - equal_w
         elif value < self._mean:
             less_w = self._sum_of_weights - equal_w
@@ -45,12 +56,20 @@ class GaussianEstimator(UnivariateNormalEstimator):
         return [less_w, equal_w, greater_w]
 
 class GaussianConditionalSufficientStats(ConditionalSufficientStats):
-    """A class for keeping record of the sufficient statistics for a numeric attribute."""
-    def __init__(self):
+    """A class for keeping record of the sufficient statistics for a numeric attribute.
+
+    Args:
+        num_bins (int): The number of candidate split points evaluated between the smallest and the largest
+            observed values. (default 10)
+    """
+    # The type of the statistics in checkpoints
+    CHECKPOINT_TYPE = 'gaussian'
+
+    def __init__(self, num_bins=10):
         super().__init__()
         self._min_val_observed_per_class = {}
         self._max_val_observed_per_class = {}
-        self._num_bins = 10
+        self._num_bins = num_bins
 
     def set_num_bins(self, b):
         self._num_bins = b
@@ -58,12 +77,38 @@ class GaussianConditionalSufficientStats(ConditionalSufficientStats):
     def get_num_bins(self):
         return self._num_bins
 
+    def checkpoint_state(self, arrays):
+        # One row per class value, in the order the class values were first seen
+        class_vals = list(self._class_lookup)
+        return {'type': self.CHECKPOINT_TYPE, 'num_bins': self._num_bins,
+                'class_values': arrays.add(class_vals, np.int64),
+                'estimators': arrays.add(
+                    np.reshape([self._class_lookup[c].checkpoint_state() for c in class_vals], (-1, 4))),
+                'min_values': arrays.add([self._min_val_observed_per_class[c] for c in class_vals]),
+                'max_values': arrays.add([self._max_val_observed_per_class[c] for c in class_vals])}
+
+    @classmethod
+    def from_checkpoint_state(cls, state, arrays):
+        stats = cls(state['num_bins'])
+        estimators = arrays.get(state['estimators']).tolist()
+        min_values = arrays.get(state['min_values']).tolist()
+        max_values = arrays.get(state['max_values']).tolist()
+        for i, class_val in enumerate(arrays.get(state['class_values']).tolist()):
+            stats._class_lookup[class_val] = GaussianEstimator.from_checkpoint_state(estimators[i])
+            stats._min_val_observed_per_class[class_val] = min_values[i]
+            stats._max_val_observed_per_class[class_val] = max_values[i]
+        return stats
+
+    def byte_size(self):
+        return super().byte_size() + sys.getsizeof(self._min_val_observed_per_class) + \
+            sys.getsizeof(self._max_val_observed_per_class)
+
     def update(self, att_val, class_val, weight):
         """Update the statistics with the supplied attribute and class values.
 
         Args:
             att_val (float): The value of the attribute.
-            class_val (str): The value of the class.
+            class_val (int): The index of the class value.
             weight (float): The weight of this observation.
         """
         if not math.isnan(att_val):
@@ -80,12 +125,63 @@ class GaussianConditionalSufficientStats(ConditionalSufficientStats):
                     self._max_val_observed_per_class[class_val] = att_val
             norm.add_value(att_val, weight)
 
+    def update_batch(self, att_vals, class_groups, weights):
+        """Update the statistics with a batch of observations.
+
+        Args:
+            att_vals (numpy.ndarray): The values of the attribute.
+            class_groups (list[tuple]): Tuples (class value index, positions) with the positions of the
+                observations of each class value, in the order the class values first appear.
+            weights (numpy.ndarray): The weights of the observations.
+        """
+        for class_val, rows in class_groups:
+            class_att_vals = att_vals[rows]
+            present = ~np.isnan(class_att_vals)
+            if not present.any():
+                continue
+            class_att_vals = class_att_vals[present]
+            min_val = float(class_att_vals.min())
+            max_val = float(class_att_vals.max())
+            norm = self._class_lookup.get(class_val, None)
+            if norm is None:
+                norm = GaussianEstimator()
+                self._class_lookup[class_val] = norm
+                self._min_val_observed_per_class[class_val] = min_val
+                self._max_val_observed_per_class[class_val] = max_val
+            else:
+                if min_val < self._min_val_observed_per_class[class_val]:
+                    self._min_val_observed_per_class[class_val] = min_val
+                if max_val > self._max_val_observed_per_class[class_val]:
+                    self._max_val_observed_per_class[class_val] = max_val
+            norm.add_values(class_att_vals, weights[rows][present])
+
+    def merge(self, other):
+        """Add the statistics of another GaussianConditionalSufficientStats for the same attribute to these.
+
+        Args:
+            other (GaussianConditionalSufficientStats): The statistics to be merged into these.
+        """
+        for class_val, other_norm in other._class_lookup.items():
+            norm = self._class_lookup.get(class_val, None)
+            other_min = other._min_val_observed_per_class[class_val]
+            other_max = other._max_val_observed_per_class[class_val]
+            if norm is None:
+                self._class_lookup[class_val] = copy.deepcopy(other_norm)
+                self._min_val_observed_per_class[class_val] = other_min
+                self._max_val_observed_per_class[class_val] = other_max
+            else:
+                norm.merge(other_norm)
+                if other_min < self._min_val_observed_per_class[class_val]:
+                    self._min_val_observed_per_class[class_val] = other_min
+                if other_max > self._max_val_observed_per_class[class_val]:
+                    self._max_val_observed_per_class[class_val] = other_max
+
     def probability_of_att_val_conditioned_on_class(self, att_val, class_val):
         """Return the probability of an attribute value conditioned on a class value.
 
         Args:
             att_val (float): The attribute value to compute the conditional probability for.
-            class_val (str): The class value.
+            class_val (int): The index of the class value.
 
         Returns:
             float: The probability of the attribute value being conditioned on the given class value.
@@ -95,81 +191,94 @@ class GaussianConditionalSufficientStats(ConditionalSufficientStats):
             return 0
         return norm.probability_density(att_val)
 
+    def log_probability_of_att_val_conditioned_on_class(self, att_val, class_val):
+        # Computed in the log domain, so densities far in the tails do not underflow to 0
+        norm = self._class_lookup.get(class_val, None)
+        if norm is None or norm.get_sum_of_weights() <= 0:
+            return -math.inf
+        return norm.log_density(att_val)
+
+    def normal_parameters(self, num_classes):
+        """Return the mean and variance of the normal distribution of the attribute for each class value,
+        as used by probability_of_att_val_conditioned_on_class.
+
+        Args:
+            num_classes (int): The number of class values.
+
+        Returns:
+            tuple: The mean and the variance of each class value, and whether each class value has a
+                distribution. Class values without one have a probability of 0 for every attribute value.
+        """
+        means = np.zeros(num_classes)
+        variances = np.ones(num_classes)
+        known = np.zeros(num_classes, dtype=bool)
+        for class_val, norm in self._class_lookup.items():
+            if class_val < num_classes and norm.get_sum_of_weights() > 0:
+                means[class_val] = norm.get_mean()
+                variances[class_val] = norm.get_std_dev() ** 2
+                known[class_val] = True
+        return means, variances, known
+
     def _get_split_point_candidates(self):
-        splits = SortedList()
-        min_value = math.inf
-        max_value = -math.inf
-
-        for class_val, att_estimator in self._class_lookup.items():
-            min_val_observed_for_class_val = self._min_val_observed_per_class.get(class_val, None)
-            if min_val_observed_for_class_val is not None:
-                if min_val_observed_for_class_val < min_value:
-                    min_value = min_val_observed_for_class_val
-                max_val_observed_for_class_val = self._max_val_observed_per_class.get(class_val)
-                if max_val_observed_for_class_val > max_value:
-                    max_value = max_val_observed_for_class_val
-
-        if min_value < math.inf:
-            new_bin = max_value - min_value
-            new_bin /= (self._num_bins + 1)
-            for i in range(self._num_bins):
-                split = min_value + (new_bin * (i + 1))
-                if split > min_value and split < max_value:
-                    splits.add(split)
-        return splits
-
-    def _class_dists_after_split(self, split_val):
-        lhs_dist = {}
-        rhs_dist = {}
-
-        for class_val, att_estimator in self._class_lookup.items():
-            if att_estimator is not None:
-                if split_val < self._min_val_observed_per_class[class_val]:
-                    mass = rhs_dist.get(class_val, None)
-                    if mass is None:
-                        mass = 0.0
-                        rhs_dist[class_val] = mass
-                    mass += att_estimator.get_sum_of_weights()
-                elif split_val > self._max_val_observed_per_class[class_val]:
-                    mass = lhs_dist.get(class_val, None)
-                    if mass is None:
-                        mass = 0.0
-                        lhs_dist[class_val] = mass
-                    mass += att_estimator.get_sum_of_weights()
-                else:
-                    weights = att_estimator.weight_less_than_equal_and_greater_than(split_val)
-                    mass = lhs_dist.get(class_val, None)
-                    if mass is None:
-                        mass = 0.0
-                        lhs_dist[class_val] = mass
-                    mass += weights[0] + weights[1]
-                    mass = rhs_dist.get(class_val, None)
-                    if mass is None:
-                        mass = 0.0
-                        rhs_dist[class_val] = mass
-                    mass += weights[2]
-
-        dists = [lhs_dist, rhs_dist]
+        if not self._min_val_observed_per_class:
+            return np.empty(0)
+        min_value = min(self._min_val_observed_per_class.values())
+        max_value = max(self._max_val_observed_per_class.values())
+
+        new_bin = max_value - min_value
+        new_bin /= (self._num_bins + 1)
+        splits = min_value + new_bin * np.arange(1, self._num_bins + 1)
+        return np.unique(splits[(splits > min_value) & (splits < max_value)])
+
+    def _class_dists_after_split(self, split_vals, num_classes):
+        """Return the weight mass of each class value on each side of each of the given split points.
+
+        Args:
+            split_vals (numpy.ndarray): The candidate split points.
+            num_classes (int): The number of class values.
+
+        Returns:
+            numpy.ndarray: 3-D array (split points x branches x class values), where branch 0 is the left side
+                (values less than or equal to the split point) and branch 1 the right side.
+        """
+        class_vals = np.array(list(self._class_lookup), dtype=np.intp)
+        estimators = list(self._class_lookup.values())
+        sums = np.array([e.get_sum_of_weights() for e in estimators])
+        means = np.array([e.get_mean() for e in estimators])
+        std_devs = np.array([e.get_std_dev() for e in estimators])
+        min_vals = np.array([self._min_val_observed_per_class[c] for c in class_vals])
+        max_vals = np.array([self._max_val_observed_per_class[c] for c in class_vals])
+
+        # Rows are split points and columns are class values
+        split_vals = np.asarray(split_vals, dtype=np.float64)[:, np.newaxis]
+        below_min = split_vals < min_vals
+        above_max = split_vals > max_vals
+        lhs = normal_cdf((split_vals - means) / std_devs) * sums
+        lhs = np.where(above_max, sums, np.where(below_min, 0.0, lhs))
+
+        dists = np.zeros((split_vals.shape[0], 2, num_classes))
+        dists[:, 0, class_vals] = lhs
+        dists[:, 1, class_vals] = sums - lhs
         return dists
 
     def best_split(self, split_metric, pre_split_dist, att_name):
         """Return the best split.
+        All the candidate split points are evaluated at once.
 
         Args:
             split_metric (SplitMetric): The split metric to use.
-            pre_split_dist (dict): The distribution of class values before the split.
+            pre_split_dist (numpy.ndarray): The weight mass of each class value before the split.
             att_name (str): The name of the attribute being considered for splitting.
 
         Returns:
             SplitCandidate: The best split for the attribute.
+            None: If there are no candidate split points.
         """
-        best = None
         candidates = self._get_split_point_candidates()
-        for candidate in candidates:
-            post_split_dists = self._class_dists_after_split(candidate)
-            split_merit = split_metric.evaluate_split(pre_split_dist, post_split_dists)
-            if best is None or split_merit > best.split_merit:
-                split = UnivariateNumericBinarySplit(att_name, candidate)
-                best = SplitCandidate(split, post_split_dists, split_merit)
-
-        return best
+        if len(candidates) == 0:
+            return None
+        post_split_dists = self._class_dists_after_split(candidates, len(pre_split_dist))
+        merits = split_metric.evaluate_splits(pre_split_dist, post_split_dists)
+        best = int(np.argmax(merits))
+        split = UnivariateNumericBinarySplit(att_name, float(candidates[best]))
+        return SplitCandidate(split, post_split_dists[best], float(merits[best]))
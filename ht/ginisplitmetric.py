@@ -1,29 +1,57 @@
+import numpy as np
+
 from ht.splitmetric import SplitMetric
 
 
 class GiniSplitMetric(SplitMetric):
     """The Gini split metric."""
+    # The type of the metric in checkpoints
+    CHECKPOINT_TYPE = 'gini'
+
+    def checkpoint_state(self):
+        return {'type': self.CHECKPOINT_TYPE}
+
     def evaluate_split(self, pre_dist, post_dist):
-        total_weight = 0.0
-        dist_weights = []
-        for i in range(len(post_dist)):
-            dist_weights.append(self.sum(post_dist[i]))
-            total_weight += dist_weights[i]
-        gini_metric = 0
-        for i in range(len(post_dist)):
-            gini_metric += (dist_weights[i] / total_weight) * self.gini(
-                post_dist[i], dist_weights[i])
-
-        return 1.0 - gini_metric
+        return float(self.evaluate_splits(pre_dist, np.asarray(post_dist)[np.newaxis])[0])
+
+    def evaluate_splits(self, pre_dist, post_dists):
+        """Evaluate many candidate splits of the same distribution at once.
+        Empty branches do not count towards the Gini index of a split.
+
+        Args:
+            pre_dist (numpy.ndarray): The weight mass of each class value before the split.
+            post_dists (numpy.ndarray): 3-D array (candidates x branches x class values) with the class
+                distributions after each candidate split.
+
+        Returns:
+            numpy.ndarray: The merit of each candidate split.
+        """
+        post_dists = np.asarray(post_dists, dtype=np.float64)
+        dist_weights = post_dists.sum(axis=2)
+        total_weights = dist_weights.sum(axis=1)
+        non_empty = dist_weights > 0
+        # Empty branches get a Gini index of 0 and candidates without weight a Gini metric of 0
+        ginis = self.gini(post_dists, np.where(non_empty, dist_weights, 1.0))
+        fracs = dist_weights / np.where(total_weights > 0, total_weights, 1.0)[:, np.newaxis]
+        gini_metrics = np.sum(np.where(non_empty, fracs * ginis, 0.0), axis=1)
+
+        return 1.0 - gini_metrics
 
     def gini(self, dist, sum_of_weights=None):
+        """Return the Gini index of a class distribution, or of each row of a 2-D array of them.
+
+        Args:
+            dist (numpy.ndarray): The weight mass of each class value.
+            sum_of_weights (float): The total weight of the distribution, or of each row. (default None)
+
+        Returns:
+            float: The Gini index of the distribution, or an array with the Gini index of each row.
+        """
+        dist = np.asarray(dist, dtype=np.float64)
         if sum_of_weights is None:
-            sum_of_weights = self.sum(dist)
-        gini_metric = 1.0
-        for class_value, mass in dist.items():
-            frac = mass.weight / sum_of_weights
-            gini_metric -= frac * frac
-        return gini_metric
+            sum_of_weights = dist.sum(axis=-1)
+        fracs = dist / np.expand_dims(sum_of_weights, -1)
+        return 1.0 - np.sum(fracs * fracs, axis=-1)
 
     def get_metric_range(self, pre_dist):
         return 1.0
@@ -0,0 +1,19 @@
+from ht.binnedconditionalsufficientstats import BinnedConditionalSufficientStats
+
+
+class HistogramConditionalSufficientStats(BinnedConditionalSufficientStats):
+    """A class for keeping record of the sufficient statistics for a numeric attribute in an online histogram
+    of at most max_bins bins, following Ben-Haim and Tom-Tov's streaming histogram: the two closest adjacent
+    bins are merged first, so the bins follow the shape of the distribution, including several modes.
+
+    Args:
+        max_bins (int): The largest number of bins kept. (default 64)
+    """
+    # The type of the statistics in checkpoints
+    CHECKPOINT_TYPE = 'histogram'
+
+    def __init__(self, max_bins=64):
+        super().__init__(max_bins)
+
+    def _merge_cost(self, left_centroid, left_weight, right_centroid, right_weight):
+        return right_centroid - left_centroid
@@ -1,26 +1,28 @@
 from abc import ABCMeta, abstractmethod
-from sklearn.preprocessing import normalize
+import numpy as np
+
+from ht.classdistribution import ClassDistribution
+from core.utils import object_byte_size
 
 
 class HNode(metaclass=ABCMeta):
     """Base for the Hoeffding Tree nodes.
 
     Args:
-        class_distribution (dict): The class distribution used to create the node. (default None)
+        class_distribution (ClassDistribution): The class distribution used to create the node. (default None)
     """
     def __init__(self, class_distribution=None):
         if class_distribution is None:
-            # Dict of tuples (class value, weight mass)
-            class_distribution = {}
+            class_distribution = ClassDistribution()
         self.class_distribution = class_distribution
         self._leaf_num = None
         self._node_num = None
 
-    def __str__(self, print_leaf=False):
+    def __str__(self, print_leaf=False, class_attribute=None):
         self.install_node_nums(0)
         # Wrapper for a string
         buff = ['']
-        self._dump_tree(0, 0, buff)
+        self._dump_tree(0, 0, buff, class_attribute)
         if print_leaf:
             buff[0] += "\n\n"
             self._print_leaf_models(buff)
@@ -31,55 +33,46 @@ class HNode(metaclass=ABCMeta):
         return True
 
     def num_entries_in_class_distribution(self):
-        return len(self.class_distribution)
+        return self.class_distribution.num_entries()
 
     def class_distribution_is_pure(self):
-        count = 0
-        for class_value, mass in self.class_distribution.items():
-            if mass > 0:
-                count += 1
-                if count > 1:
-                    break
-        return count < 2
+        return self.class_distribution.is_pure()
 
     def update_distribution(self, instance):
         if instance.class_is_missing():
             return
-        class_val = instance.string_value(attribute=instance.class_attribute())
-        mass = self.class_distribution.get(class_val, None)
-        if mass is None:
-            mass = 1.0
-            self.class_distribution[class_val] = mass
-
-        self.class_distribution[class_val] += instance.weight
+        self.class_distribution.add(int(instance.class_value()), instance.weight)
 
-    def get_distribution(self, instance, class_attribute):
-        dist = [0.0] * class_attribute.num_values()
+    def update_distribution_batch(self, class_values, weights):
+        """Update the class distribution with a batch of instances.
 
-        for i in range(class_attribute.num_values()):
-            mass = self.class_distribution.get(class_attribute.value(i), None)
-            if mass is not None:
-                dist[i] = mass
-            else:
-                dist[i] = 1.0
+        Args:
+            class_values (numpy.ndarray): The class value index of each instance. Instances with a missing
+                class value should not be included.
+            weights (numpy.ndarray): The weight of each instance.
+        """
+        self.class_distribution.add_batch(class_values, weights)
 
-        dist = normalize([dist], axis=1, norm='l1')
-        dist = dist.ravel().tolist()
+    def get_distribution(self, instance, class_attribute):
+        # Class values not seen by the node have a mass of 1.0
+        dist = np.ones(class_attribute.num_values())
+        masses = self.class_distribution.weights[:len(dist)]
+        dist[:len(masses)] = np.where(masses != 0, masses, 1.0)
 
-        return dist
+        return (dist / np.abs(dist).sum()).tolist()
 
     def install_node_nums(self, node_num):
         node_num += 1
         self._node_num = node_num
         return node_num
 
-    def _dump_tree(self, depth, leaf_count, buff):
+    def _dump_tree(self, depth, leaf_count, buff, class_attribute=None):
         max_value = -1
         class_val = ''
-        for class_value, mass in self.class_distribution.items():
-            if mass > max_value:
-                max_value = mass
-                class_val = class_value
+        if len(self.class_distribution) > 0:
+            class_index = int(np.argmax(self.class_distribution.weights))
+            max_value = float(self.class_distribution.weights[class_index])
+            class_val = class_index if class_attribute is None else class_attribute.value(class_index)
         buff[0] += '{0} ({1})'.format(class_val, max_value)
         leaf_count += 1
         self._leaf_num = leaf_count
@@ -89,10 +82,31 @@ class HNode(metaclass=ABCMeta):
         pass
 
     def total_weight(self):
-        tw = 0.0
-        for class_value, mass in self.class_distribution.items():
-            tw += mass
-        return tw
+        return self.class_distribution.total_weight()
+
+    def merge(self, other):
+        """Add the class distribution of another node to the one of this node.
+
+        Args:
+            other (HNode): The node to be merged into this one.
+        """
+        self.class_distribution.merge(other.class_distribution)
+
+    def checkpoint_state(self, arrays):
+        """Return the state of the node to be saved in a checkpoint. Children are not included. Subclasses
+        also provide a from_checkpoint_state class method that creates a node from it.
+
+        Args:
+            arrays (CheckpointArrays): Where the arrays of the node are stored.
+
+        Returns:
+            dict: The type of the node, its class distribution and the state of its subclass.
+        """
+        return {'type': self.CHECKPOINT_TYPE, 'class_distribution': self.class_distribution.checkpoint_state(arrays)}
+
+    def byte_size(self):
+        """Return an estimate of the memory used by the node, in bytes. Children are not included."""
+        return object_byte_size(self) + self.class_distribution.byte_size()
 
     def leaf_for_instance(self, instance, parent, parent_branch):
         from ht.leafnode import LeafNode
@@ -1,10 +1,24 @@
+from ht.classdistribution import ClassDistribution
 from ht.leafnode import LeafNode
 
 
 class InactiveHNode(LeafNode):
     """A Hoeffding Tree node that is inactive (does not support growth)."""
+    # The type of the node in checkpoints
+    CHECKPOINT_TYPE = 'inactive'
+
     def __init__(self, class_distribution):
         super().__init__(class_distribution)
 
+    @classmethod
+    def from_checkpoint_state(cls, state, arrays):
+        # The constructor keeps its argument apart from the class distribution the node updates
+        node = cls(None)
+        node.class_distribution = ClassDistribution.from_checkpoint_state(state['class_distribution'], arrays)
+        return node
+
     def update_node(self, instance):
         self.update_distribution(instance)
+
+    def update_node_batch(self, values, weights, dataset):
+        self.update_distribution_batch(values[:, dataset.class_index()], weights)
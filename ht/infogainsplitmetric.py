@@ -1,49 +1,70 @@
 import math
-from scipy.stats import entropy
+import numpy as np
 
 from ht.splitmetric import SplitMetric
 
 
 class InfoGainSplitMetric(SplitMetric):
     """The Info Gain split metric."""
+    # The type of the metric in checkpoints
+    CHECKPOINT_TYPE = 'info_gain'
+
     def __init__(self, min_frac_weight_for_two_branches):
         self._min_frac_weight_for_two_branches = min_frac_weight_for_two_branches
+
+    def checkpoint_state(self):
+        return {'type': self.CHECKPOINT_TYPE,
+                'min_frac_weight_for_two_branches': self._min_frac_weight_for_two_branches}
     
     def evaluate_split(self, pre_dist, post_dist):
-        pre = []
-        for class_value, mass in pre_dist.items():
-            pre.append(pre_dist[class_value].weight)
-        pre_entropy = entropy(pre, base=2)
-
-        dist_weights = []
-        total_weight = 0.0
-        for i in range(len(post_dist)):
-            dist_weights.append(self.sum(post_dist[i]))
-            total_weight += dist_weights[i]
-
-        frac_count = 0
-        for d in dist_weights:
-            if d / total_weight > self._min_frac_weight_for_two_branches:
-                frac_count += 1
-
-        if frac_count < 2:
-            return -math.inf
-
-        post_entropy = 0
-        for i in range(len(post_dist)):
-            d = post_dist[i]
-            post = []
-            for class_value, mass in d.items():
-                post.append(mass.weight)
-            post_entropy += dist_weights[i] * entropy(post, base=2)
-
-        if total_weight > 0:
-            post_entropy /= total_weight
-
-        return pre_entropy - post_entropy
+        return float(self.evaluate_splits(pre_dist, np.asarray(post_dist)[np.newaxis])[0])
+
+    def evaluate_splits(self, pre_dist, post_dists):
+        """Evaluate many candidate splits of the same distribution at once.
+        Candidates with less than two branches holding more than min_frac_weight_for_two_branches of the
+        weight have a merit of -inf.
+
+        Args:
+            pre_dist (numpy.ndarray): The weight mass of each class value before the split.
+            post_dists (numpy.ndarray): 3-D array (candidates x branches x class values) with the class
+                distributions after each candidate split.
+
+        Returns:
+            numpy.ndarray: The merit of each candidate split.
+        """
+        post_dists = np.asarray(post_dists, dtype=np.float64)
+        pre_entropy = self.entropy(pre_dist)
+
+        dist_weights = post_dists.sum(axis=2)
+        total_weights = dist_weights.sum(axis=1)
+        valid = total_weights > 0
+        safe_totals = np.where(valid, total_weights, 1.0)
+
+        frac_counts = np.count_nonzero(
+            dist_weights / safe_totals[:, np.newaxis] > self._min_frac_weight_for_two_branches, axis=1)
+        valid &= frac_counts >= 2
+
+        post_entropies = np.sum(dist_weights * self.entropy(post_dists), axis=1) / safe_totals
+        return np.where(valid, pre_entropy - post_entropies, -math.inf)
+
+    def entropy(self, dist):
+        """Return the entropy (base 2) of a class distribution, or of each row of a 2-D array of them.
+        Empty distributions have no entropy.
+
+        Args:
+            dist (numpy.ndarray): The weight mass of each class value.
+
+        Returns:
+            float: The entropy of the distribution, or an array with the entropy of each row.
+        """
+        dist = np.asarray(dist, dtype=np.float64)
+        sums = dist.sum(axis=-1, keepdims=True)
+        probs = np.divide(dist, sums, out=np.zeros_like(dist), where=sums > 0)
+        logs = np.log2(probs, out=np.zeros_like(probs), where=probs > 0)
+        return -np.sum(probs * logs, axis=-1)
 
     def get_metric_range(self, pre_dist):
-        num_classes = len(pre_dist)
+        num_classes = np.count_nonzero(pre_dist)
         if num_classes < 2:
             num_classes = 2
 
@@ -0,0 +1,130 @@
+import math
+
+import numpy as np
+
+
+class NaiveBayesTables(object):
+    """The naive Bayes model of a leaf, precomputed from its class distribution and attribute statistics so
+    that the class probabilities of a batch of instances take a few array operations.
+
+    The log-likelihood of a numeric attribute value x under a normal distribution is a quadratic in x, so the
+    numeric attributes of all instances contribute through two matrix products with the coefficients of every
+    attribute and class value. Nominal attributes contribute through a lookup in one table stacking the log
+    probabilities of the values of every attribute. The probabilities are the same as the product of the prior
+    and of probability_of_att_val_conditioned_on_class over the attributes, up to rounding; missing values and
+    attributes without statistics are left out.
+
+    Args:
+        class_distribution (ClassDistribution): The class distribution of the leaf.
+        node_stats (dict): The statistics of the leaf for each attribute, by attribute name.
+        dataset (Dataset): The dataset describing the attributes of the instances.
+    """
+    def __init__(self, class_distribution, node_stats, dataset):
+        class_index = dataset.class_index()
+        num_classes = dataset.class_attribute().num_values()
+
+        weights = np.zeros(num_classes)
+        masses = class_distribution.weights[:num_classes]
+        weights[:len(masses)] = masses
+        total_weight = class_distribution.total_weight()
+        with np.errstate(divide='ignore'):
+            self.log_prior = np.log(weights / total_weight) if total_weight > 0 else np.zeros(num_classes)
+
+        numeric_columns = []
+        numeric_params = []
+        nominal_columns = []
+        nominal_tables = []
+        for i, a in enumerate(dataset.get_attributes()):
+            if i == class_index:
+                continue
+            stats = node_stats.get(a.name, None)
+            if stats is None:
+                continue
+            # Position of the attribute among the attributes other than the class
+            column = i - (i > class_index)
+            if a.is_numeric():
+                numeric_columns.append(column)
+                numeric_params.append(stats.normal_parameters(num_classes))
+            else:
+                nominal_columns.append(column)
+                num_values = max(a.num_values(), stats.num_values_seen())
+                nominal_tables.append(stats.log_probability_table(num_values, num_classes))
+
+        # Numeric attributes: log p(x | c) = a + b * x + c * x^2, with x centered on the mean of the class means
+        # of the attribute so that the squares do not lose precision for values far from zero
+        self._numeric_columns = np.array(numeric_columns, dtype=np.intp)
+        num_numeric = len(numeric_columns)
+        self._centers = np.zeros(num_numeric)
+        self._constant = np.zeros((num_numeric, num_classes))
+        self._linear = np.zeros((num_numeric, num_classes))
+        self._quadratic = np.zeros((num_numeric, num_classes))
+        # Class values with no distribution for an attribute, which have a probability of 0
+        self._impossible = np.zeros((num_numeric, num_classes))
+        for j, (means, variances, known) in enumerate(numeric_params):
+            center = means[known].mean() if known.any() else 0.0
+            means = means - center
+            self._centers[j] = center
+            self._constant[j] = np.where(
+                known, -0.5 * (math.log(2 * math.pi) + np.log(variances)) - means * means / (2.0 * variances), 0.0)
+            self._linear[j] = np.where(known, means / variances, 0.0)
+            self._quadratic[j] = np.where(known, -0.5 / variances, 0.0)
+            self._impossible[j] = ~known
+
+        # Nominal attributes: the tables of all attributes stacked, followed by a row of zeros for missing values
+        # and a row of -inf for values not in the tables
+        self._nominal_columns = np.array(nominal_columns, dtype=np.intp)
+        sizes = [len(table) for table in nominal_tables]
+        self._offsets = np.cumsum([0] + sizes[:-1]).astype(np.intp)
+        self._sizes = np.array(sizes, dtype=np.intp)
+        self._missing_row = sum(sizes)
+        self._unknown_row = self._missing_row + 1
+        self._table = np.concatenate(
+            nominal_tables + [np.zeros((1, num_classes)), np.full((1, num_classes), -np.inf)])
+
+    def log_likelihoods(self, features):
+        """Return the logarithm of the prior times the likelihood of each class value for each instance.
+
+        Args:
+            features (numpy.ndarray): 2-D array with one row per instance and one column for each attribute
+                except the class, in the dataset's order.
+
+        Returns:
+            numpy.ndarray: 2-D array with one row per instance and one column per class value.
+        """
+        scores = np.tile(self.log_prior, (features.shape[0], 1))
+        if len(self._numeric_columns):
+            x = features[:, self._numeric_columns] - self._centers
+            present = ~np.isnan(x)
+            x = np.where(present, x, 0.0)
+            present = present.astype(np.float64)
+            scores += x @ self._linear + (x * x) @ self._quadratic + present @ self._constant
+            scores[present @ self._impossible > 0] = -np.inf
+        if len(self._nominal_columns):
+            codes = features[:, self._nominal_columns]
+            missing = np.isnan(codes)
+            codes = np.where(missing, -1, codes).astype(np.intp)
+            known = (codes >= 0) & (codes < self._sizes)
+            rows = np.where(known, self._offsets + codes, self._unknown_row)
+            rows[missing] = self._missing_row
+            scores += self._table[rows].sum(axis=1)
+        return scores
+
+    def distributions(self, features, fallback):
+        """Return the class probabilities of each instance.
+
+        Args:
+            features (numpy.ndarray): 2-D array with one row per instance, as in log_likelihoods.
+            fallback (numpy.ndarray): The class probabilities used for instances for which every class value
+                has a probability of 0.
+
+        Returns:
+            numpy.ndarray: 2-D array with one row of class probabilities per instance.
+        """
+        scores = self.log_likelihoods(features)
+        best = scores.max(axis=1, keepdims=True)
+        impossible = np.isneginf(best[:, 0])
+        best[impossible] = 0.0
+        probabilities = np.exp(scores - best)
+        probabilities /= np.where(impossible, 1.0, probabilities.sum(axis=1))[:, None]
+        probabilities[impossible] = fallback
+        return probabilities
@@ -0,0 +1,112 @@
+import numpy as np
+
+from ht.activehnode import ActiveHNode
+from ht.hnode import HNode
+from ht.naivebayes import NaiveBayesTables
+
+
+class NBNode(ActiveHNode):
+    """An active Hoeffding Tree node that predicts with naive Bayes, using the attribute statistics it keeps
+    for split evaluation. The naive Bayes model is precomputed the first time the node predicts after it
+    changes.
+
+    Args:
+        num_bins (int): The number of candidate split points evaluated for numeric attributes with Gaussian
+            observers. Ignored if observer_factory is given. (default 10)
+        nb_threshold (float): The weight the node has to see before it predicts with naive Bayes instead of
+            the majority class. (default 0)
+        observer_factory (ObserverFactory): Creates the statistics kept for each attribute. (default None)
+    """
+    # The type of the node in checkpoints
+    CHECKPOINT_TYPE = 'naive_bayes'
+
+    def __init__(self, num_bins=10, nb_threshold=0, observer_factory=None):
+        super().__init__(num_bins, observer_factory)
+        self._nb_threshold = nb_threshold
+        # Incremented every time the node changes
+        self._version = 0
+        # The naive Bayes model and the version of the node it was computed for
+        self._nb_tables = None
+        self._nb_tables_version = -1
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_nb_tables'] = None
+        state['_nb_tables_version'] = -1
+        return state
+
+    def checkpoint_state(self, arrays):
+        state = super().checkpoint_state(arrays)
+        state['nb_threshold'] = self._nb_threshold
+        return state
+
+    @classmethod
+    def from_checkpoint_state(cls, state, arrays):
+        node = super().from_checkpoint_state(state, arrays)
+        node._nb_threshold = state['nb_threshold']
+        return node
+
+    def update_node(self, instance):
+        super().update_node(instance)
+        self._version += 1
+
+    def update_node_batch(self, values, weights, dataset):
+        super().update_node_batch(values, weights, dataset)
+        self._version += 1
+
+    def merge(self, other):
+        super().merge(other)
+        self._version += 1
+
+    def naive_bayes_tables(self, dataset):
+        """Return the naive Bayes model of the node, computing it again only if the node changed.
+
+        Args:
+            dataset (Dataset): The dataset describing the attributes of the instances.
+
+        Returns:
+            NaiveBayesTables: The naive Bayes model.
+        """
+        if self._nb_tables is None or self._nb_tables_version != self._version:
+            self._nb_tables = NaiveBayesTables(self.class_distribution, self._node_stats, dataset)
+            self._nb_tables_version = self._version
+        return self._nb_tables
+
+    def get_distribution(self, instance, class_attribute):
+        dataset = instance.dataset
+        class_index = dataset.class_index()
+        features = np.array([[instance.value(index=i) for i in range(dataset.num_attributes()) if i != class_index]])
+        return self.get_distributions(features, dataset)[0].tolist()
+
+    def get_distributions(self, features, dataset):
+        """Return the class probabilities of a batch of instances.
+
+        Args:
+            features (numpy.ndarray): 2-D array with one row per instance and one column for each attribute
+                except the class, in the dataset's order.
+            dataset (Dataset): The dataset describing the attributes of the instances.
+
+        Returns:
+            numpy.ndarray: 2-D array with one row of class probabilities per instance.
+        """
+        if not self.uses_naive_bayes():
+            return self._majority_class_distributions(features.shape[0], dataset)
+        return self._naive_bayes_distributions(features, dataset)
+
+    def uses_naive_bayes(self):
+        """Return whether the node currently predicts with naive Bayes rather than with the majority class."""
+        return self.total_weight() > self._nb_threshold
+
+    def _majority_class_distributions(self, num_instances, dataset):
+        dist = HNode.get_distribution(self, None, dataset.class_attribute())
+        return np.tile(dist, (num_instances, 1))
+
+    def _naive_bayes_distributions(self, features, dataset):
+        fallback = HNode.get_distribution(self, None, dataset.class_attribute())
+        if self.total_weight() <= 0:
+            return np.tile(fallback, (features.shape[0], 1))
+        return self.naive_bayes_tables(dataset).distributions(features, fallback)
+
+    def _print_leaf_models(self, buff):
+        buff[0] += 'Leaf {0}: naive Bayes over {1} attribute(s), {2} instance weight\n'.format(
+            self._leaf_num, len(self._node_stats), self.total_weight())
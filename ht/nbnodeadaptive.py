@@ -0,0 +1,99 @@
+import math
+
+import numpy as np
+
+from core.instancebatch import InstanceBatch
+from ht.hnode import HNode
+from ht.nbnode import NBNode
+
+
+class NBNodeAdaptive(NBNode):
+    """An active Hoeffding Tree node that predicts with either the majority class or naive Bayes, whichever
+    has classified more of the instances seen by the node correctly. Each instance is classified by both
+    before the node is updated with it, so batches are also learned one instance at a time.
+
+    Args:
+        num_bins (int): The number of candidate split points evaluated for numeric attributes with Gaussian
+            observers. Ignored if observer_factory is given. (default 10)
+        observer_factory (ObserverFactory): Creates the statistics kept for each attribute. (default None)
+    """
+    # The type of the node in checkpoints
+    CHECKPOINT_TYPE = 'naive_bayes_adaptive'
+
+    def __init__(self, num_bins=10, observer_factory=None):
+        super().__init__(num_bins, observer_factory=observer_factory)
+        # The weight of the instances correctly classified by the majority class and by naive Bayes
+        self._mc_correct_weight = 0.0
+        self._nb_correct_weight = 0.0
+
+    def checkpoint_state(self, arrays):
+        state = super().checkpoint_state(arrays)
+        state['mc_correct_weight'] = self._mc_correct_weight
+        state['nb_correct_weight'] = self._nb_correct_weight
+        return state
+
+    @classmethod
+    def from_checkpoint_state(cls, state, arrays):
+        node = super().from_checkpoint_state(state, arrays)
+        node._mc_correct_weight = state['mc_correct_weight']
+        node._nb_correct_weight = state['nb_correct_weight']
+        return node
+
+    def update_node(self, instance):
+        class_val = int(instance.class_value())
+        if class_val == self._majority_class():
+            self._mc_correct_weight += instance.weight
+        if self._naive_bayes_class(instance) == class_val:
+            self._nb_correct_weight += instance.weight
+        super().update_node(instance)
+
+    def update_node_batch(self, values, weights, dataset):
+        # Each instance has to be classified by the node as updated with the instances before it
+        for instance in InstanceBatch(values, dataset, weights):
+            self.update_node(instance)
+
+    def merge(self, other):
+        super().merge(other)
+        if isinstance(other, NBNodeAdaptive):
+            self._mc_correct_weight += other._mc_correct_weight
+            self._nb_correct_weight += other._nb_correct_weight
+
+    def _naive_bayes_class(self, instance):
+        # The node changes after every instance, so the class is computed straight from the statistics rather
+        # than from naive Bayes tables that would only be used once
+        dataset = instance.dataset
+        class_attribute = dataset.class_attribute()
+        num_classes = class_attribute.num_values()
+        total_weight = self.total_weight()
+        if total_weight <= 0:
+            return int(np.argmax(HNode.get_distribution(self, None, class_attribute)))
+        weights = self.class_distribution.weights
+        scores = [math.log(weights[c] / total_weight) if c < len(weights) and weights[c] > 0 else -math.inf
+                  for c in range(num_classes)]
+        class_index = dataset.class_index()
+        for i, a in enumerate(dataset.get_attributes()):
+            if i == class_index:
+                continue
+            stats = self._node_stats.get(a.name, None)
+            att_val = instance.value(index=i)
+            if stats is None or math.isnan(att_val):
+                continue
+            for c in range(num_classes):
+                if scores[c] > -math.inf:
+                    scores[c] += stats.log_probability_of_att_val_conditioned_on_class(att_val, c)
+        best = max(scores)
+        if best == -math.inf:
+            return int(np.argmax(HNode.get_distribution(self, None, class_attribute)))
+        return scores.index(best)
+
+    def _majority_class(self):
+        weights = self.class_distribution.weights
+        return int(np.argmax(weights)) if len(weights) > 0 else 0
+
+    def uses_naive_bayes(self):
+        return self._mc_correct_weight <= self._nb_correct_weight
+
+    def _print_leaf_models(self, buff):
+        buff[0] += 'Leaf {0}: {1} ({2} correct weight for the majority class, {3} for naive Bayes)\n'.format(
+            self._leaf_num, 'naive Bayes' if self.uses_naive_bayes() else 'majority class',
+            self._mc_correct_weight, self._nb_correct_weight)
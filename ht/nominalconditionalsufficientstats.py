@@ -1,88 +1,168 @@
+import math
+import numpy as np
+
 from ht.conditionalsufficientstats import ConditionalSufficientStats
 from ht.splitcandidate import SplitCandidate
 from ht.univariatenominalmultiwaysplit import UnivariateNominalMultiwaySplit
-from core import utils
-
+from core.utils import running_sum
 
-class ValueDistribution(object):
-    """Discrete distribution for the NominalConditionalSufficientStats class."""
-    def __init__(self):
-        self._dist = {}
-        self.__sum = 0
-
-    def add(self, val, weight):
-        count = self._dist.get(val, None)
-        if count is None:
-            count = 1.0
-            self.__sum += 1.0
-            self._dist[val] = count
-        count += weight
-        self.__sum += weight
-
-    def delete(self, val, weight):
-        count = self._dist.get(val, None)
-        if count is not None:
-            count -= weight
-            self.__sum -= weight
-
-    def get_weight(self, val):
-        count = self._dist.get(val, None)
-        if count is not None:
-            return count
-        return 0.0
-
-    def sum(self):
-        return self.__sum
-        
 
 class NominalConditionalSufficientStats(ConditionalSufficientStats):
-    """A class for keeping record of the sufficient statistics for a nominal attribute."""
+    """A class for keeping record of the sufficient statistics for a nominal attribute.
+    The weight of each attribute value (rows) and class value (columns) is kept in a dense count matrix,
+    indexed by the attribute value index, which grows as new values and classes are seen. A value gets an
+    initial count of 1.0 the first time it is seen with a class value.
+    """
+    # The type of the statistics in checkpoints
+    CHECKPOINT_TYPE = 'nominal'
+
     def __init__(self):
         super().__init__()
         self._total_weight = 0
         self._missing_weight = 0
+        # Count matrix (attribute values x class values), with room for more values than seen so far
+        self._counts = np.zeros((0, 0))
+        # The total count of each class value, initial counts included
+        self._class_sums = np.zeros(0)
+        # One more than the largest attribute value index seen
+        self._num_values = 0
+
+    def checkpoint_state(self, arrays):
+        # The spare rows of the count matrix are not saved
+        return {'type': self.CHECKPOINT_TYPE, 'total_weight': self._total_weight,
+                'missing_weight': self._missing_weight, 'counts': arrays.add(self._counts[:self._num_values]),
+                'class_sums': arrays.add(self._class_sums)}
+
+    @classmethod
+    def from_checkpoint_state(cls, state, arrays):
+        stats = cls()
+        stats._total_weight = state['total_weight']
+        stats._missing_weight = state['missing_weight']
+        stats._counts = arrays.get(state['counts'])
+        stats._class_sums = arrays.get(state['class_sums'])
+        stats._num_values = stats._counts.shape[0]
+        return stats
+
+    def _grow(self, num_values, num_classes):
+        self._num_values = max(self._num_values, num_values)
+        rows, columns = self._counts.shape
+        if num_values <= rows and num_classes <= columns:
+            return
+        # Rows are added by doubling, so high-cardinality attributes are not copied for every new value
+        new_rows = max(rows, num_values) if num_values <= rows else max(num_values, 2 * rows)
+        new_columns = max(columns, num_classes)
+        counts = np.zeros((new_rows, new_columns))
+        counts[:rows, :columns] = self._counts
+        self._counts = counts
+        if new_columns > columns:
+            self._class_sums = np.concatenate((self._class_sums, np.zeros(new_columns - columns)))
 
     def update(self, att_val, class_val, weight):
         if math.isnan(att_val):
             self._missing_weight += weight
         else:
-            val_dist = self._class_lookup.get(class_val, None)
-            if val_dist is None:
-                val_dist = ValueDistribution()
-                val_dist.add(att_val, weight)
-                self._class_lookup[class_val] = val_dist
-            else:
-                val_dist.add(att_val, weight)
+            val = int(att_val)
+            self._grow(val + 1, class_val + 1)
+            count = self._counts[val, class_val]
+            if count == 0:
+                count = 1.0
+                self._class_sums[class_val] += 1.0
+            self._counts[val, class_val] = count + weight
+            self._class_sums[class_val] += weight
         self._total_weight += weight
 
+    def update_batch(self, att_vals, class_groups, weights):
+        missing = np.isnan(att_vals)
+        self._missing_weight = running_sum(self._missing_weight, weights[missing])
+        self._total_weight = running_sum(self._total_weight, weights)
+        present = np.flatnonzero(~missing)
+        if len(present) == 0:
+            return
+        class_vals = np.empty(len(att_vals), dtype=np.intp)
+        for class_val, rows in class_groups:
+            class_vals[rows] = class_val
+        vals = att_vals[present].astype(np.intp)
+        class_vals = class_vals[present]
+        weights = weights[present]
+        self._grow(int(vals.max()) + 1, int(class_vals.max()) + 1)
+
+        # Cells seen for the first time get their initial count right before their first weight
+        cells = vals * self._counts.shape[1] + class_vals
+        unique_cells, first_rows = np.unique(cells, return_index=True)
+        new = self._counts.flat[unique_cells] == 0
+        new_rows = np.sort(first_rows[new])
+        self._counts.flat[unique_cells[new]] = 1.0
+        # ufunc.at adds in order, so every count and sum is accumulated as one instance at a time
+        np.add.at(self._counts.reshape(-1), cells, weights)
+        np.add.at(self._class_sums, np.insert(class_vals, new_rows, class_vals[new_rows]),
+                  np.insert(weights, new_rows, 1.0))
+
+    def merge(self, other):
+        """Add the statistics of another NominalConditionalSufficientStats for the same attribute to these.
+        Values seen with the same class value by both only keep one initial count of 1.0.
+
+        Args:
+            other (NominalConditionalSufficientStats): The statistics to be merged into these.
+        """
+        num_values, num_classes = other._num_values, other._counts.shape[1]
+        self._grow(num_values, num_classes)
+        counts = self._counts[:num_values, :num_classes]
+        other_counts = other._counts[:num_values, :num_classes]
+        both = (counts != 0) & (other_counts != 0)
+        counts += other_counts - both
+        self._class_sums[:num_classes] += other._class_sums[:num_classes] - both.sum(axis=0)
+        self._total_weight += other._total_weight
+        self._missing_weight += other._missing_weight
+
+    def byte_size(self):
+        # Only the rows of the values seen are counted, so the size does not depend on whether the matrix grew
+        # one instance or one batch at a time
+        rows_size = self._num_values * self._counts.shape[1] * self._counts.itemsize
+        return super().byte_size() + rows_size + self._class_sums.nbytes
+
     def probability_of_att_val_conditioned_on_class(self, att_val, class_val):
-        val_dist = self._class_lookup.get(class_val, None)
-        if val_dist is not None:
-            return val_dist.get_weight(att_val) / val_dist.sum()
+        if class_val < len(self._class_sums) and self._class_sums[class_val] != 0:
+            if 0 <= att_val < self._num_values:
+                return self._counts[int(att_val), class_val] / self._class_sums[class_val]
+            return 0.0
         return 0
 
-    def _class_dists_after_split(self):
-        split_dists = {}
-        for class_val, att_dist in self._class_lookup.items():
-            for att_val, att_count in att_dist._dist.items():
-                cls_dist = split_dists.get(att_val, None)
-                if cls_dist is None:
-                    cls_dist = {}
-                    split_dists[att_val] = cls_dist
-
-                cls_count = cls_dist.get(class_val, None)
-                if cls_count is None:
-                    cls_count = 0.0
-                    cls_dist[class_val] = cls_count
-                cls_count += att_count
-
-        result = []
-        for att_index, dist in split_dists.items():
-            result.append(dist)
-        return result
-        
+    def log_probability_table(self, num_values, num_classes):
+        """Return the logarithm of probability_of_att_val_conditioned_on_class for every attribute value and
+        class value. Probabilities of 0 are -inf.
+
+        Args:
+            num_values (int): The number of attribute values.
+            num_classes (int): The number of class values.
+
+        Returns:
+            numpy.ndarray: 2-D array with one row per attribute value index and one column per class value.
+        """
+        probabilities = np.zeros((num_values, num_classes))
+        rows = min(num_values, self._num_values)
+        columns = min(num_classes, self._counts.shape[1])
+        sums = self._class_sums[:columns]
+        seen = sums != 0
+        probabilities[:rows, :columns] = np.divide(
+            self._counts[:rows, :columns], sums, out=np.zeros((rows, columns)), where=seen)
+        with np.errstate(divide='ignore'):
+            return np.log(probabilities)
+
+    def num_values_seen(self):
+        """Return one more than the largest attribute value index seen, or 0 if no value was seen."""
+        return self._num_values
+
+    def _class_dists_after_split(self, num_classes):
+        # Weight mass of each class value (columns) in the branch of each attribute value index (rows)
+        dists = np.zeros((self._num_values, num_classes))
+        columns = min(num_classes, self._counts.shape[1])
+        dists[:, :columns] = self._counts[:self._num_values, :columns]
+        return dists
+
     def best_split(self, split_metric, pre_split_dist, att_name):
-        post_split_dists = self._class_dists_after_split()
+        post_split_dists = self._class_dists_after_split(len(pre_split_dist))
+        if len(post_split_dists) == 0:
+            return None
         merit = split_metric.evaluate_split(pre_split_dist, post_split_dists)
         candidate = SplitCandidate(
             UnivariateNominalMultiwaySplit(att_name), post_split_dists, merit)
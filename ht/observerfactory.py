@@ -0,0 +1,103 @@
+from ht.gaussianconditionalsufficientstats import GaussianConditionalSufficientStats
+from ht.histogramconditionalsufficientstats import HistogramConditionalSufficientStats
+from ht.nominalconditionalsufficientstats import NominalConditionalSufficientStats
+from ht.quantilesketchconditionalsufficientstats import QuantileSketchConditionalSufficientStats
+
+# Numeric observers, by the value of HoeffdingTree.GAUSSIAN_OBSERVER, HISTOGRAM_OBSERVER and
+# QUANTILE_SKETCH_OBSERVER
+GAUSSIAN_OBSERVER = 0
+HISTOGRAM_OBSERVER = 1
+QUANTILE_SKETCH_OBSERVER = 2
+# The statistics that can be saved in checkpoints, by their type
+_STATS_TYPES = {stats_type.CHECKPOINT_TYPE: stats_type for stats_type in (
+    NominalConditionalSufficientStats, GaussianConditionalSufficientStats, HistogramConditionalSufficientStats,
+    QuantileSketchConditionalSufficientStats)}
+
+
+class ObserverFactory(object):
+    """Creates the statistics an active node keeps for each attribute.
+    Nominal attributes always get NominalConditionalSufficientStats. Numeric attributes get the observer set
+    for them, or the default numeric observer.
+
+    Args:
+        num_bins (int): The number of candidate split points of Gaussian observers. (default 10)
+        numeric_observer (int): The default numeric observer: GAUSSIAN_OBSERVER, HISTOGRAM_OBSERVER or
+            QUANTILE_SKETCH_OBSERVER. (default GAUSSIAN_OBSERVER)
+        max_bins (int): The largest number of bins of histogram and quantile sketch observers. (default 64)
+        attribute_observers (dict): Tuples (numeric observer, max_bins) for the attributes that do not use
+            the default, by attribute name. (default None)
+
+    Raises:
+        ValueError: If an observer is not one of the numeric observers.
+    """
+    def __init__(self, num_bins=10, numeric_observer=GAUSSIAN_OBSERVER, max_bins=64, attribute_observers=None):
+        if attribute_observers is None:
+            attribute_observers = {}
+        for observer in [numeric_observer] + [observer for observer, _ in attribute_observers.values()]:
+            if observer not in (GAUSSIAN_OBSERVER, HISTOGRAM_OBSERVER, QUANTILE_SKETCH_OBSERVER):
+                raise ValueError('{0} is not a numeric observer.'.format(observer))
+        self._num_bins = num_bins
+        self._numeric_observer = numeric_observer
+        self._max_bins = max_bins
+        self._attribute_observers = dict(attribute_observers)
+
+    def new_stats(self, attribute):
+        """Return new, empty statistics for an attribute.
+
+        Args:
+            attribute (Attribute): The attribute.
+
+        Returns:
+            ConditionalSufficientStats: The statistics.
+        """
+        if not attribute.is_numeric():
+            return NominalConditionalSufficientStats()
+        observer, max_bins = self._attribute_observers.get(
+            attribute.name, (self._numeric_observer, self._max_bins))
+        if observer == HISTOGRAM_OBSERVER:
+            return HistogramConditionalSufficientStats(max_bins)
+        if observer == QUANTILE_SKETCH_OBSERVER:
+            return QuantileSketchConditionalSufficientStats(max_bins)
+        return GaussianConditionalSufficientStats(self._num_bins)
+
+    def checkpoint_state(self):
+        """Return the parameters of the factory to be saved in a checkpoint.
+
+        Returns:
+            dict: The parameters, with the observers of the attributes as a list of [name, observer, max_bins].
+        """
+        return {'num_bins': self._num_bins, 'numeric_observer': self._numeric_observer, 'max_bins': self._max_bins,
+                'attribute_observers': [[name, observer, max_bins]
+                                        for name, (observer, max_bins) in self._attribute_observers.items()]}
+
+    @classmethod
+    def from_checkpoint_state(cls, state):
+        """Create a factory from the parameters saved in a checkpoint by checkpoint_state.
+
+        Args:
+            state (dict): The parameters of the factory.
+
+        Returns:
+            ObserverFactory: The factory.
+        """
+        attribute_observers = {name: (observer, max_bins) for name, observer, max_bins in state['attribute_observers']}
+        return cls(state['num_bins'], state['numeric_observer'], state['max_bins'], attribute_observers)
+
+
+def stats_from_checkpoint_state(state, arrays):
+    """Create attribute statistics from the state saved in a checkpoint by their checkpoint_state method.
+
+    Args:
+        state (dict): The state of the statistics.
+        arrays (CheckpointArrays): The arrays of the checkpoint.
+
+    Returns:
+        ConditionalSufficientStats: The statistics.
+
+    Raises:
+        ValueError: If the type of the statistics is not known.
+    """
+    stats_type = _STATS_TYPES.get(state['type'], None)
+    if stats_type is None:
+        raise ValueError('{0} is not a type of attribute statistics.'.format(state['type']))
+    return stats_type.from_checkpoint_state(state, arrays)
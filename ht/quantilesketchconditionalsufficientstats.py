@@ -0,0 +1,21 @@
+from ht.binnedconditionalsufficientstats import BinnedConditionalSufficientStats
+
+
+class QuantileSketchConditionalSufficientStats(BinnedConditionalSufficientStats):
+    """A class for keeping record of the sufficient statistics for a numeric attribute in a mergeable quantile
+    sketch of at most max_bins bins. The two adjacent bins with the smallest combined weight are merged first,
+    which tends to even out the weight of the bins, so the boundaries between them follow the quantiles of the
+    attribute. This greedy merging gives no bound on the rank error of a boundary. Split candidates are then
+    spread by weight rather than by value, which suits skewed attributes such as latencies and counts.
+
+    Args:
+        max_bins (int): The largest number of bins kept. (default 64)
+    """
+    # The type of the statistics in checkpoints
+    CHECKPOINT_TYPE = 'quantile_sketch'
+
+    def __init__(self, max_bins=64):
+        super().__init__(max_bins)
+
+    def _merge_cost(self, left_centroid, left_weight, right_centroid, right_weight):
+        return left_weight + right_weight
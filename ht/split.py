@@ -3,17 +3,80 @@ from abc import ABCMeta, abstractmethod
 
 class Split(metaclass=ABCMeta):
     """Base for classes that handle splitting (UnivariateNominaMultiwaySplit 
-    and UnivariateNumericBinarySplit)."""
+    and UnivariateNumericBinarySplit).
+    Branches are identified by integers: the value index for nominal splits, and 0 (left) or 1 (right)
+    for numeric splits."""
     def __init__(self):
         self._split_att_names = []
+        # Attributes and dataset indices of the split attributes, resolved once by bind()
+        self._split_atts = None
+        self._split_att_indices = None
+
+    def bind(self, dataset):
+        """Resolve the split attributes against a dataset, so that instances are routed by attribute
+        index instead of looking the attributes up by name.
+
+        Args:
+            dataset (Dataset): The dataset describing the attributes of the instances to be routed.
+        """
+        self._split_atts = [dataset.attribute(name=name) for name in self._split_att_names]
+        self._split_att_indices = [-1 if att is None else att.index for att in self._split_atts]
 
     @abstractmethod
     def branch_for_instance(self, instance):
         pass
 
+    @abstractmethod
+    def branches_for_batch(self, values, dataset):
+        pass
+
     @abstractmethod
     def condition_for_branch(self, branch):
         pass
 
+    @abstractmethod
+    def checkpoint_state(self):
+        """Return the state of the split to be saved in a checkpoint.
+
+        Returns:
+            dict: The type of the split and its parameters.
+        """
+        pass
+
     def split_attributes(self):
         return self._split_att_names
+
+    def split_attribute_indices(self, dataset):
+        """Return the dataset indices of the split attributes, binding the split to the dataset if needed.
+
+        Args:
+            dataset (Dataset): The dataset describing the attributes of the instances to be routed.
+
+        Returns:
+            list[int]: The index of each split attribute, or -1 if the dataset does not have it.
+        """
+        if self._split_att_indices is None:
+            self.bind(dataset)
+        return self._split_att_indices
+
+
+def split_from_checkpoint_state(state):
+    """Create a split from the state saved in a checkpoint by Split.checkpoint_state.
+
+    Args:
+        state (dict): The state of the split.
+
+    Returns:
+        Split: The split.
+
+    Raises:
+        ValueError: If the type of the split is not known.
+    """
+    # The splits are subclasses of Split, so they can only be imported here
+    from ht.univariatenominalmultiwaysplit import UnivariateNominalMultiwaySplit
+    from ht.univariatenumericbinarysplit import UnivariateNumericBinarySplit
+    if state['type'] == UnivariateNominalMultiwaySplit.CHECKPOINT_TYPE:
+        return UnivariateNominalMultiwaySplit(state['attribute'])
+    if state['type'] == UnivariateNumericBinarySplit.CHECKPOINT_TYPE:
+        return UnivariateNumericBinarySplit(state['attribute'], state['split_point'])
+    raise ValueError('{0} is not a type of split.'.format(state['type']))
@@ -1,3 +1,6 @@
+from ht.split import split_from_checkpoint_state
+
+
 class SplitCandidate(object):
     """Class for handling a split candidate."""
     def __init__(self, split_test, post_split_dists, merit):
@@ -7,3 +10,30 @@ class SplitCandidate(object):
 
     def num_splits(self):
         return len(self.post_split_class_distributions)
+
+    def checkpoint_state(self, arrays):
+        """Return the state of the candidate to be saved in a checkpoint.
+
+        Args:
+            arrays (CheckpointArrays): Where the class distributions after the split are stored.
+
+        Returns:
+            dict: The split, the index of the class distributions in arrays and the merit.
+        """
+        return {'split': None if self.split_test is None else self.split_test.checkpoint_state(),
+                'class_distributions': arrays.add(self.post_split_class_distributions),
+                'merit': self.split_merit}
+
+    @classmethod
+    def from_checkpoint_state(cls, state, arrays):
+        """Create a candidate from the state saved in a checkpoint by checkpoint_state.
+
+        Args:
+            state (dict): The state of the candidate.
+            arrays (CheckpointArrays): The arrays of the checkpoint.
+
+        Returns:
+            SplitCandidate: The candidate.
+        """
+        split_test = None if state['split'] is None else split_from_checkpoint_state(state['split'])
+        return cls(split_test, arrays.get(state['class_distributions']), state['merit'])
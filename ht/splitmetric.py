@@ -1,18 +1,42 @@
 from abc import ABCMeta, abstractmethod
+import numpy as np
 
 
 class SplitMetric(metaclass=ABCMeta):
-    """Base for Info Gain and Gini split metrics."""
+    """Base for Info Gain and Gini split metrics.
+    A class distribution is an array with the weight mass of each class value, and the class distributions
+    after a split are a 2-D array with one row per branch."""
     def sum(self, dist):
-        weight_sum = 0
-        for class_value, mass in dist.items():
-            weight_sum += dist[class_value].weight
-        return weight_sum
+        return float(np.sum(dist))
 
     @abstractmethod
     def evaluate_split(self, pre_dist, post_dist):
         pass
 
+    def evaluate_splits(self, pre_dist, post_dists):
+        """Evaluate many candidate splits of the same distribution.
+        This calls evaluate_split for each candidate; subclasses override it to score all the candidates with
+        a few array operations.
+
+        Args:
+            pre_dist (numpy.ndarray): The weight mass of each class value before the split.
+            post_dists (numpy.ndarray): 3-D array (candidates x branches x class values) with the class
+                distributions after each candidate split.
+
+        Returns:
+            numpy.ndarray: The merit of each candidate split.
+        """
+        return np.array([self.evaluate_split(pre_dist, post_dist) for post_dist in post_dists])
+
     @abstractmethod
     def get_metric_range(self, pre_dist):
         pass
+
+    @abstractmethod
+    def checkpoint_state(self):
+        """Return the state of the metric to be saved in a checkpoint.
+
+        Returns:
+            dict: The type of the metric and its parameters.
+        """
+        pass
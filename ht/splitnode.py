@@ -1,9 +1,17 @@
+import sys
+
+from core.utils import object_byte_size
+from ht.classdistribution import ClassDistribution
 from ht.hnode import HNode
 from ht.leafnode import LeafNode
+from ht.split import split_from_checkpoint_state
 
 
 class SplitNode(HNode):
     """A Hoeffding Tree node used for splits."""
+    # The type of the node in checkpoints
+    CHECKPOINT_TYPE = 'split'
+
     def __init__(self, class_distrib, split):
         super().__init__(class_distrib)
         self.split = split
@@ -22,6 +30,19 @@ class SplitNode(HNode):
     def set_child(self, branch, child):
         self.children[branch] = child
 
+    def checkpoint_state(self, arrays):
+        state = super().checkpoint_state(arrays)
+        state['split'] = self.split.checkpoint_state()
+        return state
+
+    @classmethod
+    def from_checkpoint_state(cls, state, arrays):
+        return cls(ClassDistribution.from_checkpoint_state(state['class_distribution'], arrays),
+                   split_from_checkpoint_state(state['split']))
+
+    def byte_size(self):
+        return super().byte_size() + sys.getsizeof(self.children) + object_byte_size(self.split)
+
     def leaf_for_instance(self, instance, parent, parent_branch):
         branch = self.branch_for_instance(instance)
         if branch is not None:
@@ -35,14 +56,14 @@ class SplitNode(HNode):
         # Don't update the distribution
         pass 
 
-    def _dump_tree(self, depth, leaf_count, buff):
+    def _dump_tree(self, depth, leaf_count, buff, class_attribute=None):
         for branch, child in self.children.items():
             if child is not None:
                 buff[0] += '\n'
                 for i in range(depth):
                     buff[0] += '|   '
                 buff[0] += '{0}: '.format(self.split.condition_for_branch(branch))
-                leaf_count = child._dump_tree(depth + 1, leaf_count, buff)
+                leaf_count = child._dump_tree(depth + 1, leaf_count, buff, class_attribute)
         return leaf_count
 
     def install_node_nums(self, node_num):
@@ -0,0 +1,108 @@
+import numpy as np
+
+from ht.codegen import generate_predictor
+from ht.compiledtree import CompiledTree
+from ht.nbnode import NBNode
+
+
+class TreeSnapshot(object):
+    """An immutable copy of everything a Hoeffding Tree needs to predict, taken at one point of training.
+
+    The snapshot keeps the compiled structure of the tree, the class probabilities of each node and the naive
+    Bayes models of the leaves that predict with naive Bayes, and no reference to the nodes, so it can be read
+    from any thread while the tree keeps learning. The tree publishes a new snapshot by replacing its
+    reference to the last one, which readers see either entirely or not at all.
+
+    Args:
+        root (HNode): The root of the tree, or None if no model was built yet.
+        dataset (Dataset): The dataset describing the attributes of the instances.
+        version (int): The version of the snapshot. Every snapshot published by a tree has a larger version
+            than the previous one.
+    """
+    def __init__(self, root, dataset, version):
+        self.version = version
+        self._class_index = dataset.class_index()
+        class_attribute = dataset.class_attribute()
+        self._num_classes = class_attribute.num_values()
+        self._compiled = None
+        self._distributions = None
+        # Dict of tuples (node id, NaiveBayesTables)
+        self._naive_bayes = {}
+        # The generated single-instance predictor, created the first time it is needed
+        self._predictor = None
+        if root is None:
+            return
+        compiled = CompiledTree(root, dataset)
+        self._distributions = compiled.distributions(class_attribute)
+        for node_id, node in enumerate(compiled.nodes):
+            if isinstance(node, NBNode) and node.uses_naive_bayes() and node.total_weight() > 0:
+                # The tables of a node are never changed once computed, only replaced
+                self._naive_bayes[node_id] = node.naive_bayes_tables(dataset)
+        # The live nodes must not be reachable from the snapshot
+        compiled.nodes = None
+        self._compiled = compiled
+
+    def num_classes(self):
+        return self._num_classes
+
+    def predictor(self):
+        """Return a generated Python function that predicts the class probabilities of one instance with
+        nested comparisons, which is faster than routing a single instance through the compiled arrays.
+        The function is generated the first time it is asked for.
+
+        The function takes a sequence with the attribute values of the instance except the class, as in a
+        row of predict_proba, and returns a tuple with the class probabilities.
+
+        Returns:
+            function: The predictor.
+        """
+        predictor = self._predictor
+        if predictor is None:
+            if self._compiled is None:
+                uniform = (1.0 / self._num_classes,) * self._num_classes
+                predictor = lambda x: uniform
+            else:
+                predictor = generate_predictor(
+                    self._compiled, self._distributions, self._naive_bayes, self._class_index)
+            self._predictor = predictor
+        return predictor
+
+    def predict_proba(self, X):
+        """Return the class probabilities for a batch of instances.
+
+        Args:
+            X (numpy.ndarray): 2-D array with one row per instance and one column for each attribute of the
+                dataset except the class, as in HoeffdingTree.predict_proba.
+
+        Returns:
+            numpy.ndarray: 2-D array with the class probabilities of each instance, one row per instance.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if self._compiled is None:
+            # All class values equally likely
+            return np.full((X.shape[0], self._num_classes), 1.0 / self._num_classes)
+        nodes = self._compiled.route(X, self._class_index)
+        pred = self._distributions[nodes]
+        if self._naive_bayes:
+            for node_id in np.unique(nodes):
+                tables = self._naive_bayes.get(int(node_id), None)
+                if tables is not None:
+                    rows = np.flatnonzero(nodes == node_id)
+                    pred[rows] = tables.distributions(X[rows], self._distributions[node_id])
+        return pred
+
+    def predict(self, X):
+        """Return the index of the most likely class value for a batch of instances."""
+        return np.argmax(self.predict_proba(X), axis=1)
+
+    def distribution_for_instance(self, instance):
+        """Return the class probabilities for an instance.
+
+        Args:
+            instance (Instance): The instance to calculate the class probabilities for.
+
+        Returns:
+            list[float]: The class probabilities.
+        """
+        features = [instance.value(index=i) for i in range(instance.num_values()) if i != self._class_index]
+        return self.predict_proba([features])[0].tolist()
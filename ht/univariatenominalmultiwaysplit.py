@@ -1,17 +1,52 @@
+import math
+import numpy as np
+
 from ht.split import Split
 
 
 class UnivariateNominalMultiwaySplit(Split):
     """Multiway split based on a nominal attribute."""
+    # The type of the split in checkpoints
+    CHECKPOINT_TYPE = 'nominal_multiway'
+
     def __init__(self, att_name):
         super().__init__()
         self._split_att_names.append(att_name)
 
     def branch_for_instance(self, instance):
-        att = instance.dataset.attribute(name=self._split_att_names[0])
-        if att is None or instance.is_missing(att.index):
+        att_index = self.split_attribute_indices(instance.dataset)[0]
+        if att_index < 0:
             return None
-        return att.value(instance.value(attribute=att))
+        value = instance.value(index=att_index)
+        if math.isnan(value):
+            return None
+        return int(value)
+
+    def branches_for_batch(self, values, dataset):
+        """Partition a batch of instances between the branches of the split.
+
+        Args:
+            values (numpy.ndarray): 2-D array with the attribute values of the instances, one per row.
+            dataset (Dataset): The dataset describing the attributes of the instances.
+
+        Returns:
+            dict: The row positions (numpy.ndarray) of the instances that go down each branch.
+                Instances with a missing value for the split attribute are not in any branch.
+        """
+        att_index = self.split_attribute_indices(dataset)[0]
+        if att_index < 0:
+            return {}
+        column = values[:, att_index]
+        branches = {}
+        for value_index in np.unique(column[~np.isnan(column)]):
+            branches[int(value_index)] = np.flatnonzero(column == value_index)
+        return branches
 
     def condition_for_branch(self, branch):
-        return '{0} = {1}'.format(self._split_att_names[0], branch)
+        value = branch
+        if self._split_atts is not None and self._split_atts[0] is not None:
+            value = self._split_atts[0].value(branch)
+        return '{0} = {1}'.format(self._split_att_names[0], value)
+
+    def checkpoint_state(self):
+        return {'type': self.CHECKPOINT_TYPE, 'attribute': self._split_att_names[0]}
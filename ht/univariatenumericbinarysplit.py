@@ -1,26 +1,56 @@
+import math
+import numpy as np
+
 from ht.split import Split
 
 
 class UnivariateNumericBinarySplit(Split):
     """Binary split based on a numeric attribute."""
+    # The type of the split in checkpoints
+    CHECKPOINT_TYPE = 'numeric_binary'
+
     def __init__(self, att_name, split_point):
         super().__init__()
         self._split_att_names.append(att_name)
         self._split_point = split_point
 
     def branch_for_instance(self, instance):
-        att = instance.dataset.attribute(name=self._split_att_names[0])
-        if att is None or instance.is_missing(att.index):
+        att_index = self.split_attribute_indices(instance.dataset)[0]
+        if att_index < 0:
             return None
-        if instance.value(attribute=att) <= self._split_point:
-            return 'left'
-        return 'right'
+        value = instance.value(index=att_index)
+        if math.isnan(value):
+            return None
+        if value <= self._split_point:
+            return 0
+        return 1
+
+    def branches_for_batch(self, values, dataset):
+        """Partition a batch of instances between the branches of the split.
+
+        Args:
+            values (numpy.ndarray): 2-D array with the attribute values of the instances, one per row.
+            dataset (Dataset): The dataset describing the attributes of the instances.
+
+        Returns:
+            dict: The row positions (numpy.ndarray) of the instances that go down each branch.
+                Instances with a missing value for the split attribute are not in any branch.
+        """
+        att_index = self.split_attribute_indices(dataset)[0]
+        if att_index < 0:
+            return {}
+        column = values[:, att_index]
+        return {0: np.flatnonzero(column <= self._split_point),
+                1: np.flatnonzero(column > self._split_point)}
 
     def condition_for_branch(self, branch):
         result = self._split_att_names[0]
-        if branch is 'left':
+        if branch == 0:
             result += ' <= '
         else:
             result += ' > '
         result += '{0}'.format(self._split_point)
         return result
+
+    def checkpoint_state(self):
+        return {'type': self.CHECKPOINT_TYPE, 'attribute': self._split_att_names[0], 'split_point': self._split_point}
@@ -1,9 +1,8 @@
-import csv
+import numpy as np
 
 from hoeffdingtree import HoeffdingTree
-from core.attribute import Attribute
+from core.csvreader import CSVReader
 from core.instance import Instance
-from core.dataset import Dataset
 
 
 def open_dataset(filename, class_index, probe_instances=100):
@@ -20,52 +19,14 @@ def open_dataset(filename, class_index, probe_instances=100):
     Returns:
         Dataset: A dataset initialized with the attributes and instances of the given CSV file.
     """
-    if not filename.endswith('.csv'):
-        raise TypeError(
-            'Unable to open \'{0}\'. Only datasets in CSV format are supported.'
-            .format(filename))
-    with open(filename) as f:
-        fr = csv.reader(f)
-        headers = next(fr)
+    reader = CSVReader(filename, class_index, sample_size=probe_instances, chunk_size=probe_instances)
+    dataset = reader.dataset()
+    for X, y in reader.chunks():
+        for inst in np.insert(X, class_index, y, axis=1):
+            dataset.add(Instance(att_values=inst.tolist()))
+        # Only the probed instances are loaded
+        break
 
-        att_values = [[] for i in range(len(headers))]
-        instances = []
-        try:
-            for i in range(probe_instances):
-                inst = next(fr)
-                instances.append(inst)
-                for j in range(len(headers)):
-                    try:
-                        inst[j] = float(inst[j])
-                        att_values[j] = None
-                    except ValueError:
-                        inst[j] = str(inst[j])
-                    if isinstance(inst[j], str):
-                        if att_values[j] is not None:
-                            if inst[j] not in att_values[j]:
-                                att_values[j].append(inst[j])
-                        else:
-                            raise ValueError(
-                                'Attribute {0} has both Numeric and Nominal values.'
-                                .format(headers[j]))
-        # Tried to probe more instances than there are in the dataset file
-        except StopIteration:
-            pass
-
-    attributes = []
-    for i in range(len(headers)):
-        if att_values[i] is None:
-            attributes.append(Attribute(str(headers[i]), att_type='Numeric'))
-        else:
-            attributes.append(Attribute(str(headers[i]), att_values[i], 'Nominal'))
-
-    dataset = Dataset(attributes, class_index)
-    for inst in instances:
-        for i in range(len(headers)):
-            if attributes[i].att_type == 'Nominal':
-                inst[i] = int(attributes[i].index_of_value(str(inst[i])))
-        dataset.add(Instance(att_values=inst))
-    
     return dataset
 
 
@@ -85,21 +46,9 @@ def main():
     vfdt.build_classifier(dataset)
     
     # Simulate a data stream
-    with open(filename) as f:
-        stream = csv.reader(f)
-        # Ignore the CSV headers
-        next(stream)
-        for item in stream:
-            inst_values = list(item)
-            for i in range(len(inst_values)):
-                if dataset.attribute(index=i).att_type == 'Nominal':
-                    inst_values[i] = int(dataset.attribute(index=i)
-                        .index_of_value(str(inst_values[i])))
-                else:
-                    inst_values[i] = float(inst_values[i])
-            new_instance = Instance(att_values=inst_values)
-            new_instance.dataset = dataset
-            vfdt.update_classifier(new_instance)
+    reader = CSVReader(filename, 1, dataset=dataset)
+    for X, y in reader.chunks():
+        vfdt.partial_fit(X, y)
     print(vfdt)
 
 
@@ -0,0 +1,395 @@
+"""A streaming service that trains and queries one Hoeffding Tree over a local socket.
+
+Messages are frames made of a header, with the type of the message (1 byte) and the length of the payload in
+bytes (4 bytes), followed by the payload. All numbers are little-endian and arrays are float64, row by row.
+
+    UPDATE   request:  number of rows n (uint32), X (n x number of attributes except the class), y (n),
+                       sample weights (n)
+             response: number of rows accepted (uint32)
+    PREDICT  request:  number of rows n (uint32), X (n x number of attributes except the class)
+             response: number of rows n (uint32), number of classes k (uint32), class probabilities (n x k)
+    INFO     request:  empty
+             response: number of attributes except the class (uint32), number of classes (uint32),
+                       number of rows trained on (uint64)
+    ERROR    response: a UTF-8 message, sent instead of the response of a request that failed
+
+Values in X and y are encoded as in HoeffdingTree.partial_fit: nominal values by their index and missing
+values by NaN. Each connection gets the responses of its requests in order.
+"""
+import argparse
+import asyncio
+import socket
+import struct
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+MSG_UPDATE = 1
+MSG_PREDICT = 2
+MSG_INFO = 3
+MSG_ERROR = 255
+
+_FRAME_HEADER = struct.Struct('<BI')
+_COUNT = struct.Struct('<I')
+_INFO = struct.Struct('<IIQ')
+# Frames larger than this are rejected and their connection closed
+MAX_FRAME_SIZE = 64 * 1024 * 1024
+
+
+def _encode_frame(msg_type, payload):
+    return _FRAME_HEADER.pack(msg_type, len(payload)) + payload
+
+
+def _decode_rows(payload, num_columns):
+    if len(payload) < _COUNT.size:
+        raise ValueError('The message has no number of rows.')
+    n = _COUNT.unpack_from(payload)[0]
+    values = np.frombuffer(payload, dtype='<f8', offset=_COUNT.size)
+    if len(values) != n * num_columns:
+        raise ValueError(
+            'Expected {0} values for {1} rows but the message has {2}.'
+            .format(n * num_columns, n, len(values)))
+    return n, values
+
+
+class TreeServer(object):
+    """Serves updates and predictions of one Hoeffding Tree to many clients over a Unix or TCP socket.
+
+    Updates are put in a bounded queue as soon as they are received and acknowledged, so clients that send
+    faster than the tree learns are slowed down once the queue is full. A training task takes all the
+    queued updates at once, up to max_batch_size rows, and trains the tree on them with one call to
+    partial_fit. Predictions waiting at the same time are answered with one call to predict_proba. The tree
+    is only used from one worker thread, so the event loop keeps serving the sockets while it learns. If the
+    tree publishes snapshots (see HoeffdingTree.enable_snapshots), predictions are made from the last
+    snapshot in another thread, so they do not wait for training.
+
+    Args:
+        tree (HoeffdingTree): The tree to be served. It should already be built with a dataset.
+        max_batch_size (int): The largest number of rows trained on or predicted in one call, unless a single
+            request has more. (default 10000)
+        max_queue_size (int): The number of update requests that can be waiting to be trained on before
+            clients sending updates have to wait. (default 100)
+        linger (float): How long, in seconds, the training task waits for more updates before training on
+            fewer than max_batch_size rows. (default 0.001)
+
+    Raises:
+        ValueError: If the tree was not built yet.
+    """
+    def __init__(self, tree, max_batch_size=10000, max_queue_size=100, linger=0.001):
+        if tree.get_header() is None:
+            raise ValueError('The tree needs to be built before it can be served.')
+        self._tree = tree
+        self._num_features = tree.get_header().num_attributes() - 1
+        self._max_batch_size = max_batch_size
+        self._max_queue_size = max_queue_size
+        self._linger = linger
+        self._updates = None
+        self._predictions = None
+        self._server = None
+        self._tasks = []
+        # The tree is only used from this thread
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        # Predictions from snapshots do not touch the tree
+        self._snapshot_executor = ThreadPoolExecutor(max_workers=1)
+        self._rows_trained = 0
+        self._num_training_batches = 0
+        self._num_prediction_batches = 0
+        self._num_training_errors = 0
+        self._last_training_error = None
+
+    def tree(self):
+        return self._tree
+
+    def get_stats(self):
+        """Return the number of rows trained on, the number of calls to partial_fit and predict_proba and the
+        number of updates that failed, with the error of the last one.
+
+        Returns:
+            dict: The statistics of the server.
+        """
+        return {
+            'rows_trained': self._rows_trained,
+            'training_batches': self._num_training_batches,
+            'prediction_batches': self._num_prediction_batches,
+            'training_errors': self._num_training_errors,
+            'last_training_error': self._last_training_error
+        }
+
+    async def start(self, address):
+        """Start listening for clients.
+
+        Args:
+            address (str): The path of a Unix socket.
+            address (tuple): A pair (host, port) for a TCP socket. With port 0 the system picks a free port,
+                which can be found with sockets().
+        """
+        self._updates = asyncio.Queue(self._max_queue_size)
+        self._predictions = asyncio.Queue()
+        if isinstance(address, str):
+            self._server = await asyncio.start_unix_server(self._handle_client, path=address)
+        else:
+            host, port = address
+            self._server = await asyncio.start_server(self._handle_client, host, port)
+        self._tasks = [asyncio.ensure_future(self._train()), asyncio.ensure_future(self._predict())]
+
+    def sockets(self):
+        """Return the sockets the server listens on."""
+        return self._server.sockets if self._server is not None else ()
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def flush(self):
+        """Wait until every update received so far has been trained on."""
+        await self._updates.join()
+
+    async def close(self):
+        """Stop listening, train on the updates already received and stop the training and prediction tasks."""
+        self._server.close()
+        await self._server.wait_closed()
+        await self.flush()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._executor.shutdown()
+        self._snapshot_executor.shutdown()
+
+    async def _handle_client(self, reader, writer):
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(_FRAME_HEADER.size)
+                except asyncio.IncompleteReadError:
+                    return
+                msg_type, length = _FRAME_HEADER.unpack(header)
+                if length > MAX_FRAME_SIZE:
+                    writer.write(_encode_frame(MSG_ERROR, 'Frame of {0} bytes is too large.'.format(length).encode()))
+                    await writer.drain()
+                    return
+                payload = await reader.readexactly(length)
+                try:
+                    response = await self._respond(msg_type, payload)
+                except ValueError as e:
+                    response = _encode_frame(MSG_ERROR, str(e).encode())
+                writer.write(response)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, msg_type, payload):
+        if msg_type == MSG_UPDATE:
+            n, values = _decode_rows(payload, self._num_features + 2)
+            X = values[:n * self._num_features].reshape(n, self._num_features)
+            y = values[n * self._num_features:n * (self._num_features + 1)]
+            weights = values[n * (self._num_features + 1):]
+            # Rejected here, since one bad update would make the whole training batch it joins fail
+            num_classes = self._tree.get_header().class_attribute().num_values()
+            classes = y[~np.isnan(y)]
+            if not np.all((classes >= 0) & (classes < num_classes) & (classes == np.floor(classes))):
+                raise ValueError(
+                    'y should only have the index of a class value, an integer from 0 to {0}, or NaN.'
+                    .format(num_classes - 1))
+            if n > 0:
+                # Waits while the queue is full
+                await self._updates.put((X, y, weights))
+            return _encode_frame(MSG_UPDATE, _COUNT.pack(n))
+        if msg_type == MSG_PREDICT:
+            n, values = _decode_rows(payload, self._num_features)
+            future = asyncio.get_running_loop().create_future()
+            await self._predictions.put((values.reshape(n, self._num_features), future))
+            proba = await future
+            return _encode_frame(
+                MSG_PREDICT, _COUNT.pack(n) + _COUNT.pack(proba.shape[1]) + proba.astype('<f8').tobytes())
+        if msg_type == MSG_INFO:
+            num_classes = self._tree.get_header().class_attribute().num_values()
+            return _encode_frame(MSG_INFO, _INFO.pack(self._num_features, num_classes, self._rows_trained))
+        raise ValueError('Unknown message type {0}.'.format(msg_type))
+
+    async def _take(self, queue, num_rows):
+        # Takes the requests waiting in a queue, up to max_batch_size rows, after the first one
+        items = [await queue.get()]
+        rows = num_rows(items[0])
+        while rows < self._max_batch_size and not queue.empty():
+            items.append(queue.get_nowait())
+            rows += num_rows(items[-1])
+        return items, rows
+
+    async def _train(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch, rows = await self._take(self._updates, lambda update: len(update[1]))
+            if rows < self._max_batch_size and self._linger > 0:
+                await asyncio.sleep(self._linger)
+                while rows < self._max_batch_size and not self._updates.empty():
+                    batch.append(self._updates.get_nowait())
+                    rows += len(batch[-1][1])
+            X, y, weights = (np.concatenate(arrays) for arrays in zip(*batch))
+            try:
+                await loop.run_in_executor(self._executor, self._tree.partial_fit, X, y, weights)
+                self._rows_trained += rows
+            except Exception as e:
+                self._num_training_errors += 1
+                self._last_training_error = repr(e)
+            self._num_training_batches += 1
+            for _ in batch:
+                self._updates.task_done()
+
+    async def _predict(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch, rows = await self._take(self._predictions, lambda prediction: len(prediction[0]))
+            X = np.concatenate([X for X, future in batch])
+            snapshot = self._tree.snapshot()
+            try:
+                if snapshot is not None:
+                    proba = await loop.run_in_executor(self._snapshot_executor, snapshot.predict_proba, X)
+                else:
+                    proba = await loop.run_in_executor(self._executor, self._tree.predict_proba, X)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(ValueError('Prediction failed: {0!r}'.format(e)))
+                continue
+            finally:
+                self._num_prediction_batches += 1
+            start = 0
+            for X, future in batch:
+                if not future.done():
+                    future.set_result(proba[start:start + len(X)])
+                start += len(X)
+
+
+class TreeClient(object):
+    """A blocking client for a TreeServer.
+
+    Args:
+        address (str): The path of the Unix socket of the server.
+        address (tuple): A pair (host, port) for a server listening on TCP.
+    """
+    def __init__(self, address):
+        if isinstance(address, str):
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._socket.connect(address)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._socket.close()
+
+    def _request(self, msg_type, payload):
+        self._socket.sendall(_encode_frame(msg_type, payload))
+        response_type, length = _FRAME_HEADER.unpack(self._receive(_FRAME_HEADER.size))
+        response = self._receive(length)
+        if response_type == MSG_ERROR:
+            raise ValueError(response.decode())
+        return response
+
+    def _receive(self, size):
+        buff = bytearray()
+        while len(buff) < size:
+            chunk = self._socket.recv(size - len(buff))
+            if not chunk:
+                raise ConnectionError('The server closed the connection.')
+            buff.extend(chunk)
+        return bytes(buff)
+
+    def update(self, X, y, sample_weight=None):
+        """Send instances for the tree to be trained on. Returns once the server has queued them, which is
+        before they are trained on.
+
+        Args:
+            X (numpy.ndarray): The attribute values of the instances, as in HoeffdingTree.partial_fit.
+            y (numpy.ndarray): The class value index of each instance.
+            sample_weight (numpy.ndarray): The weight of each instance. (default None, every weight is 1)
+
+        Returns:
+            int: The number of instances accepted.
+
+        Raises:
+            ValueError: If the server rejected the instances, for example because y has a value that is not
+                the index of a class value.
+        """
+        X = np.asarray(X, dtype='<f8')
+        if X.ndim != 2:
+            raise ValueError('X should be a 2-D array.')
+        y = np.asarray(y, dtype='<f8')
+        weights = np.ones(len(X), dtype='<f8') if sample_weight is None else np.asarray(sample_weight, dtype='<f8')
+        payload = _COUNT.pack(len(X)) + X.tobytes() + y.tobytes() + weights.tobytes()
+        return _COUNT.unpack(self._request(MSG_UPDATE, payload))[0]
+
+    def predict_proba(self, X):
+        """Return the class probabilities predicted by the tree for a batch of instances.
+
+        Args:
+            X (numpy.ndarray): The attribute values of the instances, as in HoeffdingTree.predict_proba.
+
+        Returns:
+            numpy.ndarray: 2-D array with the class probabilities of each instance, one row per instance.
+        """
+        X = np.asarray(X, dtype='<f8')
+        if X.ndim != 2:
+            raise ValueError('X should be a 2-D array.')
+        response = self._request(MSG_PREDICT, _COUNT.pack(len(X)) + X.tobytes())
+        n, num_classes = struct.unpack_from('<II', response)
+        return np.frombuffer(response, dtype='<f8', offset=8).reshape(n, num_classes)
+
+    def predict(self, X):
+        return np.argmax(self.predict_proba(X), axis=1)
+
+    def info(self):
+        """Return the number of attributes except the class, the number of classes and the number of
+        instances the server has trained the tree on.
+
+        Returns:
+            dict: The 'num_features', 'num_classes' and 'rows_trained' of the server.
+        """
+        num_features, num_classes, rows_trained = _INFO.unpack(self._request(MSG_INFO, b''))
+        return {'num_features': num_features, 'num_classes': num_classes, 'rows_trained': rows_trained}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a Hoeffding Tree over a local socket.')
+    model = parser.add_mutually_exclusive_group(required=True)
+    model.add_argument('--checkpoint', help='a checkpoint of the tree to be served')
+    model.add_argument('--csv', help='a CSV file whose header and first rows describe the attributes of a new tree')
+    parser.add_argument('--class-index', type=int, default=0, help='the index of the class attribute, with --csv')
+    listen = parser.add_mutually_exclusive_group(required=True)
+    listen.add_argument('--unix', help='the path of the Unix socket to listen on')
+    listen.add_argument('--port', type=int, help='the TCP port to listen on')
+    parser.add_argument('--host', default='127.0.0.1', help='the TCP host to listen on (default: 127.0.0.1)')
+    parser.add_argument('--max-batch-size', type=int, default=10000)
+    parser.add_argument('--max-queue-size', type=int, default=100)
+    parser.add_argument('--snapshot-period', type=int, default=1000,
+                        help='the number of instances trained on between two prediction snapshots (default: 1000)')
+    args = parser.parse_args()
+
+    from hoeffdingtree import HoeffdingTree
+    if args.checkpoint is not None:
+        tree = HoeffdingTree.load_checkpoint(args.checkpoint)
+    else:
+        from core.csvreader import CSVReader
+        tree = HoeffdingTree()
+        tree.build_classifier(CSVReader(args.csv, args.class_index).dataset())
+
+    tree.enable_snapshots(args.snapshot_period)
+    server = TreeServer(tree, args.max_batch_size, args.max_queue_size)
+    address = args.unix if args.unix is not None else (args.host, args.port)
+
+    async def serve():
+        await server.start(address)
+        await server.serve_forever()
+
+    asyncio.run(serve())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""Trees trained with partial_fit should be the same as trees trained with update_classifier, one instance at a
+time, whatever the options of the learner."""
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from benchmarks.run import make_generator
+from core.instancebatch import InstanceBatch
+from hoeffdingtree import HoeffdingTree
+
+
+def configure_defaults(tree):
+    tree.set_grace_period(100)
+    tree.set_split_confidence(0.01)
+    tree.set_hoeffding_tie_threshold(0.1)
+
+
+def train_both(configure, generator='randomtree', num_instances=3000, batch_size=500, missing=0.0,
+               weighted=False, seed=1):
+    """Train one tree one instance at a time and another one batch at a time on the same stream.
+    Both trees split with a lower confidence than the default, so they grow within the short streams of the tests.
+
+    Args:
+        configure (function): Called with each new HoeffdingTree to set its other options.
+        generator (str): The name of the stream generator. (default 'randomtree')
+        num_instances (int): The number of instances of the stream. (default 3000)
+        batch_size (int): The number of instances given to each call of partial_fit. (default 500)
+        missing (float): The fraction of attribute values replaced by missing values. (default 0.0)
+        weighted (bool): Whether the instances get random weights instead of 1. (default False)
+        seed (int): The seed of the stream and of the missing values and weights. (default 1)
+
+    Returns:
+        tuple: The tree trained one instance at a time, the tree trained in batches and the attribute values
+            of the stream.
+    """
+    stream = make_generator(generator, seed=seed)
+    dataset = stream.header()
+    X, y = stream.next_batch(num_instances)
+    rng = np.random.default_rng(seed)
+    X[rng.random(X.shape) < missing] = np.nan
+    weights = rng.uniform(0.5, 2.0, num_instances) if weighted else np.ones(num_instances)
+
+    sequential = HoeffdingTree()
+    configure_defaults(sequential)
+    configure(sequential)
+    sequential.build_classifier(dataset)
+    values = np.insert(X, dataset.class_index(), y, axis=1)
+    for instance in InstanceBatch(values, dataset, weights):
+        sequential.update_classifier(instance)
+
+    batched = HoeffdingTree()
+    configure_defaults(batched)
+    configure(batched)
+    batched.build_classifier(dataset)
+    for start in range(0, num_instances, batch_size):
+        stop = start + batch_size
+        batched.partial_fit(X[start:stop], y[start:stop], weights[start:stop])
+    return sequential, batched, X
+
+
+class BatchEquivalenceTest(unittest.TestCase):
+
+    def assert_same_trees(self, configure, **options):
+        sequential, batched, X = train_both(configure, **options)
+        self.assertEqual(str(sequential), str(batched))
+        self.assertEqual(sequential.estimate_model_byte_size(), batched.estimate_model_byte_size())
+        self.assertEqual(sequential.get_split_evaluation_stats(), batched.get_split_evaluation_stats())
+        np.testing.assert_array_equal(sequential.predict_proba(X), batched.predict_proba(X))
+
+    def test_default_options(self):
+        for generator in ('sea', 'hyperplane', 'randomtree', 'led', 'widenominal'):
+            with self.subTest(generator=generator):
+                self.assert_same_trees(lambda tree: None, generator=generator)
+
+    def test_weights_and_missing_values(self):
+        for generator in ('hyperplane', 'randomtree', 'widenominal'):
+            with self.subTest(generator=generator):
+                self.assert_same_trees(lambda tree: None, generator=generator, missing=0.05, weighted=True)
+
+    def test_memory_budget(self):
+        def configure(tree):
+            tree.set_max_byte_size(60000)
+            tree.set_memory_estimate_period(500)
+        for seed, missing in ((3, 0.0), (1, 0.02)):
+            with self.subTest(seed=seed, missing=missing):
+                self.assert_same_trees(configure, num_instances=6000, batch_size=1000, missing=missing, seed=seed)
+
+    def test_memory_budget_with_binned_observers(self):
+        for observer in ('HISTOGRAM_OBSERVER', 'QUANTILE_SKETCH_OBSERVER'):
+            def configure(tree):
+                tree.set_numeric_observer(getattr(tree, observer), 16)
+                tree.set_max_byte_size(40000)
+                tree.set_memory_estimate_period(300)
+            with self.subTest(observer=observer):
+                self.assert_same_trees(configure, num_instances=6000, batch_size=1000, missing=0.02)
+
+    def test_naive_bayes_leaves(self):
+        for strategy in ('LEAF_NB', 'LEAF_NB_ADAPTIVE'):
+            def configure(tree):
+                tree.set_leaf_prediction_strategy(getattr(tree, strategy))
+                # Adaptive leaves print the weights of the instances each model classified correctly
+                tree.set_print_leaf_models(True)
+            for generator in ('randomtree', 'led'):
+                with self.subTest(strategy=strategy, generator=generator):
+                    self.assert_same_trees(configure, generator=generator, missing=0.02)
+
+    def test_binned_observers(self):
+        for observer in ('HISTOGRAM_OBSERVER', 'QUANTILE_SKETCH_OBSERVER'):
+            def configure(tree):
+                tree.set_numeric_observer(getattr(tree, observer), 16)
+            with self.subTest(observer=observer):
+                self.assert_same_trees(configure, missing=0.02, weighted=True)
+
+    def test_split_reevaluation(self):
+        def configure(tree):
+            tree.set_split_reevaluation_fraction(0.5)
+        for generator in ('randomtree', 'widenominal'):
+            with self.subTest(generator=generator):
+                self.assert_same_trees(configure, generator=generator, missing=0.02, weighted=True)
+
+    def test_adaptive_split_checks(self):
+        def configure(tree):
+            tree.set_adaptive_split_checks(True)
+        for generator in ('randomtree', 'led'):
+            with self.subTest(generator=generator):
+                self.assert_same_trees(configure, generator=generator, missing=0.02, weighted=True)
+
+    def test_split_executor(self):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            def configure(tree):
+                tree.set_split_executor(executor, min_attributes=1)
+            self.assert_same_trees(configure, missing=0.02, weighted=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
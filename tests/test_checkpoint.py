@@ -0,0 +1,88 @@
+"""A learner loaded from a checkpoint should train and predict as the learner that was saved."""
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from benchmarks.run import make_generator
+from hoeffdingtree import HoeffdingTree
+
+
+class CheckpointTest(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.filename = tempfile.mkstemp(suffix='.ckp')
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def assert_resumes(self, configure, generator='randomtree', num_instances=4000, batch_size=500,
+                       missing=0.02):
+        stream = make_generator(generator, seed=2)
+        dataset = stream.header()
+        X, y = stream.next_batch(num_instances)
+        rng = np.random.default_rng(2)
+        X[rng.random(X.shape) < missing] = np.nan
+        weights = rng.uniform(0.5, 2.0, num_instances)
+
+        trees = []
+        for _ in range(2):
+            tree = HoeffdingTree()
+            configure(tree)
+            tree.set_print_leaf_models(True)
+            tree.build_classifier(dataset)
+            trees.append(tree)
+        reference, resumed = trees
+        # Checkpoints are saved in the middle of batches, so binned observers have buffered observations
+        for start in range(0, num_instances, batch_size):
+            stop = start + batch_size - 7
+            for tree in (reference, resumed):
+                tree.partial_fit(X[start:stop], y[start:stop], weights[start:stop])
+            resumed.save_checkpoint(self.filename)
+            resumed = HoeffdingTree.load_checkpoint(self.filename)
+            for tree in (reference, resumed):
+                tree.partial_fit(X[stop:start + batch_size], y[stop:start + batch_size],
+                                 weights[stop:start + batch_size])
+
+        self.assertEqual(str(reference), str(resumed))
+        self.assertEqual(reference.get_memory_stats(), resumed.get_memory_stats())
+        self.assertEqual(reference.get_split_evaluation_stats(), resumed.get_split_evaluation_stats())
+        np.testing.assert_array_equal(reference.predict_proba(X), resumed.predict_proba(X))
+
+    def test_default_options(self):
+        self.assert_resumes(lambda tree: None)
+
+    def test_options(self):
+        options = {
+            'memory_budget': lambda tree: (tree.set_max_byte_size(40000), tree.set_memory_estimate_period(300)),
+            'naive_bayes': lambda tree: tree.set_leaf_prediction_strategy(tree.LEAF_NB),
+            'naive_bayes_adaptive': lambda tree: tree.set_leaf_prediction_strategy(tree.LEAF_NB_ADAPTIVE),
+            'histogram': lambda tree: tree.set_numeric_observer(tree.HISTOGRAM_OBSERVER, 16),
+            'quantile_sketch': lambda tree: tree.set_numeric_observer(tree.QUANTILE_SKETCH_OBSERVER, 16),
+            'split_reevaluation': lambda tree: tree.set_split_reevaluation_fraction(0.5),
+            'adaptive_split_checks': lambda tree: tree.set_adaptive_split_checks(True),
+        }
+        for name, configure in options.items():
+            with self.subTest(option=name):
+                self.assert_resumes(configure)
+
+    def test_untrained_learner(self):
+        tree = HoeffdingTree()
+        tree.set_grace_period(50)
+        tree.save_checkpoint(self.filename)
+        loaded = HoeffdingTree.load_checkpoint(self.filename)
+        self.assertIsNone(loaded.get_header())
+        self.assertEqual(loaded.get_grace_period(), 50)
+        self.assertEqual(str(loaded), 'No model built yet!')
+
+    def test_not_a_checkpoint(self):
+        with open(self.filename, 'wb') as f:
+            f.write(b'HTREECKP not a checkpoint')
+        with self.assertRaises(ValueError):
+            HoeffdingTree.load_checkpoint(self.filename)
+
+
+if __name__ == '__main__':
+    unittest.main()